@@ -0,0 +1,177 @@
+import os
+import re
+import json
+import threading
+from datetime import datetime
+from functools import lru_cache
+from Program.Storage import DB_FILE, get_connection, init_schema
+from Program.InfoCache import YOUTUBE_ID_RE
+from Program.History import get_history
+from Program.Utils import log_error, safe_filename
+
+# Format "*" berarti video sudah ada dalam format apa pun
+ANY_FORMAT = '*'
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS archive (
+        extractor TEXT NOT NULL,
+        video_id TEXT NOT NULL,
+        format_id TEXT NOT NULL,
+        filepath TEXT,
+        added_at TEXT NOT NULL,
+        PRIMARY KEY (extractor, video_id, format_id)
+    ) WITHOUT ROWID""",
+]
+
+# yt-dlp default output template: "Title [VIDEO_ID].ext"
+FILENAME_ID_RE = re.compile(r'\[([0-9A-Za-z_-]{11})\]\.[^.]+$')
+
+def _entry(extractor, video_id, format_id):
+    return f"{extractor.lower()} {video_id} {format_id}"
+
+@lru_cache(maxsize=4096)
+def archive_id_from_url(url):
+    """
+    Return (extractor, video_id) for a URL without any network access,
+    or None if no extractor recognises it.
+    """
+    match = YOUTUBE_ID_RE.search(url)
+    if match:
+        return ('youtube', match.group(1))
+
+    # Slow path: ask yt-dlp's extractors which one handles this URL
+    from yt_dlp.extractor import gen_extractor_classes
+    for ie in gen_extractor_classes():
+        if ie.ie_key() == 'Generic':
+            continue
+        if ie.suitable(url):
+            video_id = ie.get_temp_id(url)
+            if video_id:
+                return (ie.ie_key().lower(), video_id)
+            return None
+    return None
+
+def _history_titles():
+    """
+    Map the file name stems a downloaded title can have (as saved by
+    yt-dlp or by safe_filename) to the URL it was downloaded from.
+    """
+    from yt_dlp.utils import sanitize_filename
+    titles = {}
+    for name, url in get_history().downloaded_urls().items():
+        for stem in (name, safe_filename(name), sanitize_filename(name)):
+            titles[stem] = url
+    return titles
+
+class DownloadArchive:
+    """
+    Index of downloaded (extractor, video id, format) triples.
+    Entries live in app.db and are mirrored in an in-memory set, so
+    lookups never touch the disk or the network.
+    """
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        self._entries = None
+        self._lock = threading.Lock()
+        init_schema('archive', SCHEMA, db_file)
+
+    def _conn(self):
+        return get_connection(self.db_file)
+
+    def _load(self):
+        with self._lock:
+            if self._entries is None:
+                rows = self._conn().execute("SELECT extractor, video_id, format_id FROM archive")
+                self._entries = {_entry(*row) for row in rows}
+            return self._entries
+
+    def contains(self, extractor, video_id, format_id=ANY_FORMAT):
+        """Return True if the video was archived in format_id (or in any format)."""
+        entries = self._load()
+        return (_entry(extractor, video_id, format_id) in entries
+                or _entry(extractor, video_id, ANY_FORMAT) in entries)
+
+    def has_url(self, url, format_id=ANY_FORMAT):
+        """Return True if the URL was already downloaded in format_id."""
+        key = archive_id_from_url(url)
+        return bool(key) and self.contains(key[0], key[1], format_id)
+
+    def add(self, extractor, video_id, format_id=ANY_FORMAT, filepath=None):
+        """Record a downloaded video."""
+        self.add_many([(extractor, video_id, format_id, filepath)])
+
+    def add_many(self, rows):
+        """Record many (extractor, video_id, format_id, filepath) rows in one transaction."""
+        rows = [(e.lower(), v, f or ANY_FORMAT, p) for e, v, f, p in rows]
+        if not rows:
+            return 0
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO archive (extractor, video_id, format_id, filepath, added_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [row + (now,) for row in rows]
+            )
+        entries = self._load()
+        with self._lock:
+            entries.update(_entry(e, v, f) for e, v, f, _ in rows)
+        return len(rows)
+
+    def import_folder(self, folder):
+        """
+        Import an existing output folder.
+        Recognises yt-dlp .info.json sidecars, "Title [VIDEO_ID].ext" file
+        names (assumed to be YouTube videos) and "Title.ext" files whose
+        title is in the download history with its URL.
+        Returns the number of imported entries.
+        """
+        titles = _history_titles()
+        rows = []
+        for root, _, files in os.walk(folder):
+            for name in files:
+                path = os.path.join(root, name)
+                if name.endswith('.info.json'):
+                    try:
+                        with open(path, 'r', encoding='utf-8') as f:
+                            info = json.load(f)
+                    except (OSError, ValueError) as e:
+                        log_error(f"Could not read {path}: {str(e)}")
+                        continue
+                    extractor = info.get('extractor_key') or info.get('extractor')
+                    if extractor and info.get('id'):
+                        rows.append((extractor, str(info['id']), info.get('format_id'), path))
+                    continue
+
+                match = FILENAME_ID_RE.search(name)
+                if match:
+                    rows.append(('youtube', match.group(1), ANY_FORMAT, path))
+                    continue
+
+                url = titles.get(os.path.splitext(name)[0])
+                key = archive_id_from_url(url) if url else None
+                if key:
+                    rows.append((key[0], key[1], ANY_FORMAT, path))
+        return self.add_many(rows)
+
+    def import_archive_file(self, path):
+        """Import a yt-dlp --download-archive file ("extractor id" per line)."""
+        rows = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2:
+                    rows.append((parts[0], parts[1], ANY_FORMAT, None))
+        return self.add_many(rows)
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_archive():
+    """Return the process-wide download archive."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = DownloadArchive()
+        return _archive
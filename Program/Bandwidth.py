@@ -0,0 +1,182 @@
+import os
+import time
+import threading
+from datetime import datetime
+from Program.Utils import config_file, load_config, save_config
+
+# Bobot bandwidth per prioritas job
+PRIORITY_WEIGHTS = {'low': 1, 'normal': 2, 'high': 4}
+
+KB = 1024
+
+def _minutes(text):
+    hours, minutes = text.split(':')
+    return int(hours) * 60 + int(minutes)
+
+def scheduled_limit(schedule, default, now=None):
+    """
+    Return the limit (KB/s) that applies at now. schedule is a list of
+    {"from": "08:00", "to": "17:00", "limit": 2048, "days": [0, 1, 2, 3, 4]};
+    "days" (Monday = 0) is optional and windows may wrap past midnight.
+    The first matching window wins, otherwise default applies.
+    """
+    now = now or datetime.now()
+    minute = now.hour * 60 + now.minute
+    for window in schedule or []:
+        try:
+            start, end = _minutes(window['from']), _minutes(window['to'])
+        except (KeyError, ValueError, AttributeError):
+            continue
+        days = window.get('days')
+        if days is not None and now.weekday() not in days:
+            continue
+        inside = start <= minute < end if start <= end else (minute >= start or minute < end)
+        if inside:
+            return window.get('limit', 0)
+    return default
+
+class Throttle:
+    """One job's share of the bandwidth governor."""
+
+    def __init__(self, governor, weight, cancel_event=None):
+        self.governor = governor
+        self.weight = weight
+        self.cancel_event = cancel_event
+        self.tokens = 0.0
+        self.stamp = time.monotonic()
+        self.last_seen = self.stamp
+        self._last_downloaded = {}
+
+    def consume(self, size):
+        """Block until size bytes fit in this job's share."""
+        self.governor._consume(self, size)
+
+    def observe(self, d):
+        """Progress hook: charge the bytes downloaded since the previous call."""
+        if d.get('status') != 'downloading' or d.get('bandwidth_accounted'):
+            return
+        filename = d.get('filename') or d.get('tmpfilename')
+        downloaded = d.get('downloaded_bytes') or 0
+        delta = downloaded - self._last_downloaded.get(filename, 0)
+        self._last_downloaded[filename] = downloaded
+        if delta > 0:
+            self.consume(delta)
+
+    def close(self):
+        self.governor._unregister(self)
+
+class BandwidthGovernor:
+    """
+    Process-wide token bucket shared by all downloads. Every active job
+    gets limit × weight / (sum of active weights); a job that hasn't
+    downloaded anything for idle_after seconds gives its share back.
+    The limit follows config.json (bandwidth_limit, bandwidth_schedule)
+    and is re-read when the file changes, so it can be changed while
+    downloads run.
+    """
+
+    def __init__(self, limit=0, schedule=None, burst=1.0, idle_after=2.0):
+        self.limit = limit
+        self.schedule = schedule or []
+        self.burst = burst
+        self.idle_after = idle_after
+        self.override = None
+        self._lock = threading.Lock()
+        self._throttles = set()
+        self._config_mtime = None
+        self._next_check = 0.0
+
+    def configure(self, limit=0, schedule=None):
+        with self._lock:
+            self.limit = limit or 0
+            self.schedule = schedule or []
+
+    def set_override(self, limit):
+        """Use limit (KB/s, 0 = unlimited) instead of config.json; None clears it."""
+        with self._lock:
+            self.override = limit
+
+    def current_limit(self):
+        """Limit in bytes per second, 0 for unlimited."""
+        if self.override is not None:
+            return self.override * KB
+        return (scheduled_limit(self.schedule, self.limit) or 0) * KB
+
+    def register(self, weight=1, cancel_event=None):
+        throttle = Throttle(self, weight, cancel_event)
+        with self._lock:
+            self._throttles.add(throttle)
+        return throttle
+
+    def _unregister(self, throttle):
+        with self._lock:
+            self._throttles.discard(throttle)
+
+    def reload(self):
+        """Re-read the limit and schedule from config.json."""
+        config = load_config()
+        self.configure(config.get('bandwidth_limit', 0), config.get('bandwidth_schedule'))
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + 5
+        try:
+            mtime = os.path.getmtime(config_file)
+        except OSError:
+            return
+        if mtime != self._config_mtime:
+            self._config_mtime = mtime
+            self.reload()
+
+    def _share(self, throttle, rate, now):
+        weights = sum(
+            t.weight for t in self._throttles
+            if t is throttle or now - t.last_seen < self.idle_after
+        )
+        return rate * throttle.weight / max(weights, throttle.weight)
+
+    def _consume(self, throttle, size):
+        self._maybe_reload()
+        with self._lock:
+            throttle.tokens -= size
+            throttle.last_seen = time.monotonic()
+
+        # Sleep in short steps so a changed limit or a cancel applies quickly
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                rate = self.current_limit()
+                if not rate:
+                    throttle.tokens = 0.0
+                    throttle.stamp = now
+                    return
+                share = self._share(throttle, rate, now)
+                throttle.tokens = min(share * self.burst, throttle.tokens + (now - throttle.stamp) * share)
+                throttle.stamp = now
+                if throttle.tokens >= 0:
+                    return
+                wait = -throttle.tokens / share
+            if throttle.cancel_event is not None and throttle.cancel_event.is_set():
+                return
+            time.sleep(min(wait, 0.5))
+
+_governor = None
+_governor_lock = threading.Lock()
+
+def get_governor():
+    """Return the process-wide bandwidth governor configured from config.json."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = BandwidthGovernor()
+            _governor._maybe_reload()
+        return _governor
+
+def set_bandwidth_limit(limit):
+    """Save a new default limit (KB/s, 0 = unlimited) and apply it to running downloads."""
+    config = load_config()
+    config['bandwidth_limit'] = limit
+    save_config(config)
+    get_governor().reload()
@@ -0,0 +1,196 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from Program.Utils import load_config, log_error
+from Program import ConvertLogic
+
+MEDIA_EXTENSIONS = (
+    '.mp4', '.mkv', '.webm', '.avi', '.mov', '.m4v', '.flv', '.ts',
+    '.mp3', '.m4a', '.aac', '.ogg', '.opus', '.wav', '.flac', '.wma',
+)
+
+# Thread per proses FFmpeg: (normal, maksimum saat file lebih sedikit dari slot).
+# libx264 masih efisien sampai beberapa thread; libvpx-vp9 paling sedikit
+# untung dari thread tambahan, jadi lebih baik lebih banyak file paralel.
+ENCODER_THREADS = {
+    'libx264': (4, 16),
+    'libvpx-vp9': (2, 8),
+    'audio': (1, 2),
+}
+
+def encoder_family(codec):
+    """'audio' for audio-only targets, otherwise the video encoder of codec."""
+    if ConvertLogic.is_audio_codec(codec):
+        return 'audio'
+    args = ConvertLogic.QUALITY_PRESETS['medium'].get(codec.lower(), [])
+    return args[args.index('-c:v') + 1] if '-c:v' in args else 'libx264'
+
+def encoder_threads(codec):
+    """(normal, maximum) threads per FFmpeg process; config.json convert_threads overrides."""
+    family = encoder_family(codec)
+    override = (load_config().get('convert_threads') or {}).get(family)
+    if override:
+        return int(override), max(int(override), ENCODER_THREADS[family][1])
+    return ENCODER_THREADS.get(family, ENCODER_THREADS['libx264'])
+
+def thread_plan(codec, files, cores=None):
+    """
+    Split cores (default: the convert_cpu_budget) between FFmpeg processes.
+    Returns (jobs, threads): how many files run at once and the threads
+    each one gets. With fewer files than slots each file gets more threads.
+    """
+    cores = cores or get_core_budget().total
+    normal, maximum = encoder_threads(codec)
+    jobs = max(1, cores // normal)
+    if files:
+        jobs = min(jobs, files)
+    threads = max(1, min(maximum, max(normal, cores // jobs), cores))
+    return jobs, threads
+
+class CoreBudget:
+    """Number of CPU cores handed out to running FFmpeg processes."""
+
+    def __init__(self, total):
+        self.total = max(1, total)
+        self.free = self.total
+        self._cond = threading.Condition()
+
+    def acquire(self, cores, cancel_event=None):
+        """Wait until cores are free; returns the cores taken, 0 if cancelled."""
+        cores = max(1, min(cores, self.total))
+        with self._cond:
+            while self.free < cores:
+                if cancel_event is not None and cancel_event.is_set():
+                    return 0
+                self._cond.wait(0.5)
+            self.free -= cores
+            return cores
+
+    def release(self, cores):
+        with self._cond:
+            self.free += cores
+            self._cond.notify_all()
+
+_core_budget = None
+_core_budget_lock = threading.Lock()
+
+def get_core_budget():
+    """Return the process-wide core budget (config.json convert_cpu_budget, default all cores)."""
+    global _core_budget
+    with _core_budget_lock:
+        if _core_budget is None:
+            _core_budget = CoreBudget(load_config().get('convert_cpu_budget') or os.cpu_count() or 1)
+        return _core_budget
+
+def convert_with_budget(input_path, output_path, codec, quality='medium', progress_callback=None, threads=None,
+                        cancel_event=None):
+    """
+    Run one conversion once its threads fit in the core budget.
+    Setting cancel_event stops the wait and the running FFmpeg.
+    """
+    if threads is None:
+        threads = thread_plan(codec, 1)[1]
+    budget = get_core_budget()
+    granted = budget.acquire(threads, cancel_event)
+    if not granted:
+        return False
+    try:
+        return ConvertLogic.run_conversion(input_path, output_path, codec, quality, progress_callback, granted,
+                                           cancel_event)
+    finally:
+        budget.release(granted)
+
+def collect_inputs(paths):
+    """Expand folders to the media files directly inside them; files are kept as given."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                full = os.path.join(path, name)
+                if os.path.isfile(full) and os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS:
+                    files.append(full)
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            log_error(f"Input not found: {path}", stage='convert', url=path)
+    return files
+
+def _output_path(input_path, output_dir, codec):
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    output_path = os.path.join(output_dir or os.path.dirname(input_path), f"{stem}.{codec.lower()}")
+    if os.path.abspath(output_path) == os.path.abspath(input_path):
+        output_path = os.path.join(os.path.dirname(output_path), f"{stem}_converted.{codec.lower()}")
+    return output_path
+
+def batch_convert(inputs, output_dir, codec, quality='medium', progress_callback=None, max_jobs=None,
+                  cancel_event=None):
+    """
+    Convert every file in inputs (files and/or folders) to codec, several
+    at once. The core budget is split between the running FFmpeg
+    processes (see thread_plan) so they don't fight over the CPU.
+    output_dir None writes each result next to its input.
+    Returns True if every file converted. Setting cancel_event (the
+    batch's own, so other conversions are unaffected) cancels the batch.
+    """
+    if cancel_event is None:
+        cancel_event = threading.Event()
+    files = collect_inputs(inputs)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jobs, threads = thread_plan(codec, len(files))
+    if max_jobs:
+        jobs = min(jobs, max_jobs)
+
+    lock = threading.Lock()
+    failures = []
+
+    def emit(info):
+        if progress_callback:
+            with lock:
+                progress_callback(info)
+
+    emit({'status': 'plan', 'total': len(files), 'jobs': jobs, 'threads': threads})
+
+    def fail(job, input_path, error, cause):
+        with lock:
+            failures.append(input_path)
+        emit({'status': 'error', 'job': job, 'file': os.path.basename(input_path),
+              'error': error, 'cause': cause})
+
+    def worker(job, input_path):
+        name = os.path.basename(input_path)
+        if cancel_event.is_set():
+            fail(job, input_path, "Conversion cancelled", 'cancelled')
+            return
+        emit({'status': 'start', 'job': job, 'file': name, 'current': job + 1, 'total': len(files)})
+        errors = []
+
+        def forward(update):
+            if 'error' in update:
+                errors.append(update)
+            elif update.get('status') == 'converting':
+                emit(dict(update, job=job, file=name))
+
+        output_path = _output_path(input_path, output_dir, codec)
+        if convert_with_budget(input_path, output_path, codec, quality, forward, threads, cancel_event):
+            emit({'status': 'complete', 'job': job, 'file': name, 'output': output_path})
+        else:
+            error = errors[-1] if errors else {'error': "Conversion cancelled"}
+            fail(job, input_path, error['error'],
+                 error.get('cause', 'cancelled' if not errors else 'unknown'))
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='batch-convert') as executor:
+        futures = [(job, input_path, executor.submit(worker, job, input_path))
+                   for job, input_path in enumerate(files)]
+
+    # A worker that raised never reported its file; count it as failed
+    for job, input_path, future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            log_error(f"Batch conversion failed: {str(e)}", stage='convert', url=input_path)
+            fail(job, input_path, str(e), 'unknown')
+
+    emit({'status': 'complete', 'total': len(files), 'failed': len(failures)})
+    return not failures
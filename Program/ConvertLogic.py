@@ -1,123 +1,122 @@
 import subprocess
 import os
-import logging
-import re
 import threading
-from Program.Utils import safe_filename, load_config, save_config, add_to_history, format_size, format_speed, format_eta
+from Program.Utils import safe_filename, load_config, save_config, add_to_history, format_size, format_speed, format_eta, log_error, find_binary
+from Program.Probe import ProbeError, first_stream, media_duration, probe
+from Program.ConvertProgress import ProgressParser
+from Program.FFmpegLog import FFmpegError, StderrTail
 
 # Path lokal untuk ffmpeg
-FFMPEG_PATH = os.path.join("ffmpeg", "bin", "ffmpeg.exe")
+FFMPEG_PATH = find_binary("ffmpeg")
 
-# Logging
-logging.basicConfig(filename='app.log', level=logging.ERROR)
-
-# Global event untuk pembatalan
+# Event pembatalan untuk konversi satu file (tab Convert, perintah convert);
+# batch dan pipeline download memakai event masing-masing
 cancel_event = threading.Event()
 
-def log_error(message):
-    logging.error(message)
+# Video quality presets with optimized settings
+QUALITY_PRESETS = {
+    'highest': {
+        'mp4': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18', '-movflags', '+faststart'],
+        'webm': ['-c:v', 'libvpx-vp9', '-crf', '24', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
+        'mkv': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18'],
+        'avi': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18']
+    },
+    'high': {
+        'mp4': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20', '-movflags', '+faststart'],
+        'webm': ['-c:v', 'libvpx-vp9', '-crf', '27', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
+        'mkv': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20'],
+        'avi': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20']
+    },
+    'medium': {
+        'mp4': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-movflags', '+faststart'],
+        'webm': ['-c:v', 'libvpx-vp9', '-crf', '30', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
+        'mkv': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'],
+        'avi': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23']
+    },
+    'low': {
+        'mp4': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28', '-movflags', '+faststart'],
+        'webm': ['-c:v', 'libvpx-vp9', '-crf', '35', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
+        'mkv': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28'],
+        'avi': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28']
+    }
+}
+
+# Audio codec parameters with optimized settings
+AUDIO_CODEC_PARAMS = {
+    'mp3': ['-acodec', 'libmp3lame', '-q:a', '2'],
+    'ogg': ['-acodec', 'libvorbis', '-q:a', '4'],
+    'opus': ['-acodec', 'libopus', '-b:a', '128k'],
+    'wav': ['-acodec', 'pcm_s16le'],
+    'm4a': ['-c:a', 'aac', '-b:a', '192k'],
+    'aac': ['-c:a', 'aac', '-b:a', '192k']
+}
+
+def is_audio_codec(codec):
+    """True if codec is an audio-only target format."""
+    return codec.lower() in AUDIO_CODEC_PARAMS
+
+def codec_arguments(codec, quality='medium'):
+    """FFmpeg encoder arguments for a target format and quality."""
+    if is_audio_codec(codec):
+        # Audio conversion, no video
+        return ['-vn'] + AUDIO_CODEC_PARAMS[codec.lower()]
+
+    # Video conversion: video codec parameters plus high-quality audio
+    ext = codec.lower()
+    if ext not in QUALITY_PRESETS[quality]:
+        raise Exception(f"Unsupported video format: {codec}")
+    return QUALITY_PRESETS[quality][ext] + ['-c:a', 'aac', '-b:a', '192k', '-ar', '48000']
 
 def get_media_duration(input_path):
-    """Get duration of media file in seconds."""
-    try:
-        cmd = [
-            FFMPEG_PATH,
-            '-i', input_path,
-            '-hide_banner'
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        duration_match = re.search(r'Duration: (\d{2}):(\d{2}):(\d{2})\.(\d{2})', result.stderr)
-        if duration_match:
-            hours, minutes, seconds, centiseconds = map(int, duration_match.groups())
-            total_seconds = hours * 3600 + minutes * 60 + seconds + centiseconds / 100
-            return total_seconds
-        return 0
-    except Exception:
-        return 0
-
-def convert_file(input_path, output_path, codec, quality='medium', progress_callback=None):
+    """Get duration of media file in seconds (cached ffprobe result)."""
+    return media_duration(input_path)
+
+def convert_file(input_path, output_path, codec, quality='medium', progress_callback=None, threads=0):
     """
     Mengkonversi file media menggunakan FFmpeg.
     Mendukung konversi video/audio dengan kualitas yang dapat diatur.
+    threads limits the FFmpeg decoder and encoder threads (0 = all cores).
+    Cancel with cancel_conversion().
     """
-    try:
-        # Reset cancel event
-        cancel_event.clear()
+    # Reset cancel event
+    cancel_event.clear()
+    return run_conversion(input_path, output_path, codec, quality, progress_callback, threads, cancel_event)
 
-        # Get input file duration
-        duration = get_media_duration(input_path)
+def run_conversion(input_path, output_path, codec, quality='medium', progress_callback=None, threads=0,
+                   cancel_event=None):
+    """
+    Like convert_file, but the caller owns the cancel flag: FFmpeg is
+    stopped once cancel_event is set, so a batch or pipeline can share
+    one event without affecting other conversions.
+    """
+    try:
+        # One cached probe gives the duration and the stream layout
+        try:
+            record = probe(input_path)
+        except ProbeError as e:
+            raise Exception(f"Could not read input: {str(e)}")
+        duration = record.get('duration') or 0
         if duration == 0:
             raise Exception("Could not determine media duration")
-
-        # Video quality presets with optimized settings
-        quality_presets = {
-            'highest': {
-                'mp4': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18', '-movflags', '+faststart'],
-                'webm': ['-c:v', 'libvpx-vp9', '-crf', '24', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
-                'mkv': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18'],
-                'avi': ['-c:v', 'libx264', '-preset', 'slow', '-crf', '18']
-            },
-            'high': {
-                'mp4': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20', '-movflags', '+faststart'],
-                'webm': ['-c:v', 'libvpx-vp9', '-crf', '27', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
-                'mkv': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20'],
-                'avi': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '20']
-            },
-            'medium': {
-                'mp4': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23', '-movflags', '+faststart'],
-                'webm': ['-c:v', 'libvpx-vp9', '-crf', '30', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
-                'mkv': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23'],
-                'avi': ['-c:v', 'libx264', '-preset', 'medium', '-crf', '23']
-            },
-            'low': {
-                'mp4': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28', '-movflags', '+faststart'],
-                'webm': ['-c:v', 'libvpx-vp9', '-crf', '35', '-b:v', '0', '-row-mt', '1', '-tile-columns', '2'],
-                'mkv': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28'],
-                'avi': ['-c:v', 'libx264', '-preset', 'veryfast', '-crf', '28']
-            }
-        }
-
-        # Audio codec parameters with optimized settings
-        audio_codec_params = {
-            'mp3': ['-acodec', 'libmp3lame', '-q:a', '2', '-threads', '0'],
-            'ogg': ['-acodec', 'libvorbis', '-q:a', '4', '-threads', '0'],
-            'opus': ['-acodec', 'libopus', '-b:a', '128k', '-threads', '0'],
-            'wav': ['-acodec', 'pcm_s16le', '-threads', '0'],
-            'm4a': ['-c:a', 'aac', '-b:a', '192k', '-threads', '0'],
-            'aac': ['-c:a', 'aac', '-b:a', '192k', '-threads', '0']
-        }
-
-        # Determine if this is an audio-only format
-        is_audio_format = codec.lower() in audio_codec_params
+        if record['streams']:
+            if is_audio_codec(codec) and not first_stream(record, 'audio'):
+                raise Exception("Input has no audio stream")
+            if not is_audio_codec(codec) and not first_stream(record, 'video') and not first_stream(record, 'audio'):
+                raise Exception("Input has no audio or video stream")
 
         # Build FFmpeg command with optimized settings
         command = [
             FFMPEG_PATH,
+            '-threads', str(threads),  # Decoder threads
             '-i', input_path,
             '-y',  # Overwrite output file
-            '-progress', 'pipe:1',  # Output progress to stdout
-            '-threads', '0'  # Use all available CPU threads
+            '-nostats',  # The status line on stderr duplicates -progress
+            '-progress', 'pipe:1'  # Output progress to stdout
         ]
+        command.extend(codec_arguments(codec, quality))
 
-        if is_audio_format:
-            # Audio conversion
-            command.append('-vn')  # No video for audio conversion
-            command.extend(audio_codec_params[codec.lower()])
-        else:
-            # Video conversion
-            # Get extension and quality settings
-            ext = codec.lower()
-            if ext not in quality_presets[quality]:
-                raise Exception(f"Unsupported video format: {codec}")
-
-            # Add video codec parameters
-            command.extend(quality_presets[quality][ext])
-            
-            # Add high-quality audio settings with sample rate
-            command.extend(['-c:a', 'aac', '-b:a', '192k', '-ar', '48000'])
-
-        # Add output file
-        command.append(output_path)
+        # Encoder threads, then the output file
+        command.extend(['-threads', str(threads), output_path])
 
         # Start conversion process
         process = subprocess.Popen(
@@ -125,79 +124,58 @@ def convert_file(input_path, output_path, codec, quality='medium', progress_call
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             universal_newlines=True,
+            encoding='utf-8',
+            errors='replace',
             bufsize=1
         )
+        # Drained while FFmpeg runs; a full stderr pipe would stall it
+        stderr_tail = StderrTail(process.stderr)
 
-        # Track progress
-        frame_count = 0
-        last_progress_time = 0
+        # FFmpeg writes one progress block about twice a second
+        parser = ProgressParser(duration)
         while True:
-            if cancel_event.is_set():
+            if cancel_event is not None and cancel_event.is_set():
                 process.terminate()
+                process.wait()
                 raise Exception("Conversion cancelled by user")
 
             line = process.stdout.readline()
             if not line and process.poll() is not None:
                 break
 
-            # Parse progress information
-            if line.startswith("frame="):
-                try:
-                    frame = re.search(r"frame=\s*(\d+)", line)
-                    time = re.search(r"time=\s*(\d+):(\d+):(\d+)\.(\d+)", line)
-                    speed = re.search(r"speed=\s*(\d+\.?\d*)", line)
-                    bitrate = re.search(r"bitrate=\s*(\d+\.?\d*)", line)
-                    
-                    if frame and time:
-                        frame_count = int(frame.group(1))
-                        h, m, s, ms = map(int, time.groups())
-                        current_time = h * 3600 + m * 60 + s + ms / 100
-                        progress = min(100, (current_time / duration) * 100)
-                        
-                        # Only update progress every 100ms to reduce UI load
-                        current_time_ms = int(current_time * 1000)
-                        if current_time_ms - last_progress_time >= 100:
-                            if progress_callback:
-                                info = {
-                                    'frame': frame_count,
-                                    'time': current_time,
-                                    'duration': duration,
-                                    'progress': progress,
-                                    'speed': float(speed.group(1)) if speed else 0,
-                                    'bitrate': float(bitrate.group(1)) if bitrate else 0
-                                }
-                                progress_callback(info)
-                            last_progress_time = current_time_ms
-                            
-                except Exception as e:
-                    log_error(f"Error parsing progress: {str(e)}")
-                    continue
+            info = parser.feed(line)
+            if info and progress_callback:
+                progress_callback(info)
 
         # Check if conversion was successful
         if process.returncode != 0:
-            error_output = process.stderr.read()
-            raise Exception(f"FFmpeg error: {error_output}")
+            error = stderr_tail.error(process.returncode)
+            log_error(f"FFmpeg failed ({error.cause})", stage='convert', url=input_path,
+                      stderr="\n".join(error.tail))
+            raise error
 
-        # Ensure progress reaches 100%
         if progress_callback:
             progress_callback({
-                'frame': frame_count,
-                'time': duration,
-                'duration': duration,
+                'status': 'complete',
                 'progress': 100,
-                'speed': 0,
-                'bitrate': 0
+                'duration': duration,
+                'output': output_path
             })
 
         return True
 
     except Exception as e:
         error_msg = f"Conversion error: {str(e)}"
-        log_error(error_msg)
+        # FFmpeg failures are already logged above, with their stderr tail
+        if not isinstance(e, FFmpegError):
+            log_error(error_msg, stage='convert', url=input_path)
         if progress_callback:
-            progress_callback({'error': error_msg})
+            info = {'error': error_msg}
+            if isinstance(e, FFmpegError):
+                info['cause'] = e.cause
+            progress_callback(info)
         return False
 
 def cancel_conversion():
-    """Cancel the ongoing conversion process."""
+    """Cancel the ongoing single-file conversion (convert_file)."""
     cancel_event.set()
\ No newline at end of file
@@ -0,0 +1,79 @@
+import time
+from Program.Utils import format_size, format_speed, format_eta
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+class ProgressParser:
+    """
+    Incremental parser for `ffmpeg -progress` output. FFmpeg writes one
+    key=value pair per line and ends every block with progress=continue
+    or progress=end; feed() collects the block and returns one event for
+    it, or None while the block is still incomplete.
+    """
+
+    def __init__(self, duration=0, clock=time.monotonic):
+        self.duration = duration or 0
+        self.clock = clock
+        self.start = clock()
+        self._block = {}
+
+    def feed(self, line):
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return None
+        if key != 'progress':
+            self._block[key] = value
+            return None
+        block, self._block = self._block, {}
+        return self._event(block, value == 'end')
+
+    def _event(self, block, done):
+        elapsed = max(self.clock() - self.start, 1e-6)
+
+        # out_time_ms is in microseconds as well (a long-standing FFmpeg quirk)
+        out_us = _int(block.get('out_time_us'))
+        if out_us is None:
+            out_us = _int(block.get('out_time_ms'))
+        position = max(out_us or 0, 0) / 1000000
+
+        speed = _float((block.get('speed') or '').rstrip('x'))
+        if not speed and position:
+            speed = position / elapsed
+
+        size = _int(block.get('total_size')) or 0
+        throughput = size / elapsed
+
+        if done:
+            progress, eta = 100, 0
+        elif self.duration:
+            progress = min(100, position / self.duration * 100)
+            eta = max(self.duration - position, 0) / speed if speed else None
+        else:
+            progress, eta = 0, None
+
+        return {
+            'status': 'converting',
+            'frame': _int(block.get('frame')) or 0,
+            'time': position,
+            'duration': self.duration,
+            'progress': progress,
+            'speed': f"{speed:.2f}x" if speed else 'Unknown',
+            'eta': format_eta(eta) if eta is not None else 'Unknown',
+            'size': format_size(size),
+            'throughput': format_speed(throughput),
+            'speed_factor': speed or 0,
+            'eta_seconds': eta,
+            'bytes': size,
+            'bitrate': _float((block.get('bitrate') or '').replace('kbits/s', '')) or 0,
+            'done': done,
+        }
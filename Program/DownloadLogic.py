@@ -2,17 +2,34 @@ import os
 import json
 import threading
 import re
+import importlib.util
 from datetime import datetime
-from yt_dlp import YoutubeDL
-from tkinter import messagebox
 from Program.Utils import (
     safe_filename, load_config, save_config, add_to_history, 
-    format_size, format_speed, format_eta, log_error
+    format_size, format_speed, format_eta, log_error, find_binary
 )
+from Program.Scheduler import DownloadScheduler, host_key
+from Program.FragmentControl import get_fragment_controller
+from Program.RangedDownload import ranged_options, ranged_youtubedl_class
+from Program.Bandwidth import PRIORITY_WEIGHTS, get_governor
+from Program.Session import get_session, session_youtubedl_class
+from Program.InfoCache import extract_info_cached, get_info_cache
+from Program.Prefetch import Prefetcher
+from Program.FormatSelect import FORMAT_PRESETS, discover_formats, select_format
+from Program.StreamConvert import PipeError, stream_convert
+from Program.FormatRank import FORMAT_POLICIES, format_label, policy_format_spec, rank_formats
+from Program.Playlist import expand_urls, looks_like_playlist
+from Program.Archive import get_archive
+from Program.History import get_history
+from Program.Sync import SeenIndex, new_entries
+from Program.JobStore import JobStore, EXTRACTING, DOWNLOADING, CONVERTING, DONE, FAILED
 
 # Path lokal untuk yt-dlp dan ffmpeg
 YTDLP_PATH = os.path.join("ffmpeg", "bin", "yt-dlp.exe")
-FFMPEG_PATH = os.path.join("ffmpeg", "bin", "ffmpeg.exe")
+FFMPEG_PATH = find_binary("ffmpeg")
+
+# Label format dari UI, contoh: "720p mp4 [f299]"
+FORMAT_LABEL_RE = re.compile(r'\s\[([\w+-]+)\]$')
 
 # Global event untuk pembatalan
 cancel_event = threading.Event()
@@ -21,26 +38,30 @@ cancel_event = threading.Event()
 config_file = 'config.json'
 history_file = 'download_history.json'
 
-def validate_dependencies():
+def validate_dependencies(on_error=None):
     """
     Memvalidasi bahwa semua dependensi (yt-dlp dan ffmpeg) tersedia.
-    Menampilkan pesan error jika dependensi tidak ditemukan.
+    on_error(message) dipanggil jika dependensi tidak ditemukan
+    (misalnya untuk menampilkan dialog di GUI).
     """
     try:
-        if not os.path.isfile(YTDLP_PATH):
-            error_msg = "yt-dlp executable not found. Please install it."
+        if not os.path.isfile(YTDLP_PATH) and importlib.util.find_spec('yt_dlp') is None:
+            error_msg = "yt-dlp not found. Please install it."
             log_error(error_msg)
-            messagebox.showerror("Error", error_msg)
+            if on_error:
+                on_error(error_msg)
             return False
         if not is_ffmpeg_installed():
             error_msg = "FFmpeg executable not found. Please install it."
             log_error(error_msg)
-            messagebox.showerror("Error", error_msg)
+            if on_error:
+                on_error(error_msg)
             return False
         return True
     except Exception as e:
         log_error(f"Error validating dependencies: {str(e)}")
-        messagebox.showerror("Error", f"Error validating dependencies: {str(e)}")
+        if on_error:
+            on_error(f"Error validating dependencies: {str(e)}")
         return False
 
 def is_ffmpeg_installed():
@@ -49,23 +70,102 @@ def is_ffmpeg_installed():
     """
     return os.path.isfile(FFMPEG_PATH)
 
-def fetch_media(url):
+def preload():
+    """
+    Import yt_dlp (and its extractors) ahead of time.
+    yt_dlp is imported lazily so the GUI can paint first; call this from
+    a background thread to warm it up before the first fetch.
+    """
+    try:
+        import yt_dlp
+        from yt_dlp.extractor import gen_extractor_classes
+        gen_extractor_classes()
+    except Exception as e:
+        log_error(f"Preloading yt-dlp failed: {str(e)}", stage='startup')
+
+def parse_format_id(selected_format):
+    """
+    Extract the format ID from a "720p mp4 [f299]" style label.
+    Plain IDs and yt-dlp format specs are returned unchanged.
+    """
+    match = FORMAT_LABEL_RE.search(selected_format)
+    return match.group(1) if match else selected_format.strip()
+
+class _CancelLogger:
+    """
+    yt-dlp logger that aborts an extraction once cancelled() is true.
+    yt-dlp sends every step ("Downloading webpage", ...) to debug(), so the
+    extraction stops before its next request; warnings stay quiet.
+    """
+
+    def __init__(self, cancelled):
+        self.cancelled = cancelled
+
+    def debug(self, message):
+        if self.cancelled():
+            from yt_dlp.utils import DownloadCancelled
+            raise DownloadCancelled("Format fetch cancelled")
+
+    info = debug
+
+    def warning(self, message):
+        pass
+
+    def error(self, message):
+        pass
+
+def _extract_media_info(url, cancelled=None):
+    """Extract (or load from cache) the info dict used by fetch_media."""
+    YoutubeDL = session_youtubedl_class()
+
+    # Create yt-dlp options
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': True,
+        'socket_timeout': 20
+    }
+    if cancelled is not None:
+        ydl_opts['logger'] = _CancelLogger(cancelled)
+    with YoutubeDL(ydl_opts) as ydl:
+        return extract_info_cached(ydl, url)
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+def get_prefetcher():
+    """Return the shared background extractor used by fetch_media."""
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = Prefetcher(_extract_media_info)
+        return _prefetcher
+
+def prefetch_media(urls):
+    """Start extracting info for URLs in the background so a later fetch is instant."""
+    for url in urls:
+        if url.startswith(('http://', 'https://')) and not looks_like_playlist(url):
+            get_prefetcher().prefetch(url)
+
+def discover_batch_formats(urls, selected_format, progress_callback=None, max_workers=None):
+    """
+    Resolve a format choice (preset name or yt-dlp selector) to a concrete
+    format ID for each URL, extracting all URLs concurrently.
+    """
+    spec = FORMAT_PRESETS.get(selected_format, selected_format)
+    return discover_formats(urls, spec, get_prefetcher().get, max_workers, progress_callback)
+
+def fetch_media(url, cancelled=None):
     """
     Fetch available formats for the given URL.
     Returns tuple of (audio_formats, video_formats, title).
     Each format is a tuple of (format_id, description).
+    cancelled is an optional callable; once it returns True the extraction
+    stops before its next request and ([], [], None) is returned.
     """
     try:
-        # Create yt-dlp options
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': True
-        }
-
-        # Get video info
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        # Get video info (from cache or a prefetch in flight when possible)
+        info = get_prefetcher().get(url, cancelled)
             
         if not info:
             return [], [], None
@@ -73,73 +173,25 @@ def fetch_media(url):
         # Get video title
         title = info.get('title', '')
         
-        # Get available formats
-        formats = info.get('formats', [])
-        
-        # Sort formats by quality
-        video_formats = []
-        audio_formats = []
-        
-        for f in formats:
-            format_id = f.get('format_id', '')
-            
-            # Skip formats without necessary info
-            if not format_id:
-                continue
-                
-            # Get format details
-            ext = f.get('ext', '')
-            filesize = f.get('filesize', 0)
-            
-            # Video format
-            if f.get('vcodec', 'none') != 'none':
-                height = f.get('height', 0)
-                fps = f.get('fps', 0)
-                vcodec = f.get('vcodec', '').split('.')[0]
-                
-                # Create format description
-                desc = []
-                if height > 0:
-                    desc.append(f"{height}p")
-                if fps > 0:
-                    desc.append(f"{fps}fps")
-                desc.append(ext)
-                if vcodec:
-                    desc.append(vcodec)
-                if filesize > 0:
-                    desc.append(f"{filesize/1024/1024:.1f}MB")
-                    
-                video_formats.append((format_id, " ".join(desc)))
-                
-            # Audio format
-            elif f.get('acodec', 'none') != 'none':
-                abr = f.get('abr', 0)
-                acodec = f.get('acodec', '').split('.')[0]
-                
-                # Create format description
-                desc = []
-                if abr > 0:
-                    desc.append(f"{abr}kbps")
-                desc.append(ext)
-                if acodec:
-                    desc.append(acodec)
-                if filesize > 0:
-                    desc.append(f"{filesize/1024/1024:.1f}MB")
-                    
-                audio_formats.append((format_id, " ".join(desc)))
-                
-        # Sort by quality (assuming higher format_id = better quality)
-        video_formats.sort(key=lambda x: x[0], reverse=True)
-        audio_formats.sort(key=lambda x: x[0], reverse=True)
+        # Rank formats numerically (missing fields count as 0)
+        audio_ranked, video_ranked = rank_formats(info.get('formats'))
+        video_formats = [(f['format_id'], format_label(f)) for f in video_ranked]
+        audio_formats = [(f['format_id'], format_label(f)) for f in audio_ranked]
         
         return audio_formats, video_formats, title
         
     except Exception as e:
-        log_error(f"Error fetching formats: {str(e)}")
+        if cancelled is not None and cancelled():
+            return [], [], None
+        log_error(f"Error fetching formats: {str(e)}", stage='extract', url=url)
         return [], [], None
 
-def _progress_hook(d, callback=None):
+def _progress_hook(d, callback=None, job=None):
     """Handle download progress updates."""
+    # Abort the running download as soon as the user cancels
+    if cancel_event.is_set():
+        raise Exception("Download cancelled by user")
+
     if not callback:
         return
         
@@ -148,8 +200,8 @@ def _progress_hook(d, callback=None):
         
         if status == 'downloading':
             # Calculate progress
-            total = d.get('total_bytes', 0)
-            downloaded = d.get('downloaded_bytes', 0)
+            total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+            downloaded = d.get('downloaded_bytes') or 0
             
             if total > 0:
                 progress = (downloaded / total) * 100
@@ -168,6 +220,7 @@ def _progress_hook(d, callback=None):
             # Send progress update
             callback({
                 'status': 'downloading',
+                'job': job,
                 'progress': progress,
                 'speed': speed_str,
                 'eta': eta_str,
@@ -175,73 +228,280 @@ def _progress_hook(d, callback=None):
                 'format': d.get('info_dict', {}).get('format', '')
             })
             
-        elif status == 'finished':
-            callback({
-                'status': 'complete'
-            })
-            
     except Exception as e:
-        log_error(f"Progress hook error: {str(e)}")
+        log_error(f"Progress hook error: {str(e)}", job=job, stage='progress')
         callback({
             'status': 'error',
+            'job': job,
             'error': str(e)
         })
 
-def queue_download(urls, output_dir, selected_format, selected_type, progress_callback=None):
-    """Queue downloads for the given URLs."""
+def _locked_callback(callback):
+    """Serialize callback calls coming from several worker threads."""
+    if not callback:
+        return None
+    lock = threading.Lock()
+
+    def wrapper(info):
+        with lock:
+            callback(info)
+    return wrapper
+
+def _result_filepath(info):
+    """Return the final file path yt-dlp wrote for a processed info dict."""
+    downloads = (info or {}).get('requested_downloads') or []
+    if downloads:
+        return downloads[0].get('filepath')
+    return None
+
+def _download_job(job, url, total, ydl_opts, progress_callback=None, store=None, job_id=None,
+                  defer_finish=False):
+    """
+    Download a single URL with its own YoutubeDL instance.
+    With defer_finish the job is left unfinished and (info, title, filepath,
+    total) is returned, so a later stage can call _finish_job() itself.
+    """
+    from yt_dlp.utils import DownloadError
+    YoutubeDL = ranged_youtubedl_class()
+
+    # Fragment/chunk settings adapt to the measured throughput of this job
+    lease = get_fragment_controller().acquire(host_key(url), cancel_event, job_id, url)
+    if lease is None:
+        raise DownloadError("Download cancelled")
+    opts = dict(ydl_opts)
+    # Bytes are charged against the shared bandwidth limit as they arrive
+    throttle = get_governor().register(opts.pop('bandwidth_weight', PRIORITY_WEIGHTS['normal']), cancel_event)
+    opts['bandwidth_throttle'] = throttle.consume
+    opts['logger'] = lease
+    opts['progress_hooks'] = [lease.observe, throttle.observe, lambda d: _progress_hook(d, progress_callback, job)]
+    # Known only after extraction; until then the policy infers it from the formats
+    extracted = {}
+    if opts.get('format') in FORMAT_POLICIES:
+        # Resolve the policy against this video's formats when yt-dlp selects one.
+        # Selection also runs inside extract_info on a cache miss.
+        policy = opts['format']
+        opts['format'] = lambda ctx: ydl.build_format_selector(
+            policy_format_spec(policy, ctx['formats'], extracted.get('duration')) or 'bv*+ba/b'
+        )(ctx)
+
+    try:
+        with YoutubeDL(opts) as ydl:
+            lease.bind(ydl.params)
+            # Get video info first (from cache when possible)
+            if store:
+                store.set_state(job_id, EXTRACTING)
+            info = extract_info_cached(ydl, url)
+            if not info:
+                if store:
+                    store.set_state(job_id, FAILED, error="No video information")
+                return False
+            extracted['duration'] = info.get('duration')
+
+            title = info.get('title', 'Unknown')
+            if store:
+                store.set_state(job_id, DOWNLOADING, title=title)
+
+            # Update progress with video title
+            if progress_callback:
+                progress_callback({
+                    'status': 'start',
+                    'job': job,
+                    'title': title,
+                    'channel': info.get('channel') or info.get('uploader', ''),
+                    'url': url,
+                    'current': job + 1,
+                    'total': total
+                })
+
+            # Download from the extracted info instead of extracting again.
+            # An existing .part file with the same name is resumed by yt-dlp.
+            try:
+                result = ydl.process_ie_result(info, download=True)
+            except DownloadError:
+                if cancel_event.is_set():
+                    raise
+                # Cached stream URLs may have expired; extract fresh and retry
+                get_info_cache().invalidate(url)
+                result = ydl.extract_info(url, download=True)
+    finally:
+        lease.release()
+        throttle.close()
+
+    filepath = _result_filepath(result)
+    if defer_finish:
+        return info, title, filepath, total
+    _finish_job(job, url, total, info, title, filepath, ydl_opts.get('format'), progress_callback, store, job_id)
+    return True
+
+def _finish_job(job, url, total, info, title, filepath, format_spec, progress_callback=None,
+                store=None, job_id=None):
+    """Record a finished job: job store, archive, history and the complete event."""
+    if store:
+        store.set_state(job_id, DONE, filepath=filepath)
+
+    # Remember the video so later batches skip it without any network call
+    if info.get('extractor_key') and info.get('id'):
+        get_archive().add(info['extractor_key'], info['id'], format_spec, filepath)
+
+    # Add to history
+    add_to_history(title, url)
+
+    if progress_callback:
+        progress_callback({
+            'status': 'complete',
+            'job': job,
+            'title': title,
+            'url': url,
+            'current': job + 1,
+            'total': total
+        })
+
+def _fail_job(job, job_id, url, error, store, callback, stage='download'):
+    """Record a failed job; a cancelled job stays resumable."""
+    log_error(f"Error in {stage} of {url}: {str(error)}", job=job_id, stage=stage, url=url)
+    if not cancel_event.is_set():
+        store.set_state(job_id, FAILED, error=str(error))
+        add_to_history(url, url, status='failed')
+    if callback:
+        callback({
+            'status': 'error',
+            'job': job,
+            'error': str(error),
+            'url': url
+        })
+
+def _expanded_entries(urls, format_map, format_id, archive, store, output_dir, selected_type,
+                      codec, quality):
+    """Record lazily expanded playlist entries one by one; yields (url, format, job_id or None)."""
+    for url in urls:
+        url_format = format_map.get(url, format_id)
+        if archive.has_url(url, url_format):
+            yield url, url_format, None
+        else:
+            yield url, url_format, store.enqueue(url, output_dir, url_format, selected_type, codec, quality)
+
+def _run_batch(urls, output_dir, format_id, selected_type, callback, max_workers, max_per_host, store,
+               format_map=None, priority='normal', convert_stage=None, codec=None, quality=None):
+    """
+    Record the URLs in the job store and download them through the scheduler.
+    format_map optionally overrides format_id per URL; priority ('low',
+    'normal', 'high') sets the jobs' share of the bandwidth limit.
+    With a convert_stage (Program.Pipeline.ConvertStage) every downloaded
+    file is handed to it instead of being finished here; codec and quality
+    are its target, saved with the job for resuming.
+    """
+    format_map = format_map or {}
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Create yt-dlp options
+    ydl_opts = {
+        'format': format_id,
+        # The video ID in the name lets archive-import recognise the file later
+        'outtmpl': os.path.join(output_dir, '%(title)s [%(id)s].%(ext)s'),
+        'continuedl': True,
+        'quiet': True,
+        'no_warnings': True,
+        'bandwidth_weight': PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS['normal']),
+        **ranged_options()
+    }
+
+    archive = get_archive()
+    # Playlists and channels are expanded lazily, so the total is unknown
+    if hasattr(urls, '__len__') and not any(looks_like_playlist(url) for url in urls):
+        total = len(urls)
+        # Record the whole list in one transaction before scheduling, so a
+        # crash leaves every URL resumable
+        rows = [(url, format_map.get(url, format_id)) for url in urls]
+        fresh = [row for row in rows if not archive.has_url(*row)]
+        ids = store.enqueue_many([(url, output_dir, url_format, selected_type, codec, quality)
+                                  for url, url_format in fresh])
+        ids = dict(zip(fresh, ids))
+        entries = [(url, url_format, ids.get((url, url_format))) for url, url_format in rows]
+    else:
+        total = 0
+        entries = _expanded_entries(expand_urls(urls), format_map, format_id, archive, store,
+                                    output_dir, selected_type, codec, quality)
+    job_ids = []
+    job_formats = []
+
+    def pending_urls():
+        # Finished and archived URLs are skipped
+        for url, url_format, job_id in entries:
+            if job_id is None:
+                if callback:
+                    callback({'status': 'skipped', 'url': url})
+                continue
+            job_ids.append(job_id)
+            job_formats.append(url_format)
+            yield url
+
+    def worker(job, url):
+        job_id = job_ids[job]
+        job_opts = dict(ydl_opts, format=job_formats[job])
+        if convert_stage is None:
+            try:
+                _download_job(job, url, total, job_opts, callback, store, job_id)
+            except Exception as e:
+                _fail_job(job, job_id, url, e, store, callback)
+            return
+
+        # Backpressure: wait until the convert stage has room for another file
+        if not convert_stage.acquire():
+            return
+        handed_off = False
+        try:
+            result = _download_job(job, url, total, job_opts, callback, store, job_id, defer_finish=True)
+            if result:
+                store.set_state(job_id, CONVERTING, filepath=result[2])
+                convert_stage.submit(job, job_id, url, result)
+                handed_off = True
+        except Exception as e:
+            _fail_job(job, job_id, url, e, store, callback)
+        finally:
+            if not handed_off:
+                convert_stage.release()
+
+    # Start download
+    scheduler = DownloadScheduler(max_workers, max_per_host, cancel_event)
+    scheduler.run(pending_urls(), worker)
+
+def _concurrency_limits(max_workers, max_per_host):
+    config = load_config()
+    if max_workers is None:
+        max_workers = config.get('max_concurrent_downloads', 3)
+    if max_per_host is None:
+        max_per_host = config.get('max_downloads_per_host', 2)
+    return max_workers, max_per_host
+
+def queue_download(urls, output_dir, selected_format, selected_type, progress_callback=None,
+                   max_workers=None, max_per_host=None, format_map=None, priority='normal'):
+    """
+    Queue downloads for the given URLs.
+    Up to max_workers URLs are downloaded at once (max_per_host per host);
+    both default to the values in config.json. Jobs are persisted so an
+    interrupted batch can be picked up again with resume_downloads().
+    format_map ({url: format_id}, e.g. from discover_batch_formats)
+    overrides selected_format per URL. priority ('low', 'normal', 'high')
+    weights the batch's share of the bandwidth limit.
+    """
     try:
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
+        # Reset cancel event
+        cancel_event.clear()
+
         # Extract format ID from the selected format string
         # Format string looks like "720p mp4 [f299]"
-        format_id = selected_format.split('[')[-1].strip(']')
-        
-        # Create yt-dlp options
-        ydl_opts = {
-            'format': format_id,
-            'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
-            'progress_hooks': [lambda d: _progress_hook(d, progress_callback)],
-            'quiet': True,
-            'no_warnings': True
-        }
-        
-        # Start download
-        with YoutubeDL(ydl_opts) as ydl:
-            for url in urls:
-                try:
-                    # Get video info first
-                    info = ydl.extract_info(url, download=False)
-                    if not info:
-                        continue
-                        
-                    # Update progress with video title
-                    if progress_callback:
-                        progress_callback({
-                            'status': 'start',
-                            'title': info.get('title', 'Unknown'),
-                            'url': url
-                        })
-                    
-                    # Download video
-                    ydl.download([url])
-                    
-                    # Add to history
-                    add_to_history(info.get('title', 'Unknown'))
-                    
-                except Exception as e:
-                    log_error(f"Error downloading {url}: {str(e)}")
-                    if progress_callback:
-                        progress_callback({
-                            'status': 'error',
-                            'error': str(e),
-                            'url': url
-                        })
-                    continue
+        format_id = parse_format_id(selected_format)
+
+        max_workers, max_per_host = _concurrency_limits(max_workers, max_per_host)
+        callback = _locked_callback(progress_callback)
+
+        _run_batch(urls, output_dir, format_id, selected_type, callback,
+                   max_workers, max_per_host, JobStore(), format_map, priority)
             
         # Signal completion
-        if progress_callback:
-            progress_callback({'status': 'complete'})
+        if callback:
+            callback({'status': 'complete'})
             
         return True
         
@@ -254,25 +514,345 @@ def queue_download(urls, output_dir, selected_format, selected_type, progress_ca
             })
         return False
 
+def pending_job_count():
+    """Return how many jobs were left unfinished by a previous run."""
+    try:
+        return JobStore().count_incomplete()
+    except Exception as e:
+        log_error(f"Could not read job queue: {str(e)}")
+        return 0
+
+def discard_pending_jobs():
+    """Drop the unfinished jobs of a previous run instead of resuming them."""
+    try:
+        JobStore().discard_incomplete()
+    except Exception as e:
+        log_error(f"Could not discard job queue: {str(e)}")
+
+def resume_downloads(progress_callback=None, max_workers=None, max_per_host=None):
+    """Resume every unfinished job from the job store."""
+    try:
+        cancel_event.clear()
+        store = JobStore()
+
+        # Group jobs that share the same download and conversion options
+        groups = {}
+        for job in store.incomplete_jobs():
+            key = (job['output_dir'], job['format_id'], job['selected_type'],
+                   job['convert_codec'], job['convert_quality'])
+            groups.setdefault(key, []).append(job['url'])
+
+        max_workers, max_per_host = _concurrency_limits(max_workers, max_per_host)
+        callback = _locked_callback(progress_callback)
+
+        for (output_dir, format_id, selected_type, codec, quality), urls in groups.items():
+            if cancel_event.is_set():
+                break
+            if codec:
+                # Interrupted download+convert jobs: the finished source is reused
+                # by yt-dlp and converted again
+                _run_converting_batch(urls, output_dir, format_id, selected_type, codec,
+                                      quality or 'medium', callback, max_workers, max_per_host, store)
+            else:
+                _run_batch(urls, output_dir, format_id, selected_type, callback,
+                           max_workers, max_per_host, store)
+
+        if callback:
+            callback({'status': 'complete'})
+        return True
+
+    except Exception as e:
+        log_error(f"Resume error: {str(e)}")
+        if progress_callback:
+            progress_callback({
+                'status': 'error',
+                'error': str(e)
+            })
+        return False
+
+def sync_playlists(sources, output_dir, selected_format, selected_type, progress_callback=None,
+                   stop_after_seen=None, priority='normal', max_workers=None, max_per_host=None):
+    """
+    Download only the entries of each playlist/channel that were not synced before.
+    An entry is marked as seen once its download completes; failed items
+    are remembered and retried by the next sync even when enumeration
+    stops before reaching them. max_workers/max_per_host default to
+    config.json like queue_download().
+    """
+    try:
+        cancel_event.clear()
+        format_id = parse_format_id(selected_format)
+        config = load_config()
+        if stop_after_seen is None:
+            stop_after_seen = config.get('sync_stop_after_seen', 1)
+
+        max_workers, max_per_host = _concurrency_limits(max_workers, max_per_host)
+        callback = _locked_callback(progress_callback)
+        index = SeenIndex()
+        store = JobStore()
+
+        for source in sources:
+            if cancel_event.is_set():
+                break
+
+            entries = new_entries(source, index, stop_after_seen)
+            if callback:
+                callback({'status': 'sync', 'url': source, 'new': len(entries)})
+            if not entries:
+                continue
+
+            keys = dict(entries)
+
+            def mark_done(info, source=source, keys=keys):
+                # Items the job store already had finished count as seen too
+                if info.get('status') in ('complete', 'skipped') and info.get('url') in keys:
+                    index.mark_seen(source, keys[info['url']])
+                elif info.get('status') == 'error' and info.get('url') in keys:
+                    index.mark_failed(source, keys[info['url']], info['url'])
+                if callback:
+                    callback(info)
+
+            _run_batch([url for url, _ in entries], output_dir, format_id, selected_type,
+                       mark_done, max_workers, max_per_host, store, priority=priority)
+
+        if callback:
+            callback({'status': 'complete'})
+        return True
+
+    except Exception as e:
+        log_error(f"Sync error: {str(e)}")
+        if progress_callback:
+            progress_callback({
+                'status': 'error',
+                'error': str(e)
+            })
+        return False
+
+def _stream_job(job, url, total, output_dir, codec, quality, callback=None):
+    """
+    Download one URL straight into ffmpeg and write it as codec. Merged or
+    fragmented formats, and streams ffmpeg cannot read from a pipe, are
+    downloaded to a file and converted afterwards instead.
+    """
+    from Program import ConvertLogic
+    YoutubeDL = ranged_youtubedl_class()
+
+    throttle = get_governor().register(PRIORITY_WEIGHTS['normal'], cancel_event)
+    hook = lambda d: (throttle.observe(d), _progress_hook(d, callback, job))
+    ydl_opts = {
+        'format': 'ba/b' if ConvertLogic.is_audio_codec(codec) else 'b',
+        # Only used by the fallback, kept apart from the converted file
+        'outtmpl': os.path.join(output_dir, '%(title)s [%(id)s].source.%(ext)s'),
+        'quiet': True,
+        'no_warnings': True,
+        'progress_hooks': [hook],
+        'bandwidth_throttle': throttle.consume,
+        **ranged_options()
+    }
+    try:
+        with YoutubeDL(ydl_opts) as ydl:
+            info = extract_info_cached(ydl, url)
+            if not info:
+                raise Exception("No video information")
+            title = info.get('title', 'Unknown')
+            output_path = os.path.join(output_dir, f"{safe_filename(title)} [{info.get('id')}].{codec.lower()}")
+            if callback:
+                callback({'status': 'start', 'job': job, 'title': title, 'url': url,
+                          'channel': info.get('channel') or info.get('uploader', ''),
+                          'current': job + 1, 'total': total})
+
+            chosen = select_format(ydl, info, ydl_opts['format'])
+            pipeable = (
+                chosen is not None
+                and not chosen.get('requested_formats')
+                and not chosen.get('fragments')
+                and chosen.get('protocol') in ('http', 'https')
+            )
+            try:
+                if not pipeable:
+                    raise PipeError("Format cannot be streamed")
+                headers = dict(chosen.get('http_headers') or {})
+                cookie = ydl.cookiejar.get_cookie_header(chosen['url'])
+                if cookie:
+                    headers['Cookie'] = cookie
+                stream_convert(
+                    chosen['url'], output_path, FFMPEG_PATH,
+                    ConvertLogic.codec_arguments(codec, quality),
+                    headers=headers,
+                    session=get_session().http_session(),
+                    total_bytes=chosen.get('filesize'),
+                    progress_hook=hook,
+                    throttle=throttle.consume,
+                    info=chosen
+                )
+            except PipeError as e:
+                if cancel_event.is_set():
+                    raise
+                log_error(f"Streaming conversion not possible, converting after download: {str(e)}",
+                          job=job, stage='convert', url=url)
+                result = ydl.process_ie_result(info, download=True)
+                source = _result_filepath(result)
+                # Within the shared core budget; stops with the downloads (cancel_process())
+                from Program.ConvertBatch import convert_with_budget
+                if not source or not convert_with_budget(source, output_path, codec, quality,
+                                                         cancel_event=cancel_event):
+                    raise Exception("Conversion failed")
+                os.remove(source)
+    finally:
+        throttle.close()
+
+    add_to_history(title, url)
+    if callback:
+        callback({'status': 'complete', 'job': job, 'title': title, 'url': url,
+                  'filepath': output_path, 'current': job + 1, 'total': total})
+
+def stream_download(urls, output_dir, codec, quality='medium', progress_callback=None,
+                    max_workers=None, max_per_host=None):
+    """
+    Download and convert URLs in one pass: each stream is piped into ffmpeg
+    and written directly as codec (mp3, opus, m4a, ...), so the original
+    file never touches the disk. Progress and cancel work like queue_download.
+    """
+    try:
+        cancel_event.clear()
+        os.makedirs(output_dir, exist_ok=True)
+        max_workers, max_per_host = _concurrency_limits(max_workers, max_per_host)
+        callback = _locked_callback(progress_callback)
+
+        if hasattr(urls, '__len__') and not any(looks_like_playlist(url) for url in urls):
+            total = len(urls)
+        else:
+            total = 0
+            urls = expand_urls(urls)
+
+        def worker(job, url):
+            try:
+                _stream_job(job, url, total, output_dir, codec, quality, callback)
+            except Exception as e:
+                log_error(f"Error converting {url}: {str(e)}", job=job, stage='convert', url=url)
+                if not cancel_event.is_set():
+                    add_to_history(url, url, status='failed')
+                if callback:
+                    callback({'status': 'error', 'job': job, 'error': str(e), 'url': url})
+
+        DownloadScheduler(max_workers, max_per_host, cancel_event).run(urls, worker)
+
+        if callback:
+            callback({'status': 'complete'})
+        return True
+
+    except Exception as e:
+        log_error(f"Streaming conversion error: {str(e)}")
+        if progress_callback:
+            progress_callback({
+                'status': 'error',
+                'error': str(e)
+            })
+        return False
+
+def _run_converting_batch(urls, output_dir, format_id, selected_type, codec, quality, callback,
+                          max_workers, max_per_host, store, convert_workers=None, max_pending=None,
+                          priority='normal'):
+    """
+    Run _run_batch with a ConvertStage that converts every downloaded file to codec.
+    Conversions stop with the downloads (cancel_process()), not with the Convert tabs.
+    """
+    from Program.ConvertBatch import convert_with_budget, thread_plan
+    from Program.Pipeline import ConvertStage
+
+    config = load_config()
+    if convert_workers is None:
+        convert_workers = config.get('convert_workers', 1)
+    if max_pending is None:
+        max_pending = config.get('convert_max_pending')
+    # Conversions share the core budget with any batch conversion
+    _, threads = thread_plan(codec, convert_workers)
+
+    def convert(job, url, result):
+        info, title, source, _ = result
+        if not source:
+            raise Exception("Downloaded file not found")
+        output_path = f"{os.path.splitext(source)[0]}.{codec.lower()}"
+        if output_path == source:
+            return source
+
+        def forward(update):
+            if callback and update.get('status') == 'converting':
+                callback({'status': 'converting', 'job': job, 'title': title, 'url': url,
+                          'progress': update['progress'], 'speed': update['speed'],
+                          'eta': update['eta']})
+
+        if not convert_with_budget(source, output_path, codec, quality, forward, threads, cancel_event):
+            raise Exception("Conversion failed")
+        os.remove(source)
+        return output_path
+
+    def finish(job, job_id, url, result, output):
+        info, title, _, total = result
+        _finish_job(job, url, total, info, title, output, format_id, callback, store, job_id)
+
+    def fail(job, job_id, url, error):
+        _fail_job(job, job_id, url, error, store, callback, stage='convert')
+
+    stage = ConvertStage(convert, finish, fail, convert_workers, max_pending, cancel_event)
+    try:
+        _run_batch(urls, output_dir, format_id, selected_type, callback, max_workers, max_per_host,
+                   store, priority=priority, convert_stage=stage, codec=codec, quality=quality)
+    finally:
+        stage.close()
+
+def download_and_convert(urls, output_dir, selected_format, selected_type, codec, quality='medium',
+                         progress_callback=None, max_workers=None, max_per_host=None,
+                         convert_workers=None, max_pending=None, priority='normal'):
+    """
+    Download URLs like queue_download and convert each file to codec as soon
+    as it is complete, while the next downloads keep running. At most
+    max_pending downloaded files wait for conversion; further downloads
+    wait for a free slot instead of filling the disk. convert_workers and
+    max_pending default to config.json (convert_workers,
+    convert_max_pending). The target is saved with each job, so
+    resume_downloads() converts interrupted jobs too.
+    """
+    try:
+        cancel_event.clear()
+        format_id = parse_format_id(selected_format)
+        max_workers, max_per_host = _concurrency_limits(max_workers, max_per_host)
+        callback = _locked_callback(progress_callback)
+
+        _run_converting_batch(urls, output_dir, format_id, selected_type, codec, quality, callback,
+                              max_workers, max_per_host, JobStore(), convert_workers, max_pending,
+                              priority)
+
+        if callback:
+            callback({'status': 'complete'})
+        return True
+
+    except Exception as e:
+        log_error(f"Download and convert error: {str(e)}")
+        if progress_callback:
+            progress_callback({
+                'status': 'error',
+                'error': str(e)
+            })
+        return False
+
 def cancel_process():
     """Membatalkan proses unduhan."""
     cancel_event.set()
 
-def show_history():
+def show_history(limit=100, offset=0, name=None, status=None, since=None, until=None):
     """Menampilkan riwayat pengunduhan."""
     try:
-        if os.path.exists(history_file):
-            with open(history_file, 'r') as f:
-                history = json.load(f)
-                if not history:
-                    return "Belum ada riwayat unduhan."
-                
-                result = "Riwayat Unduhan:\n\n"
-                for entry in reversed(history):
-                    result += f"{entry['name']} - {entry['date']}\n"
-                return result
-        return "Belum ada riwayat unduhan."
+        entries = get_history().query(limit, offset, name, status, since, until)
+        if not entries:
+            return "Belum ada riwayat unduhan."
+
+        lines = ["Riwayat Unduhan:", ""]
+        for entry in entries:
+            suffix = "" if entry['status'] == 'done' else f" [{entry['status']}]"
+            lines.append(f"{entry['name']} - {entry['date']}{suffix}")
+        return "\n".join(lines) + "\n"
     except Exception as e:
         error_msg = f"Error showing history: {str(e)}"
         log_error(error_msg)
-        return error_msg
\ No newline at end of file
+        return error_msg
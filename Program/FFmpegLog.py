@@ -0,0 +1,96 @@
+import threading
+from collections import deque
+
+# Ukuran ring buffer stderr per proses FFmpeg
+TAIL_LINES = 40
+MAX_LINE = 1000
+
+# Penyebab kegagalan FFmpeg -> potongan teks stderr yang menandainya
+ERROR_PATTERNS = (
+    ('disk_full', ('No space left on device', 'Disk quota exceeded')),
+    ('codec_missing', ('Unknown encoder', 'Encoder not found', 'Unknown decoder',
+                       'Decoder not found', 'Unsupported codec', 'encoder not found')),
+    ('no_streams', ('does not contain any stream', 'matches no streams',
+                    'Output file is empty', 'no audio stream', 'no video stream')),
+    ('invalid_input', ('Invalid data found when processing input', 'moov atom not found',
+                       'No such file or directory', 'could not find codec parameters',
+                       'EBML header parsing failed', 'Error opening input', 'End of file')),
+)
+
+CAUSE_MESSAGES = {
+    'disk_full': "Not enough disk space",
+    'codec_missing': "This FFmpeg build does not support the codec",
+    'no_streams': "Input has no stream that can be converted",
+    'invalid_input': "Input is damaged or not a media file",
+    'unknown': "FFmpeg failed",
+}
+
+class FFmpegError(Exception):
+    """FFmpeg exited with an error; cause is one of CAUSE_MESSAGES."""
+
+    def __init__(self, cause, detail, tail):
+        self.cause = cause
+        self.detail = detail
+        self.tail = tail
+        super().__init__(f"{CAUSE_MESSAGES[cause]}: {detail}" if detail else CAUSE_MESSAGES[cause])
+
+def classify_stderr(lines):
+    """Return (cause, the line that shows it) for FFmpeg stderr lines."""
+    for line in reversed(lines):
+        for cause, patterns in ERROR_PATTERNS:
+            if any(pattern in line for pattern in patterns):
+                return cause, line
+    return 'unknown', lines[-1] if lines else ''
+
+class StderrTail:
+    """
+    Reads a process's stderr on a background thread so the pipe never
+    fills up and blocks FFmpeg. Only the last TAIL_LINES lines (each cut
+    to MAX_LINE characters) are kept, so memory stays constant however
+    much FFmpeg writes.
+    """
+
+    def __init__(self, stream, max_lines=TAIL_LINES):
+        self.lines = deque(maxlen=max_lines)
+        self._stream = stream
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self):
+        try:
+            while True:
+                line = self._stream.readline(MAX_LINE)
+                if not line:
+                    break
+                # Drop the rest of an over-long line so it takes one slot
+                newline = b'\n' if isinstance(line, bytes) else '\n'
+                chunk = line
+                while len(chunk) == MAX_LINE and not chunk.endswith(newline):
+                    chunk = self._stream.readline(MAX_LINE)
+                if isinstance(line, bytes):
+                    line = line.decode('utf-8', 'replace')
+                line = line.rstrip()
+                if line:
+                    self.lines.append(line)
+        except (OSError, ValueError):
+            pass
+        finally:
+            try:
+                self._stream.close()
+            except OSError:
+                pass
+
+    def join(self, timeout=5):
+        self._thread.join(timeout)
+
+    def text(self):
+        return "\n".join(self.lines)
+
+    def error(self, returncode=None):
+        """FFmpegError describing the failure, from the collected tail."""
+        self.join()
+        lines = list(self.lines)
+        cause, detail = classify_stderr(lines)
+        if not detail and returncode is not None:
+            detail = f"exited with {returncode}"
+        return FFmpegError(cause, detail, lines)
@@ -0,0 +1,188 @@
+import statistics
+from Program.Utils import load_config
+
+# Efisiensi relatif codec: kualitas yang sama dengan bitrate lebih kecil
+VIDEO_CODEC_EFFICIENCY = {
+    'av01': 1.6,
+    'hev1': 1.4, 'hvc1': 1.4, 'h265': 1.4,
+    'vp09': 1.35, 'vp9': 1.35,
+    'avc1': 1.0, 'avc3': 1.0, 'h264': 1.0,
+    'vp8': 0.8,
+    'mp4v': 0.7,
+}
+AUDIO_CODEC_EFFICIENCY = {
+    'opus': 1.5,
+    'vorbis': 1.1,
+    'mp4a': 1.0, 'aac': 1.0, 'ec-3': 1.0,
+    'ac-3': 0.9,
+    'mp3': 0.85,
+}
+
+# Policy names accepted wherever a yt-dlp format selector is accepted
+BANDWIDTH_SAVING = 'bandwidth-saving'
+BANDWIDTH_SAVING_AUDIO = 'bandwidth-saving-audio'
+FORMAT_POLICIES = (BANDWIDTH_SAVING, BANDWIDTH_SAVING_AUDIO)
+
+def _number(value):
+    """Numeric value of a format field; None and garbage count as 0."""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def codec_name(codec):
+    return (codec or '').split('.')[0].lower()
+
+def has_video(fmt):
+    return fmt.get('vcodec', 'none') not in ('none', None)
+
+def has_audio(fmt):
+    return fmt.get('acodec', 'none') not in ('none', None)
+
+def resolution(fmt):
+    """Short side of the frame, so portrait videos rank like landscape ones."""
+    width, height = _number(fmt.get('width')), _number(fmt.get('height'))
+    return min(width, height) if width and height else height
+
+def bitrate(fmt):
+    """Total bitrate in kbit/s, or 0 if unknown."""
+    return _number(fmt.get('tbr')) or _number(fmt.get('vbr')) + _number(fmt.get('abr'))
+
+def estimate_size(fmt, duration=None):
+    """Expected size in bytes from filesize, filesize_approx or bitrate × duration."""
+    size = _number(fmt.get('filesize')) or _number(fmt.get('filesize_approx'))
+    if not size and duration:
+        size = bitrate(fmt) * _number(duration) * 125
+    return size or None
+
+def infer_duration(formats):
+    """Estimate the duration from formats that report both size and bitrate."""
+    samples = [
+        _number(f.get('filesize') or f.get('filesize_approx')) * 8 / (bitrate(f) * 1000)
+        for f in formats
+        if bitrate(f) and (f.get('filesize') or f.get('filesize_approx'))
+    ]
+    return statistics.median(samples) if samples else None
+
+def video_score(fmt):
+    """Sort key for video quality: resolution, frame rate, codec efficiency, bitrate."""
+    efficiency = VIDEO_CODEC_EFFICIENCY.get(codec_name(fmt.get('vcodec')), 1.0)
+    return (resolution(fmt), _number(fmt.get('fps')), efficiency, bitrate(fmt))
+
+def audio_score(fmt):
+    """Sort key for audio quality: bitrate weighted by codec efficiency."""
+    abr = _number(fmt.get('abr')) or bitrate(fmt)
+    return (abr * AUDIO_CODEC_EFFICIENCY.get(codec_name(fmt.get('acodec')), 1.0), abr)
+
+def format_label(fmt):
+    """Description used in the format menus, e.g. '1080p 60fps mp4 avc1 45.2MB'."""
+    desc = []
+    if has_video(fmt):
+        height, fps = _number(fmt.get('height')), _number(fmt.get('fps'))
+        if height > 0:
+            desc.append(f"{height:.0f}p")
+        if fps > 0:
+            desc.append(f"{fps:g}fps")
+        desc.append(fmt.get('ext', ''))
+        desc.append(codec_name(fmt.get('vcodec')))
+    else:
+        abr = _number(fmt.get('abr')) or bitrate(fmt)
+        if abr > 0:
+            desc.append(f"{abr:.0f}kbps")
+        desc.append(fmt.get('ext', ''))
+        desc.append(codec_name(fmt.get('acodec')))
+
+    filesize = _number(fmt.get('filesize'))
+    approx = _number(fmt.get('filesize_approx'))
+    if filesize > 0:
+        desc.append(f"{filesize/1024/1024:.1f}MB")
+    elif approx > 0:
+        desc.append(f"~{approx/1024/1024:.1f}MB")
+    return " ".join(d for d in desc if d)
+
+def rank_formats(formats):
+    """
+    Split formats into audio-only and video lists, each sorted best first.
+    Formats without an ID, storyboards and DRM streams are left out.
+    """
+    video_formats = []
+    audio_formats = []
+    for f in formats or []:
+        if not f.get('format_id') or f.get('has_drm'):
+            continue
+        if has_video(f):
+            video_formats.append(f)
+        elif has_audio(f):
+            audio_formats.append(f)
+    video_formats.sort(key=video_score, reverse=True)
+    audio_formats.sort(key=audio_score, reverse=True)
+    return audio_formats, video_formats
+
+def _cheapest(candidates, meets, cost, score):
+    """
+    Pick the lowest-cost candidate that meets the target. If none does,
+    fall back to the best one available. Unknown costs sort last.
+    """
+    if not candidates:
+        return None
+    good = [f for f in candidates if meets(f)]
+    if not good:
+        return max(candidates, key=score)
+    return min(good, key=lambda f: (cost(f) is None, cost(f) or 0, tuple(-x for x in score(f))))
+
+def pick_audio(formats, target_abr, duration=None):
+    """Smallest audio-only format whose efficiency-weighted bitrate reaches target_abr."""
+    audio_formats, _ = rank_formats(formats)
+    return _cheapest(
+        audio_formats,
+        lambda f: audio_score(f)[0] >= target_abr,
+        lambda f: estimate_size(f, duration),
+        audio_score
+    )
+
+def pick_video(formats, target_height, audio=None, duration=None):
+    """
+    Smallest video format at least target_height tall. Video-only formats
+    are costed together with the audio stream they would be merged with.
+    """
+    _, video_formats = rank_formats(formats)
+    audio_size = estimate_size(audio, duration) if audio else 0
+
+    def cost(f):
+        size = estimate_size(f, duration)
+        if size is None or has_audio(f):
+            return size
+        return size + (audio_size or 0)
+
+    return _cheapest(
+        video_formats,
+        lambda f: resolution(f) >= target_height,
+        cost,
+        video_score
+    )
+
+def policy_format_spec(policy, formats, duration=None, target_height=None, target_abr=None):
+    """
+    Resolve a format policy to a concrete yt-dlp format spec ('137+251' or
+    '140') for one video's formats, or None if nothing usable is available.
+    Targets default to bandwidth_saving_height / bandwidth_saving_abr in config.json.
+    """
+    if target_height is None or target_abr is None:
+        config = load_config()
+        if target_height is None:
+            target_height = config.get('bandwidth_saving_height', 720)
+        if target_abr is None:
+            target_abr = config.get('bandwidth_saving_abr', 96)
+    if duration is None:
+        duration = infer_duration(formats or [])
+
+    audio = pick_audio(formats, target_abr, duration)
+    if policy == BANDWIDTH_SAVING_AUDIO:
+        return audio['format_id'] if audio else None
+
+    video = pick_video(formats, target_height, audio, duration)
+    if video is None:
+        return audio['format_id'] if audio else None
+    if has_audio(video) or audio is None:
+        return video['format_id']
+    return f"{video['format_id']}+{audio['format_id']}"
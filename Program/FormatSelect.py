@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from Program.Utils import load_config, log_error
+from Program.FormatRank import BANDWIDTH_SAVING, BANDWIDTH_SAVING_AUDIO, FORMAT_POLICIES, policy_format_spec
+
+# Pilihan format abstrak -> selector yt-dlp
+# Format default per tipe unduhan
+DEFAULT_FORMATS = {
+    'video': 'bv*+ba/b',
+    'audio': 'ba/b',
+}
+
+FORMAT_PRESETS = OrderedDict([
+    ("Best video + audio", "bv*+ba/b"),
+    ("Best ≤1080p h264", "bv*[height<=1080][vcodec^=avc1]+ba[ext=m4a]/b[height<=1080][vcodec^=avc1]/bv*[height<=1080]+ba/b[height<=1080]"),
+    ("Best ≤720p", "bv*[height<=720]+ba/b[height<=720]"),
+    ("Best opus audio", "ba[acodec=opus]/ba/b"),
+    ("Best m4a audio", "ba[ext=m4a]/ba/b"),
+    ("Best audio", "ba/b"),
+    ("Bandwidth saving", BANDWIDTH_SAVING),
+    ("Bandwidth saving audio", BANDWIDTH_SAVING_AUDIO),
+])
+
+def describe_format(fmt):
+    """Short human readable description of a (possibly merged) format."""
+    parts = fmt.get('requested_formats') or [fmt]
+    desc = []
+    for f in parts:
+        if f.get('vcodec', 'none') != 'none':
+            height = f.get('height')
+            desc.append(f"{height}p {f.get('vcodec', '').split('.')[0]}" if height else f.get('vcodec', ''))
+        if f.get('acodec', 'none') != 'none':
+            desc.append(f.get('acodec', '').split('.')[0])
+    desc.append(fmt.get('ext', ''))
+    return " ".join(d for d in desc if d)
+
+def select_format(ydl, info, spec):
+    """
+    Resolve a yt-dlp format selector against an info dict without downloading.
+    Returns the chosen format dict, or None if nothing matches.
+    """
+    formats = info.get('formats') or []
+    if not formats:
+        return None
+    if spec in FORMAT_POLICIES:
+        spec = policy_format_spec(spec, formats, info.get('duration'))
+        if spec is None:
+            return None
+    selector = ydl.build_format_selector(spec)
+    ctx = {
+        'formats': formats,
+        'has_merged_format': any('none' not in (f.get('acodec'), f.get('vcodec')) for f in formats),
+        'incomplete_formats': (all(f.get('vcodec') == 'none' for f in formats)
+                               or all(f.get('acodec') == 'none' for f in formats)),
+    }
+    return next(iter(selector(ctx)), None)
+
+def discover_formats(urls, spec, get_info, max_workers=None, progress_callback=None):
+    """
+    Resolve one abstract format choice to a concrete format ID for every URL.
+    Extraction runs concurrently (max_workers, default from config.json).
+    Returns a list of {'url', 'title', 'format_id', 'description', 'error'}
+    in the order of urls.
+    """
+    from yt_dlp import YoutubeDL
+
+    if max_workers is None:
+        max_workers = load_config().get('format_discovery_workers', 4)
+
+    # build_format_selector only needs the params, so one instance is shared
+    ydl = YoutubeDL({'quiet': True, 'no_warnings': True})
+
+    def resolve(url):
+        row = {'url': url, 'title': '', 'format_id': None, 'description': '', 'error': None}
+        try:
+            info = get_info(url)
+            if not info:
+                row['error'] = "Could not fetch video information"
+                return row
+            row['title'] = info.get('title', '')
+            chosen = select_format(ydl, info, spec)
+            if chosen is None:
+                row['error'] = "No matching format"
+            else:
+                row['format_id'] = chosen['format_id']
+                row['description'] = describe_format(chosen)
+        except Exception as e:
+            log_error(f"Format discovery failed: {str(e)}", stage='formats', url=url)
+            row['error'] = str(e)
+        if progress_callback:
+            progress_callback(row)
+        return row
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        return list(executor.map(resolve, urls))
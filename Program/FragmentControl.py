@@ -0,0 +1,165 @@
+import time
+import logging
+import threading
+from Program.Logger import log
+from Program.Utils import load_config, log_error
+
+# Pesan yt-dlp yang menandakan server kewalahan / koneksi bermasalah
+ERROR_MARKERS = ('Retrying', 'HTTP Error 429', 'HTTP Error 403', 'timed out', 'Connection reset')
+
+MB = 1024 * 1024
+
+class FragmentLease:
+    """
+    Fragment and chunk settings for one running download.
+    yt-dlp reads concurrent_fragment_downloads and http_chunk_size from its
+    params each time a stream starts, so updates written through bind()
+    apply to the next stream or retry of the same job.
+    """
+
+    def __init__(self, controller, host, fragments, chunk_size, job=None, url=None):
+        self.controller = controller
+        self.host = host
+        self.job = job
+        self.url = url
+        self.fragments = fragments
+        self.chunk_size = chunk_size
+        self._params = None
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_errors = 0
+        self._last_downloaded = {}
+        self._last_rate = None
+
+    def bind(self, params):
+        """Write the current settings into a YoutubeDL params dict and keep it updated."""
+        self._params = params
+        self._apply()
+
+    def _apply(self):
+        if self._params is not None:
+            self._params['concurrent_fragment_downloads'] = self.fragments
+            self._params['http_chunk_size'] = self.chunk_size
+
+    def observe(self, d):
+        """Progress hook: accumulate bytes and close a window every interval seconds."""
+        if d.get('status') != 'downloading':
+            return
+        filename = d.get('filename') or d.get('tmpfilename')
+        downloaded = d.get('downloaded_bytes') or 0
+        self._window_bytes += max(0, downloaded - self._last_downloaded.get(filename, 0))
+        self._last_downloaded[filename] = downloaded
+
+        elapsed = time.monotonic() - self._window_start
+        if elapsed >= self.controller.interval:
+            self.controller.adjust(self, self._window_bytes / elapsed, self._window_errors)
+            self._window_start = time.monotonic()
+            self._window_bytes = 0
+            self._window_errors = 0
+
+    def report_error(self):
+        self._window_errors += 1
+
+    # yt-dlp logger interface; retries count as errors and warnings and
+    # errors still reach app.log
+    def debug(self, message):
+        # Download and fragment retries ("Got error: ... Retrying (n/m)") arrive here
+        if any(marker in message for marker in ERROR_MARKERS):
+            self.report_error()
+
+    def info(self, message):
+        pass
+
+    def warning(self, message):
+        if any(marker in message for marker in ERROR_MARKERS):
+            self.report_error()
+        log(logging.WARNING, message, job=self.job, stage='download', url=self.url)
+
+    def error(self, message):
+        self.report_error()
+        log_error(message, job=self.job, stage='download', url=self.url)
+
+    def release(self):
+        self.controller.release(self)
+
+class FragmentController:
+    """
+    AIMD controller for concurrent fragment downloads and HTTP chunk size.
+    A window without errors and without a drop in throughput adds one
+    fragment and one chunk step; a window with errors halves both. The sum
+    of fragments over all running jobs never exceeds max_total.
+    """
+
+    def __init__(self, initial=4, max_fragments=16, max_total=32, chunk_size=10 * MB,
+                 min_chunk_size=1 * MB, max_chunk_size=50 * MB, interval=5.0):
+        self.initial = initial
+        self.max_fragments = max_fragments
+        self.max_total = max(1, max_total)
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._leases = set()
+        self._learned = {}
+
+    def _in_use(self):
+        return sum(lease.fragments for lease in self._leases)
+
+    def acquire(self, host, cancel_event=None, job=None, url=None):
+        """
+        Start a lease for a job on host, starting from what worked last time.
+        Waits while all max_total fragments are in use; returns None if
+        cancel_event is set meanwhile.
+        """
+        with self._cond:
+            fragments, chunk_size = self._learned.get(host, (self.initial, self.chunk_size))
+            while self._in_use() >= self.max_total:
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                self._cond.wait(0.5)
+            available = self.max_total - self._in_use()
+            lease = FragmentLease(self, host, max(1, min(fragments, available)), chunk_size, job, url)
+            self._leases.add(lease)
+            return lease
+
+    def adjust(self, lease, rate, errors):
+        """Feed one measurement window back into the lease settings."""
+        with self._cond:
+            if errors:
+                lease.fragments = max(1, lease.fragments // 2)
+                lease.chunk_size = max(self.min_chunk_size, lease.chunk_size // 2)
+            elif lease._last_rate is None or rate >= lease._last_rate * 0.95:
+                if lease.fragments < self.max_fragments and self._in_use() < self.max_total:
+                    lease.fragments += 1
+                lease.chunk_size = min(self.max_chunk_size, lease.chunk_size + self.min_chunk_size)
+            elif rate < lease._last_rate * 0.8 and lease.fragments > 1:
+                # The last increase made things worse; step back
+                lease.fragments -= 1
+            lease._last_rate = rate
+            lease._apply()
+            self._cond.notify_all()
+
+    def release(self, lease):
+        with self._cond:
+            if lease in self._leases:
+                self._leases.discard(lease)
+                self._learned[lease.host] = (lease.fragments, lease.chunk_size)
+                self._cond.notify_all()
+
+_controller = None
+_controller_lock = threading.Lock()
+
+def get_fragment_controller():
+    """Return the process-wide fragment controller configured from config.json."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            config = load_config()
+            _controller = FragmentController(
+                initial=config.get('concurrent_fragments', 4),
+                max_fragments=config.get('max_fragments_per_job', 16),
+                max_total=config.get('max_fragments_total', 32),
+                chunk_size=config.get('http_chunk_size_mb', 10) * MB
+            )
+        return _controller
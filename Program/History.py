@@ -0,0 +1,113 @@
+import os
+import json
+import threading
+from datetime import datetime
+from Program.Storage import DB_FILE, get_connection, init_schema
+from Program.Utils import history_file
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        url TEXT,
+        status TEXT NOT NULL,
+        date TEXT NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS history_date ON history (date)",
+    "CREATE INDEX IF NOT EXISTS history_name ON history (name)",
+    "CREATE INDEX IF NOT EXISTS history_status ON history (status, date)",
+]
+
+class HistoryStore:
+    """
+    Append-only download history in SQLite.
+    Appends are a single INSERT; queries are paginated and use the
+    date/name/status indexes.
+    """
+
+    def __init__(self, db_file=DB_FILE, legacy_file=history_file):
+        self.db_file = db_file
+        init_schema('history', SCHEMA, db_file)
+        self._import_legacy(legacy_file)
+
+    def _conn(self):
+        return get_connection(self.db_file)
+
+    def _import_legacy(self, legacy_file):
+        """Copy entries from the old JSON history into an empty table."""
+        if not legacy_file or not os.path.exists(legacy_file):
+            return
+        conn = self._conn()
+        if conn.execute("SELECT 1 FROM history LIMIT 1").fetchone():
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return
+        rows = [
+            (entry.get('name', ''), None, 'done', entry.get('date', ''))
+            for entry in data if isinstance(entry, dict)
+        ] if isinstance(data, list) else []
+        with conn:
+            conn.executemany(
+                "INSERT INTO history (name, url, status, date) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def append(self, name, url=None, status='done'):
+        """Add one history entry."""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT INTO history (name, url, status, date) VALUES (?, ?, ?, ?)",
+                (name, url, status, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+
+    def downloaded_urls(self):
+        """Return {name: url} for completed downloads that recorded their URL."""
+        rows = self._conn().execute(
+            "SELECT name, url FROM history WHERE status = 'done' AND url IS NOT NULL ORDER BY id"
+        )
+        return {name: url for name, url in rows}
+
+    def query(self, limit=50, offset=0, name=None, status=None, since=None, until=None):
+        """
+        Return history entries, newest first.
+        name matches as a substring; since/until are "YYYY-MM-DD[ HH:MM:SS]" strings.
+        """
+        clauses = []
+        params = []
+        if name:
+            clauses.append("name LIKE ?")
+            params.append(f"%{name}%")
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        if since:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until:
+            clauses.append("date <= ?")
+            params.append(until)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._conn().execute(
+            f"SELECT name, url, status, date FROM history {where} "
+            "ORDER BY date DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+_history = None
+_history_lock = threading.Lock()
+
+def get_history():
+    """Return the process-wide history store."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = HistoryStore()
+        return _history
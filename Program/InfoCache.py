@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+import re
+from Program.Utils import load_config, log_error
+
+# Folder cache metadata
+CACHE_DIR = os.path.join('cache', 'info')
+
+# Stream URLs in the info dict expire after a few hours
+DEFAULT_TTL = 3600
+
+YOUTUBE_ID_RE = re.compile(
+    r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/|v/)|youtu\.be/)([0-9A-Za-z_-]{11})'
+)
+
+# Query parameters that don't change what gets extracted
+TRACKING_PARAMS = {'si', 'feature', 'pp', 'ab_channel', 't', 'start_radio'}
+
+# Keys that are large and never used by the app
+HEAVY_KEYS = ('automatic_captions', 'subtitles', 'heatmap', 'thumbnails')
+
+def cache_key(url):
+    """
+    Normalize a URL into a cache key.
+    YouTube URLs collapse to their video id; other URLs drop the fragment
+    and tracking parameters.
+    """
+    url = url.strip()
+    match = YOUTUBE_ID_RE.search(url)
+    if match and 'list=' not in url:
+        return f"youtube:{match.group(1)}"
+
+    parts = urlparse(url)
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith('utm_')
+    ]
+    return urlunparse((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip('/'),
+        parts.params,
+        urlencode(sorted(query)),
+        ''
+    ))
+
+class InfoCache:
+    """
+    Two-level (memory + disk) cache of yt-dlp info dicts with a TTL.
+    Entries are stored as JSON text so every get() returns a fresh copy.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, max_memory=100,
+                 max_disk_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_usage = None
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, url):
+        """Return the cached info dict for url, or None if missing or expired."""
+        key = cache_key(url)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                stored, text = entry
+                if now - stored < self.ttl:
+                    self._memory.move_to_end(key)
+                    return json.loads(text)
+                del self._memory[key]
+
+        path = self._path(key)
+        try:
+            if now - os.path.getmtime(path) >= self.ttl:
+                self._remove_file(path)
+                return None
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            info = json.loads(text)
+        except (OSError, ValueError):
+            return None
+
+        with self._lock:
+            self._remember(key, os.path.getmtime(path), text)
+        return info
+
+    def contains(self, url):
+        """Return True if a fresh entry for url exists, without loading it."""
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[0] < self.ttl:
+                return True
+        try:
+            return now - os.path.getmtime(self._path(key)) < self.ttl
+        except OSError:
+            return False
+
+    def put(self, url, info):
+        """Store a sanitized info dict for url."""
+        if not info:
+            return
+        key = cache_key(url)
+        info = {k: v for k, v in info.items() if k not in HEAVY_KEYS}
+        text = json.dumps(info)
+
+        with self._lock:
+            self._remember(key, time.time(), text)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._track_disk(len(text.encode('utf-8')) - old_size)
+        except OSError as e:
+            log_error(f"Info cache write failed: {str(e)}")
+
+    def invalidate(self, url):
+        """Drop url from both cache levels."""
+        key = cache_key(url)
+        with self._lock:
+            self._memory.pop(key, None)
+        self._remove_file(self._path(key))
+
+    def _remember(self, key, stored, text):
+        """Insert into the memory LRU. Called with the lock held."""
+        self._memory[key] = (stored, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _remove_file(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._track_disk(-size)
+        except OSError:
+            pass
+
+    def _track_disk(self, delta):
+        """Keep a running total of disk usage and evict when over budget."""
+        with self._lock:
+            if self._disk_usage is None:
+                self._disk_usage = sum(size for _, size, _ in self._scan())
+            else:
+                self._disk_usage += delta
+            over_budget = self._disk_usage > self.max_disk_bytes
+
+        if over_budget:
+            self._evict()
+
+    def _scan(self):
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        """Remove the oldest files until disk usage is back under 90% of the budget."""
+        entries = sorted(self._scan())
+        usage = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in entries:
+            if usage <= target:
+                break
+            try:
+                os.remove(path)
+                usage -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_usage = usage
+
+_info_cache = None
+_info_cache_lock = threading.Lock()
+
+def get_info_cache():
+    """Return the process-wide info cache configured from config.json."""
+    global _info_cache
+    with _info_cache_lock:
+        if _info_cache is None:
+            config = load_config()
+            _info_cache = InfoCache(
+                ttl=config.get('info_cache_ttl', DEFAULT_TTL),
+                max_disk_bytes=config.get('info_cache_max_mb', 256) * 1024 * 1024
+            )
+        return _info_cache
+
+def extract_info_cached(ydl, url):
+    """
+    Return the info dict for url, extracting it with ydl only on a cache miss.
+    The result is sanitized so it can be passed to ydl.process_ie_result().
+    """
+    cache = get_info_cache()
+    info = cache.get(url)
+    if info is not None:
+        return info
+
+    info = ydl.extract_info(url, download=False)
+    if not info:
+        return None
+    info = ydl.sanitize_info(info, remove_private_keys=True)
+    # Playlists are expanded elsewhere; only cache single videos
+    if info.get('_type', 'video') == 'video':
+        cache.put(url, info)
+    return info
@@ -0,0 +1,158 @@
+import os
+from datetime import datetime
+from Program.Storage import DB_FILE, get_connection, init_schema
+
+# Status pekerjaan
+QUEUED = 'queued'
+EXTRACTING = 'extracting'
+DOWNLOADING = 'downloading'
+CONVERTING = 'converting'
+DONE = 'done'
+FAILED = 'failed'
+
+STATES = (QUEUED, EXTRACTING, DOWNLOADING, CONVERTING, DONE, FAILED)
+FINISHED_STATES = (DONE, FAILED)
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        url TEXT NOT NULL,
+        output_dir TEXT NOT NULL,
+        format_id TEXT NOT NULL,
+        selected_type TEXT,
+        state TEXT NOT NULL,
+        title TEXT,
+        filepath TEXT,
+        error TEXT,
+        convert_codec TEXT,
+        convert_quality TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS jobs_key ON jobs (url, output_dir, format_id)",
+    "CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)",
+]
+
+# Kolom yang ditambahkan setelah tabel jobs pertama kali dibuat
+ADDED_COLUMNS = (
+    ('convert_codec', 'TEXT'),
+    ('convert_quality', 'TEXT'),
+)
+
+def _add_missing_columns(conn):
+    """Upgrade a jobs table created by an older version."""
+    existing = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+    for name, kind in ADDED_COLUMNS:
+        if name not in existing:
+            conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+class JobStore:
+    """
+    Durable download queue stored in SQLite.
+    Every job is one row keyed by (url, output_dir, format_id), so
+    enqueueing and state changes are single indexed writes.
+    """
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        init_schema('jobs', SCHEMA + [_add_missing_columns], db_file)
+
+    def _conn(self):
+        return get_connection(self.db_file)
+
+    def enqueue(self, url, output_dir, format_id, selected_type=None, codec=None, quality=None):
+        """
+        Add a job and return its id.
+        An unfinished job with the same key is reused so it resumes; a
+        finished one whose file still exists returns None (skip it).
+        codec/quality record a conversion to run after the download.
+        """
+        return self.enqueue_many([(url, output_dir, format_id, selected_type, codec, quality)])[0]
+
+    def enqueue_many(self, jobs):
+        """
+        Add several jobs in one transaction; jobs are tuples of enqueue()'s
+        arguments. Returns their ids in order, None for jobs to skip.
+        """
+        conn = self._conn()
+        with conn:
+            # Take the write lock before reading so concurrent enqueues of the same key serialize
+            conn.execute("BEGIN IMMEDIATE")
+            return [self._enqueue(conn, *job) for job in jobs]
+
+    def _enqueue(self, conn, url, output_dir, format_id, selected_type=None, codec=None, quality=None):
+        row = conn.execute(
+            "SELECT id, state, filepath FROM jobs WHERE url = ? AND output_dir = ? AND format_id = ?",
+            (url, output_dir, format_id)
+        ).fetchone()
+
+        if row is None:
+            cursor = conn.execute(
+                "INSERT INTO jobs (url, output_dir, format_id, selected_type, state, "
+                "convert_codec, convert_quality, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, output_dir, format_id, selected_type, QUEUED, codec, quality, _now(), _now())
+            )
+            return cursor.lastrowid
+
+        if row['state'] == DONE and row['filepath'] and os.path.exists(row['filepath']):
+            return None
+
+        # Requeue: failed jobs, jobs interrupted mid-download, or done jobs whose file is gone
+        conn.execute(
+            "UPDATE jobs SET state = ?, error = NULL, convert_codec = ?, convert_quality = ?, "
+            "updated_at = ? WHERE id = ?",
+            (QUEUED, codec, quality, _now(), row['id'])
+        )
+        return row['id']
+
+    def set_state(self, job_id, state, title=None, filepath=None, error=None):
+        """Move a job to a new state, optionally recording title/filepath/error."""
+        if state not in STATES:
+            raise ValueError(f"Unknown job state: {state}")
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, "
+                "title = COALESCE(?, title), filepath = COALESCE(?, filepath), "
+                "error = ?, updated_at = ? WHERE id = ?",
+                (state, title, filepath, error, _now(), job_id)
+            )
+
+    def get(self, job_id):
+        """Return the job row as a dict, or None."""
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def incomplete_jobs(self):
+        """Return all jobs that were queued or interrupted, oldest first."""
+        rows = self._conn().execute(
+            "SELECT * FROM jobs WHERE state NOT IN (?, ?) ORDER BY id",
+            FINISHED_STATES
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count_incomplete(self):
+        """Return the number of jobs that still need work."""
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE state NOT IN (?, ?)",
+            FINISHED_STATES
+        ).fetchone()[0]
+
+    def discard_incomplete(self, reason="Discarded by user"):
+        """Mark every unfinished job as failed so it is no longer offered for resuming."""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE state NOT IN (?, ?)",
+                (FAILED, reason, _now()) + FINISHED_STATES
+            )
+
+    def clear_finished(self):
+        """Delete finished jobs from the queue."""
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM jobs WHERE state IN (?, ?)", FINISHED_STATES)
@@ -0,0 +1,87 @@
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# File log aplikasi
+LOG_FILE = 'app.log'
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Longest ffmpeg stderr excerpt stored in a single record
+STDERR_EXCERPT_CHARS = 2000
+
+# Extra fields copied from the record into the JSON line
+CONTEXT_FIELDS = ('job', 'stage', 'url', 'stderr')
+
+_logger = None
+_listener = None
+_lock = threading.Lock()
+
+class JsonLineFormatter(logging.Formatter):
+    """Format each record as one JSON object per line."""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S"),
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                data[field] = value
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+def excerpt(text, limit=STDERR_EXCERPT_CHARS):
+    """Return the last limit characters of text (ffmpeg puts the actual error at the end)."""
+    if not text:
+        return text
+    text = text.strip()
+    if len(text) <= limit:
+        return text
+    return "..." + text[-limit:]
+
+def get_logger():
+    """
+    Return the application logger.
+    Records are put on an in-memory queue and written by a background
+    thread to a size-rotated JSON-lines file, so logging never blocks
+    on file I/O.
+    """
+    global _logger, _listener
+    with _lock:
+        if _logger is not None:
+            return _logger
+
+        file_handler = RotatingFileHandler(
+            LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonLineFormatter())
+
+        log_queue = queue.SimpleQueue()
+        _listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        logger = logging.getLogger('musik')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(QueueHandler(log_queue))
+        _logger = logger
+        return _logger
+
+def log(level, message, job=None, stage=None, url=None, stderr=None):
+    """Log a message with optional job context."""
+    extra = {
+        'job': job,
+        'stage': stage,
+        'url': url,
+        'stderr': excerpt(stderr),
+    }
+    get_logger().log(level, message, extra=extra)
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class ConvertStage:
+    """
+    Second stage of a download -> convert batch with its own worker pool.
+    A download must take a slot before it starts and the slot is only
+    returned once its file has been converted, so at most max_pending
+    downloaded-but-unconverted files exist at any time.
+
+    convert(job, url, result) returns the converted file path,
+    finish(job, job_id, url, result, output) records success and
+    fail(job, job_id, url, error) records a failure.
+    """
+
+    def __init__(self, convert, finish, fail, workers=1, max_pending=None, cancel_event=None):
+        self.convert = convert
+        self.finish = finish
+        self.fail = fail
+        self.cancel_event = cancel_event
+        self._slots = threading.BoundedSemaphore(max_pending or workers * 2)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='convert')
+
+    def acquire(self):
+        """Wait for a free slot; returns False if the batch was cancelled meanwhile."""
+        while not self._slots.acquire(timeout=0.5):
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                return False
+        return True
+
+    def release(self):
+        self._slots.release()
+
+    def submit(self, job, job_id, url, result):
+        """Queue a downloaded file for conversion; its slot is released afterwards."""
+        self._executor.submit(self._run, job, job_id, url, result)
+
+    def _run(self, job, job_id, url, result):
+        try:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise Exception("Conversion cancelled by user")
+            output = self.convert(job, url, result)
+            self.finish(job, job_id, url, result, output)
+        except Exception as e:
+            self.fail(job, job_id, url, e)
+        finally:
+            self.release()
+
+    def close(self):
+        """Wait until every queued conversion has finished."""
+        self._executor.shutdown(wait=True)
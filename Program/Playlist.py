@@ -0,0 +1,74 @@
+import re
+from Program.Utils import log_error
+from Program.Session import session_youtubedl_class
+
+# URL yang kemungkinan besar berupa playlist atau channel
+PLAYLIST_URL_RE = re.compile(
+    r'[?&]list=|/playlist\b|youtube\.com/(?:@|channel/|c/|user/)|/sets/|/album/'
+)
+
+# Flat entries pointing at another listing (e.g. channel tabs) are expanded too
+NESTED_IE_KEYS = ('YoutubeTab', 'YoutubePlaylist')
+
+def looks_like_playlist(url):
+    """Return True if the URL most likely points at a playlist or channel."""
+    return bool(PLAYLIST_URL_RE.search(url))
+
+def _entry_url(entry):
+    return entry.get('url') or entry.get('webpage_url') or entry.get('id')
+
+def iter_flat_entries(url, depth=1):
+    """
+    Yield minimal {'url', 'id', 'ie_key'} dicts for the entries of a
+    playlist or channel as they are enumerated. yt-dlp fetches the
+    listing page by page, so the first entries are available before the
+    whole playlist is known, and closing the generator stops paging.
+    A URL that is not a playlist yields a single entry.
+    """
+    YoutubeDL = session_youtubedl_class()
+
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+        'lazy_playlist': True
+    }
+
+    with YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+        if not info:
+            return
+
+        if info.get('_type') not in ('playlist', 'multi_video'):
+            yield {'url': url, 'id': info.get('id'), 'ie_key': info.get('extractor_key')}
+            return
+
+        for entry in info.get('entries') or []:
+            if not entry:
+                continue
+            entry_url = _entry_url(entry)
+            if not entry_url:
+                continue
+            if depth > 0 and entry.get('ie_key') in NESTED_IE_KEYS:
+                yield from iter_flat_entries(entry_url, depth - 1)
+            else:
+                yield {'url': entry_url, 'id': entry.get('id'), 'ie_key': entry.get('ie_key')}
+
+def iter_entries(url, depth=1):
+    """Yield the entry URLs of a playlist or channel as they are enumerated."""
+    for entry in iter_flat_entries(url, depth):
+        yield entry['url']
+
+def expand_urls(urls):
+    """
+    Lazily expand playlist and channel URLs into their entries.
+    Plain video URLs are passed through without any extraction.
+    """
+    for url in urls:
+        if not looks_like_playlist(url):
+            yield url
+            continue
+        try:
+            yield from iter_entries(url)
+        except Exception as e:
+            log_error(f"Error expanding playlist {url}: {str(e)}", stage='expand', url=url)
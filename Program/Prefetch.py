@@ -0,0 +1,117 @@
+import time
+import threading
+from concurrent.futures import CancelledError, ThreadPoolExecutor, Future, TimeoutError
+from Program.InfoCache import cache_key, get_info_cache
+from Program.Utils import log_error
+
+class Prefetcher:
+    """
+    Extracts video info in the background before it is asked for.
+    Requests for the same video share one extraction, speculative
+    requests are spaced at least min_interval seconds apart, and at most
+    max_pending speculative requests wait at any time.
+    """
+
+    def __init__(self, extract, max_workers=2, min_interval=1.0, max_pending=20):
+        self._extract = extract
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='prefetch')
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._speculative = 0
+        self._next_slot = 0.0
+        self.min_interval = min_interval
+        self.max_pending = max_pending
+
+    def prefetch(self, url):
+        """Start extracting url in the background unless it is cached or already running."""
+        key = cache_key(url)
+        with self._lock:
+            if key in self._in_flight or self._speculative >= self.max_pending:
+                return
+        if get_info_cache().contains(url):
+            return
+        self._submit(url, key, speculative=True)
+
+    def get(self, url, cancelled=None):
+        """
+        Return the info dict for url, waiting for an extraction already
+        in flight instead of starting a second one. Otherwise the
+        extraction runs in the calling thread.
+        cancelled is an optional callable; once it returns True the
+        extraction is aborted (see _extract) and a wait returns None.
+        """
+        key = cache_key(url)
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    self._in_flight[key] = future
+            if owner:
+                return self._extract_owned(url, key, future, cancelled)
+            try:
+                return self._wait(future, cancelled)
+            except CancelledError:
+                # The caller that owned this extraction cancelled it; run our own
+                continue
+
+    def _wait(self, future, cancelled):
+        while True:
+            try:
+                return future.result(timeout=0.5 if cancelled else None)
+            except TimeoutError:
+                if cancelled():
+                    return None
+
+    def _extract_owned(self, url, key, future, cancelled):
+        try:
+            info = self._extract(url, cancelled)
+        except Exception as e:
+            self._done(key, speculative=False)
+            if cancelled is not None and cancelled():
+                future.cancel()
+            else:
+                future.set_exception(e)
+            raise
+        self._done(key, speculative=False)
+        future.set_result(info)
+        return info
+
+    def _submit(self, url, key, speculative):
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                return future
+            if speculative:
+                self._speculative += 1
+            future = self._executor.submit(self._run, url, speculative)
+            self._in_flight[key] = future
+        future.add_done_callback(lambda _: self._done(key, speculative))
+        return future
+
+    def _done(self, key, speculative):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if speculative:
+                self._speculative -= 1
+
+    def _wait_for_slot(self):
+        """Rate-limit speculative extractions."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _run(self, url, speculative):
+        if speculative:
+            self._wait_for_slot()
+        try:
+            return self._extract(url)
+        except Exception as e:
+            log_error(f"Prefetch failed: {str(e)}", stage='prefetch', url=url)
+            if not speculative:
+                raise
+            return None
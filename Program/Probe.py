@@ -0,0 +1,220 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import subprocess
+from collections import OrderedDict
+from Program.Utils import load_config, log_error, find_binary
+
+# Path lokal untuk ffprobe (dan ffmpeg sebagai cadangan)
+FFPROBE_PATH = find_binary("ffprobe")
+FFMPEG_PATH = find_binary("ffmpeg")
+
+# Folder cache hasil probe
+CACHE_DIR = os.path.join('cache', 'probe')
+
+DURATION_RE = re.compile(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+
+class ProbeError(Exception):
+    """The file could not be probed (missing, unreadable or not media)."""
+
+def _number(value, kind=float):
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+def _frame_rate(text):
+    try:
+        num, den = (text or '').split('/')
+        return round(int(num) / int(den), 3) if int(den) else None
+    except ValueError:
+        return None
+
+def compact_record(data):
+    """Reduce ffprobe's JSON output to the fields the app uses."""
+    fmt = data.get('format') or {}
+    streams = []
+    for stream in data.get('streams') or []:
+        streams.append({
+            'index': stream.get('index'),
+            'type': stream.get('codec_type'),
+            'codec': stream.get('codec_name'),
+            'width': stream.get('width'),
+            'height': stream.get('height'),
+            'fps': _frame_rate(stream.get('avg_frame_rate')),
+            'channels': stream.get('channels'),
+            'sample_rate': _number(stream.get('sample_rate'), int),
+            'bit_rate': _number(stream.get('bit_rate'), int),
+            'duration': _number(stream.get('duration')),
+        })
+
+    duration = _number(fmt.get('duration'))
+    if not duration:
+        duration = max((s['duration'] or 0 for s in streams), default=0) or None
+    return {
+        'format': fmt.get('format_name'),
+        'duration': duration,
+        'size': _number(fmt.get('size'), int),
+        'bit_rate': _number(fmt.get('bit_rate'), int),
+        'streams': streams,
+    }
+
+def first_stream(record, kind):
+    """First stream of kind ('video', 'audio', 'subtitle') in a probe record, or None."""
+    for stream in record.get('streams', []):
+        # Cover art is reported as a single-frame video stream
+        if stream['type'] == kind and not (kind == 'video' and stream['codec'] in ('mjpeg', 'png')):
+            return stream
+    return None
+
+class MediaProber:
+    """
+    Runs ffprobe once per file version and caches the compact record in
+    memory and on disk. The key is (path, size, mtime), so a changed
+    file is probed again and an unchanged one never is.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_memory=256, max_disk_entries=5000):
+        self.cache_dir = cache_dir
+        self.max_memory = max_memory
+        self.max_disk_entries = max_disk_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_entries = None
+
+    def _key(self, path):
+        try:
+            st = os.stat(path)
+        except OSError as e:
+            raise ProbeError(f"Cannot read {path}: {e.strerror}")
+        return f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def probe(self, path):
+        """Return the compact record for path, running ffprobe only on a cache miss."""
+        key = self._key(path)
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                return json.loads(text)
+
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                text = f.read()
+            record = json.loads(text)
+        except (OSError, ValueError):
+            record = self._run(path)
+            text = json.dumps(record)
+            if not record.get('partial'):
+                self._write(key, text)
+
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory:
+                self._memory.popitem(last=False)
+        return record
+
+    def _run(self, path):
+        command = [FFPROBE_PATH, '-v', 'error', '-print_format', 'json',
+                   '-show_format', '-show_streams', path]
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, encoding='utf-8',
+                                    errors='replace')
+        except OSError:
+            return self._run_ffmpeg(path)
+        if result.returncode != 0:
+            raise ProbeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip()
+                             else f"ffprobe exited with {result.returncode}")
+        try:
+            return compact_record(json.loads(result.stdout))
+        except ValueError:
+            raise ProbeError("ffprobe returned invalid JSON")
+
+    def _run_ffmpeg(self, path):
+        """Without ffprobe only the duration can be read, from ffmpeg's banner; not cached on disk."""
+        try:
+            result = subprocess.run([FFMPEG_PATH, '-hide_banner', '-i', path], capture_output=True,
+                                    text=True, encoding='utf-8', errors='replace')
+        except OSError as e:
+            raise ProbeError(f"Neither ffprobe nor ffmpeg could be started: {str(e)}")
+        match = DURATION_RE.search(result.stderr)
+        if not match:
+            raise ProbeError("Could not determine media duration")
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+        return {'format': None, 'duration': duration, 'size': None, 'bit_rate': None,
+                'streams': [], 'partial': True}
+
+    def _write(self, key, text):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            log_error(f"Probe cache write failed: {str(e)}", stage='probe')
+            return
+
+        with self._lock:
+            if self._disk_entries is None:
+                self._disk_entries = len(self._scan())
+            else:
+                self._disk_entries += 1
+            over_budget = self._disk_entries > self.max_disk_entries
+        if over_budget:
+            self._evict()
+
+    def _scan(self):
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        entries.append((entry.stat().st_mtime, entry.path))
+        except OSError:
+            pass
+        return entries
+
+    def _evict(self):
+        """Remove the oldest records until 90% of max_disk_entries remain."""
+        entries = sorted(self._scan())
+        excess = len(entries) - int(self.max_disk_entries * 0.9)
+        for _, path in entries[:max(excess, 0)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_entries = len(entries) - max(excess, 0)
+
+_prober = None
+_prober_lock = threading.Lock()
+
+def get_prober():
+    """Return the process-wide media prober configured from config.json."""
+    global _prober
+    with _prober_lock:
+        if _prober is None:
+            _prober = MediaProber(max_disk_entries=load_config().get('probe_cache_entries', 5000))
+        return _prober
+
+def probe(path):
+    """Compact stream/format record for a media file; raises ProbeError."""
+    return get_prober().probe(path)
+
+def media_duration(path):
+    """Duration of a media file in seconds, 0 if unknown."""
+    try:
+        return probe(path).get('duration') or 0
+    except ProbeError as e:
+        log_error(f"Probe failed: {str(e)}", stage='probe', url=path)
+        return 0
@@ -0,0 +1,51 @@
+import threading
+from collections import deque
+
+# Status yang terus berulang; hanya keadaan terakhir per job yang disimpan
+CONTINUOUS_STATUSES = ('downloading', 'converting')
+
+class ProgressAggregator:
+    """
+    Collects progress events from worker threads for the UI to poll.
+    Continuous updates (downloading/converting) only keep the latest
+    state per job; discrete events (start, complete, error, ...) are
+    queued in order so none of them are lost.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = {}
+        self._events = deque()
+        self._dirty_job = None
+        self._dirty = False
+
+    def push(self, info):
+        """Record an event. Safe to call from any thread."""
+        job = info.get('job')
+        with self._lock:
+            if info.get('status') in CONTINUOUS_STATUSES:
+                self._latest[job] = info
+                self._dirty_job = job
+                self._dirty = True
+            else:
+                self._events.append(info)
+                if info.get('status') in ('complete', 'error'):
+                    self._latest.pop(job, None)
+
+    def drain(self):
+        """
+        Return (events, latest) accumulated since the last call.
+        latest is the most recent continuous update, or None if nothing
+        changed; it is ordered after the returned events.
+        """
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+            latest = self._latest.get(self._dirty_job) if self._dirty else None
+            self._dirty = False
+        return events, latest
+
+    def active_jobs(self):
+        """Return how many jobs currently report continuous progress."""
+        with self._lock:
+            return len(self._latest)
@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from Program.Utils import load_config, log_error
+from Program.Session import get_session, session_youtubedl_class
+
+MB = 1024 * 1024
+
+class RangeNotSupported(Exception):
+    """The server ignores Range requests or does not report the file size."""
+
+class RangedDownloader:
+    """
+    Downloads one file over several HTTP connections, one byte range each.
+    Data is written in place into a preallocated .part file and the progress
+    of every range is saved next to it, so an interrupted download resumes
+    each range where it stopped.
+    """
+
+    def __init__(self, session=None, connections=4, min_part_size=8 * MB,
+                 block_size=256 * 1024, timeout=30, retries=3, throttle=None, proxies=None):
+        self.session = session
+        self.throttle = throttle
+        self.proxies = proxies
+        self.connections = connections
+        self.min_part_size = min_part_size
+        self.block_size = block_size
+        self.timeout = timeout
+        self.retries = retries
+
+    def _session(self):
+        if self.session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(10, self.connections))
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        return self.session
+
+    def probe(self, url, headers=None):
+        """Return the file size, or raise RangeNotSupported."""
+        response = self._session().get(
+            url, headers={**(headers or {}), 'Range': 'bytes=0-0'},
+            stream=True, timeout=self.timeout, proxies=self.proxies
+        )
+        try:
+            response.raise_for_status()
+            content_range = response.headers.get('Content-Range', '')
+            if response.status_code != 206 or '/' not in content_range:
+                raise RangeNotSupported(f"HTTP {response.status_code} without Content-Range")
+            total = content_range.rsplit('/', 1)[1]
+            if not total.isdigit():
+                raise RangeNotSupported(f"Unknown size in Content-Range: {content_range}")
+            return int(total)
+        finally:
+            response.close()
+
+    def plan(self, total):
+        """Split total bytes into [start, end, done] ranges."""
+        parts = max(1, min(self.connections, total // self.min_part_size))
+        size = -(-total // parts)
+        return [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+
+    def _load_state(self, state_path, total):
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('total') == total:
+                return state['ranges']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def _save_state(self, state_path, total, ranges):
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'total': total, 'ranges': ranges}, f)
+        os.replace(tmp_path, state_path)
+
+    def _fetch_range(self, url, headers, path, byte_range, stop):
+        """Download one range, resuming from its done counter on errors."""
+        start, end, _ = byte_range
+        attempt = 0
+        while byte_range[2] < end - start + 1 and not stop.is_set():
+            offset = start + byte_range[2]
+            try:
+                response = self._session().get(
+                    url, headers={**headers, 'Range': f'bytes={offset}-{end}'},
+                    stream=True, timeout=self.timeout, proxies=self.proxies
+                )
+                with response:
+                    if response.status_code != 206:
+                        raise RangeNotSupported(f"HTTP {response.status_code} for range {offset}-{end}")
+                    # Unbuffered, so the done counter never runs ahead of the file
+                    with open(path, 'r+b', buffering=0) as f:
+                        f.seek(offset)
+                        for block in response.iter_content(self.block_size):
+                            if stop.is_set():
+                                return
+                            block = block[:end - start + 1 - byte_range[2]]
+                            f.write(block)
+                            byte_range[2] += len(block)
+                            if self.throttle:
+                                self.throttle(len(block))
+                attempt = 0
+            except RangeNotSupported:
+                raise
+            except Exception:
+                attempt += 1
+                if attempt > self.retries:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+
+    def download(self, url, path, headers=None, progress=None, total=None):
+        """
+        Download url into path (a .part file). progress(downloaded, total)
+        is called from the calling thread about twice per second; an
+        exception raised by it stops the download and is re-raised.
+        """
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'identity')
+        if total is None:
+            total = self.probe(url, headers)
+
+        state_path = f"{path}.ranges"
+        ranges = None
+        if os.path.isfile(path) and os.path.getsize(path) == total:
+            ranges = self._load_state(state_path, total)
+        if ranges is None:
+            ranges = self.plan(total)
+            with open(path, 'wb') as f:
+                f.truncate(total)
+        self._save_state(state_path, total, ranges)
+
+        stop = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix='range')
+        try:
+            futures = [
+                executor.submit(self._fetch_range, url, headers, path, byte_range, stop)
+                for byte_range in ranges if byte_range[2] < byte_range[1] - byte_range[0] + 1
+            ]
+            pending = futures
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_EXCEPTION)
+                self._save_state(state_path, total, ranges)
+                for future in done:
+                    future.result()
+                if progress:
+                    progress(sum(r[2] for r in ranges), total)
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+            self._save_state(state_path, total, ranges)
+
+        os.remove(state_path)
+        return total
+
+@functools.lru_cache(maxsize=None)
+def ranged_youtubedl_class():
+    """
+    Return a YoutubeDL subclass that downloads large single-file HTTP
+    formats with RangedDownloader. Everything else, and any server that
+    does not support ranges, goes through yt-dlp's own downloaders.
+    Built on first use so yt_dlp is only imported when downloading.
+    """
+    from yt_dlp.downloader.http import HttpFD
+    from yt_dlp.utils import determine_protocol
+
+    class RangedHttpFD(HttpFD):
+        def real_download(self, filename, info_dict):
+            tmpfilename = self.temp_name(filename)
+            url = info_dict['url']
+            headers = dict(info_dict.get('http_headers') or {})
+            cookie = self.ydl.cookiejar.get_cookie_header(url)
+            if cookie:
+                headers['Cookie'] = cookie
+
+            proxy = self.params.get('proxy')
+            downloader = RangedDownloader(
+                session=get_session().http_session(),
+                connections=self.params['ranged_connections'],
+                throttle=self.params.get('bandwidth_throttle'),
+                proxies={'http': proxy, 'https': proxy} if proxy else None
+            )
+
+            start = time.time()
+            self.report_destination(filename)
+
+            def progress(downloaded, total):
+                now = time.time()
+                speed = self.calc_speed(start, now, downloaded)
+                self._hook_progress({
+                    'status': 'downloading',
+                    'downloaded_bytes': downloaded,
+                    'total_bytes': total,
+                    'tmpfilename': tmpfilename,
+                    'filename': filename,
+                    'eta': self.calc_eta(speed, total - downloaded) if speed else None,
+                    'speed': speed,
+                    'elapsed': now - start,
+                    # The range workers already charged these bytes to the throttle
+                    'bandwidth_accounted': True,
+                }, info_dict)
+
+            try:
+                total = downloader.download(url, tmpfilename, headers, progress)
+            except RangeNotSupported as e:
+                log_error(f"Ranged download not possible, using one connection: {str(e)}",
+                          stage='download', url=url)
+                # Drop a preallocated file so the native downloader doesn't resume from it
+                state_path = f"{tmpfilename}.ranges"
+                if os.path.exists(state_path):
+                    os.remove(state_path)
+                    if os.path.exists(tmpfilename):
+                        os.remove(tmpfilename)
+                return super().real_download(filename, info_dict)
+
+            self.try_rename(tmpfilename, filename)
+            self._hook_progress({
+                'status': 'finished',
+                'downloaded_bytes': total,
+                'total_bytes': total,
+                'filename': filename,
+                'elapsed': time.time() - start,
+            }, info_dict)
+            return True
+
+    class RangedYoutubeDL(session_youtubedl_class()):
+        def _wants_ranges(self, info):
+            protocol = info.get('protocol') or determine_protocol(info)
+            size = info.get('filesize') or info.get('filesize_approx') or 0
+            return (
+                self.params.get('ranged_connections', 0) > 1
+                and protocol in ('http', 'https')
+                and not info.get('fragments')
+                and not info.get('request_data')
+                and not self.params.get('ratelimit')
+                and size >= self.params.get('ranged_min_size', 32 * MB)
+            )
+
+        def dl(self, name, info, subtitle=False, test=False):
+            if test or subtitle or name == '-' or not self._wants_ranges(info):
+                return super().dl(name, info, subtitle, test)
+            fd = RangedHttpFD(self, self.params)
+            for ph in self._progress_hooks:
+                fd.add_progress_hook(ph)
+            return fd.download(name, info, subtitle)
+
+    return RangedYoutubeDL
+
+def ranged_options():
+    """YoutubeDL params for the ranged downloader, from config.json."""
+    config = load_config()
+    return {
+        'ranged_connections': config.get('ranged_connections', 4),
+        'ranged_min_size': config.get('ranged_min_mb', 32) * MB,
+    }
@@ -0,0 +1,133 @@
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+# Host yang sebenarnya dilayani server yang sama
+HOST_ALIASES = {
+    'youtu.be': 'youtube.com',
+    'music.youtube.com': 'youtube.com',
+    'm.youtube.com': 'youtube.com',
+}
+
+def host_key(url):
+    """Return the host used for per-host concurrency limits."""
+    try:
+        host = (urlparse(url).hostname or '').lower()
+    except ValueError:
+        return ''
+    if host.startswith('www.'):
+        host = host[4:]
+    return HOST_ALIASES.get(host, host)
+
+class DownloadScheduler:
+    """
+    Runs download jobs on a bounded pool of worker threads.
+    At most max_workers jobs run at once, and at most max_per_host
+    of them target the same host.
+    """
+
+    def __init__(self, max_workers=3, max_per_host=2, cancel_event=None):
+        self.max_workers = max(1, int(max_workers))
+        self.max_per_host = max(1, int(max_per_host))
+        self.cancel_event = cancel_event or threading.Event()
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._active_hosts = {}
+        self._source = None
+        self._exhausted = False
+        self._feeding = False
+        self._next_index = 0
+        self.source_error = None
+
+    def run(self, urls, worker):
+        """
+        Call worker(index, url) for every URL and block until all jobs finish.
+        urls may be any iterable; it is consumed lazily as workers free up.
+        """
+        self._source = iter(urls)
+        self._exhausted = False
+        self._next_index = 0
+        self.source_error = None
+        self._pending.clear()
+        self._active_hosts.clear()
+
+        threads = [
+            threading.Thread(target=self._worker_loop, args=(worker,), daemon=True)
+            for _ in range(self.max_workers)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _lookahead(self):
+        # Keep a few jobs ready so a busy host doesn't starve the pool
+        return self.max_workers * 2
+
+    def _fill_pending(self):
+        """Pull more URLs from the source. Called with the lock held."""
+        while not self._exhausted and len(self._pending) < self._lookahead():
+            # The source may block (e.g. a lazily paged playlist), so
+            # fetch the next item without holding the lock
+            self._feeding = True
+            self._cond.release()
+            try:
+                url = next(self._source)
+            except StopIteration:
+                url = None
+                exhausted = True
+            except Exception as e:
+                # A failing source ends the batch; running jobs still finish
+                self.source_error = e
+                url = None
+                exhausted = True
+            else:
+                exhausted = False
+            finally:
+                self._cond.acquire()
+                self._feeding = False
+                self._cond.notify_all()
+
+            if exhausted:
+                self._exhausted = True
+                break
+            self._pending.append((self._next_index, url, host_key(url)))
+            self._next_index += 1
+
+    def _take_job(self):
+        """Return the next runnable job or None when nothing is left."""
+        with self._cond:
+            while True:
+                if self.cancel_event.is_set():
+                    return None
+
+                if not self._feeding:
+                    self._fill_pending()
+
+                for job in self._pending:
+                    host = job[2]
+                    if self._active_hosts.get(host, 0) < self.max_per_host:
+                        self._pending.remove(job)
+                        self._active_hosts[host] = self._active_hosts.get(host, 0) + 1
+                        return job
+
+                if self._exhausted and not self._pending and not self._feeding:
+                    return None
+
+                self._cond.wait(0.5)
+
+    def _release(self, host):
+        with self._cond:
+            self._active_hosts[host] -= 1
+            self._cond.notify_all()
+
+    def _worker_loop(self, worker):
+        while True:
+            job = self._take_job()
+            if job is None:
+                return
+            index, url, host = job
+            try:
+                worker(index, url)
+            finally:
+                self._release(host)
@@ -0,0 +1,149 @@
+import os
+import threading
+import functools
+from Program.Utils import load_config, log_error
+
+# Parameter yang membuat koneksi berbeda; instance dengan salah satunya
+# tetap memakai cookie jar bersama tetapi membuat koneksi sendiri
+CONNECTION_PARAMS = (
+    'proxy', 'nocheckcertificate', 'source_address', 'legacyserverconnect',
+    'impersonate', 'client_certificate', 'http_headers',
+)
+
+# Penanda: cookie belum pernah dimuat
+_NOT_LOADED = object()
+
+class SessionManager:
+    """
+    One parsed cookie jar and one set of HTTP connection pools shared by
+    every YoutubeDL in the process. The cookie file is parsed again only
+    when its path or modification time changes.
+    """
+
+    def __init__(self, cookie_path=None, socket_timeout=20):
+        self.cookie_path = cookie_path
+        self.socket_timeout = socket_timeout
+        self._lock = threading.Lock()
+        self._jar = None
+        self._cookie_stamp = _NOT_LOADED
+        self._owner = None
+        self._http = None
+
+    def _stamp(self):
+        if not self.cookie_path:
+            return None
+        try:
+            return os.path.getmtime(self.cookie_path)
+        except OSError:
+            return None
+
+    def set_cookie_path(self, cookie_path):
+        """Switch to another cookie file; it is parsed on the next use."""
+        with self._lock:
+            self.cookie_path = cookie_path or None
+            self._cookie_stamp = _NOT_LOADED
+
+    @property
+    def cookiejar(self):
+        """The shared cookie jar, reloaded in place if the cookie file changed."""
+        from yt_dlp.cookies import YoutubeDLCookieJar
+
+        with self._lock:
+            stamp = self._stamp()
+            if self._jar is None:
+                self._jar = YoutubeDLCookieJar()
+            if stamp != self._cookie_stamp:
+                self._cookie_stamp = stamp
+                fresh = YoutubeDLCookieJar(self.cookie_path)
+                if stamp is not None:
+                    try:
+                        fresh.load()
+                    except Exception as e:
+                        log_error(f"Could not load cookies from {self.cookie_path}: {str(e)}")
+                # Swap the contents so handlers holding the jar see the new cookies
+                with self._jar._cookies_lock:
+                    self._jar._cookies = fresh._cookies
+            return self._jar
+
+    @property
+    def request_director(self):
+        """yt-dlp request director (and its connection pools) owned by the session."""
+        jar = self.cookiejar
+        with self._lock:
+            if self._owner is None:
+                from yt_dlp import YoutubeDL
+                self._owner = YoutubeDL({
+                    'quiet': True,
+                    'no_warnings': True,
+                    'socket_timeout': self.socket_timeout,
+                })
+                self._owner.__dict__['cookiejar'] = jar
+            return self._owner._request_director
+
+    def http_session(self):
+        """Pooled requests session for downloads made outside yt-dlp."""
+        with self._lock:
+            if self._http is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                self._http = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32)
+                self._http.mount('http://', adapter)
+                self._http.mount('https://', adapter)
+            return self._http
+
+    def attach(self, ydl, params):
+        """Give a new YoutubeDL the shared cookie jar and, if compatible, the shared connections."""
+        if params.get('cookiefile') or params.get('cookiesfrombrowser'):
+            return
+        ydl.__dict__['cookiejar'] = self.cookiejar
+        if not any(params.get(key) for key in CONNECTION_PARAMS):
+            ydl.__dict__['_request_director'] = self.request_director
+            ydl._shared_director = True
+
+    def close(self):
+        with self._lock:
+            if self._owner is not None:
+                self._owner.close()
+                self._owner = None
+            if self._http is not None:
+                self._http.close()
+                self._http = None
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the process-wide session configured from config.json (cookie_path)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            config = load_config()
+            _session = SessionManager(
+                cookie_path=config.get('cookie_path') or None,
+                socket_timeout=config.get('socket_timeout', 20)
+            )
+        return _session
+
+@functools.lru_cache(maxsize=None)
+def session_youtubedl_class():
+    """
+    Return a YoutubeDL subclass that uses the shared session. Closing an
+    instance leaves the shared connections open for the next one.
+    Built on first use so yt_dlp is only imported when needed.
+    """
+    from yt_dlp import YoutubeDL
+
+    class SessionYoutubeDL(YoutubeDL):
+        def __init__(self, params=None, *args, **kwargs):
+            # YoutubeDL fills in defaults (e.g. http_headers) in the same dict
+            requested = dict(params or {})
+            super().__init__(params, *args, **kwargs)
+            get_session().attach(self, requested)
+
+        def close(self):
+            if getattr(self, '_shared_director', False):
+                self.__dict__.pop('_request_director', None)
+            super().close()
+
+    return SessionYoutubeDL
@@ -0,0 +1,55 @@
+import re
+import sys
+import time
+import subprocess
+
+# Waktu mulai proses (diambil saat modul ini pertama kali diimpor)
+STARTUP_BEGIN = time.perf_counter()
+
+IMPORTTIME_RE = re.compile(r'import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)')
+
+class StartupTimer:
+    """Records named milestones relative to process start."""
+
+    def __init__(self, begin=STARTUP_BEGIN):
+        self.begin = begin
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.begin))
+
+    def report(self):
+        lines = ["Startup milestones:"]
+        previous = 0.0
+        for name, elapsed in self.marks:
+            lines.append(f"  {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:7.1f} ms)  {name}")
+            previous = elapsed
+        return "\n".join(lines)
+
+def import_time_report(modules, top=15):
+    """
+    Import modules in a fresh interpreter with -X importtime and return
+    the top entries by cumulative time as a printable table.
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True
+    )
+
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # Only top-level packages and their direct children, to keep it readable
+            if len(indent) <= 3:
+                entries.append((int(cumulative_us), int(self_us), name))
+
+    entries.sort(reverse=True)
+    lines = [f"Import time ({', '.join(modules)}):", "  cumulative      self  module"]
+    for cumulative_us, self_us, name in entries[:top]:
+        lines.append(f"  {cumulative_us / 1000:8.1f} ms {self_us / 1000:7.1f} ms  {name}")
+    return "\n".join(lines)
+
+startup_timer = StartupTimer()
@@ -0,0 +1,46 @@
+import sqlite3
+import threading
+
+# Database lokal untuk antrean, arsip, dan riwayat
+DB_FILE = 'app.db'
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_initialized = set()
+
+def get_connection(db_file=DB_FILE):
+    """
+    Return a SQLite connection for the current thread.
+    Connections are opened once per thread and kept open; WAL mode lets
+    readers and the writer run concurrently.
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(db_file)
+    if conn is None:
+        conn = sqlite3.connect(db_file, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        connections[db_file] = conn
+    return conn
+
+def init_schema(name, statements, db_file=DB_FILE):
+    """
+    Run the CREATE statements for a table group once per process.
+    A statement may also be a function taking the connection, for migrations.
+    """
+    key = (db_file, name)
+    with _schema_lock:
+        if key in _initialized:
+            return
+        conn = get_connection(db_file)
+        with conn:
+            for statement in statements:
+                if callable(statement):
+                    statement(conn)
+                else:
+                    conn.execute(statement)
+        _initialized.add(key)
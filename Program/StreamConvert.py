@@ -0,0 +1,118 @@
+import os
+import time
+import subprocess
+from Program.Utils import log_error
+from Program.FFmpegLog import StderrTail
+
+BLOCK_SIZE = 256 * 1024
+
+class PipeError(Exception):
+    """
+    The stream could not be piped through ffmpeg, e.g. an mp4 whose index
+    is at the end or a server that cannot resume. Downloading to a file
+    first still works in those cases.
+    """
+
+def stream_convert(url, output_path, ffmpeg_path, codec_args, headers=None, session=None,
+                   total_bytes=None, progress_hook=None, throttle=None, info=None, retries=3):
+    """
+    Download url and pipe it straight into ffmpeg, which writes output_path
+    in the target format. No intermediate file is written.
+
+    progress_hook receives yt-dlp style status dicts; an exception raised
+    by it (e.g. on cancel) stops ffmpeg and removes the partial output.
+    throttle(size) is called for every block read. A broken connection
+    is resumed with a Range request up to retries times.
+    Raises PipeError if ffmpeg fails or the stream cannot be resumed.
+    """
+    import requests
+    if session is None:
+        session = requests.Session()
+
+    root, ext = os.path.splitext(output_path)
+    tmp_path = f"{root}.part{ext}"
+    command = [ffmpeg_path, '-hide_banner', '-nostdin', '-nostats', '-y', '-i', 'pipe:0'] + codec_args + [tmp_path]
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.PIPE)
+    stderr_tail = StderrTail(process.stderr)
+
+    fed = 0
+    start = time.time()
+    last_report = 0.0
+    finished = False
+    try:
+        attempt = 0
+        while True:
+            request_headers = dict(headers or {})
+            if fed:
+                request_headers['Range'] = f'bytes={fed}-'
+            try:
+                response = session.get(url, headers=request_headers, stream=True, timeout=30)
+                with response:
+                    response.raise_for_status()
+                    if fed and response.status_code != 206:
+                        raise PipeError("Server does not support resuming the stream")
+                    if total_bytes is None and not fed:
+                        total_bytes = int(response.headers.get('Content-Length') or 0) or None
+                    for block in response.iter_content(BLOCK_SIZE):
+                        if throttle:
+                            throttle(len(block))
+                        try:
+                            process.stdin.write(block)
+                        except OSError:
+                            process.wait()
+                            raise PipeError(str(stderr_tail.error(process.returncode)))
+                        fed += len(block)
+
+                        now = time.time()
+                        if progress_hook and now - last_report >= 0.25:
+                            last_report = now
+                            speed = fed / max(now - start, 1e-6)
+                            progress_hook({
+                                'status': 'downloading',
+                                'downloaded_bytes': fed,
+                                'total_bytes': total_bytes,
+                                'speed': speed,
+                                'eta': (total_bytes - fed) / speed if total_bytes and speed else None,
+                                'filename': output_path,
+                                'info_dict': info or {},
+                            })
+                break
+            except requests.RequestException:
+                attempt += 1
+                if attempt > retries:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+
+        process.stdin.close()
+        process.wait()
+        if process.returncode != 0:
+            error = stderr_tail.error(process.returncode)
+            log_error(f"FFmpeg failed ({error.cause})", stage='convert', url=url, stderr=stderr_tail.text())
+            raise PipeError(str(error))
+
+        os.replace(tmp_path, output_path)
+        finished = True
+        if progress_hook:
+            progress_hook({
+                'status': 'finished',
+                'downloaded_bytes': fed,
+                'total_bytes': fed,
+                'filename': output_path,
+                'info_dict': info or {},
+            })
+        return output_path
+    finally:
+        if not finished:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            try:
+                process.stdin.close()
+            except OSError:
+                pass
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError as e:
+                    log_error(f"Could not remove partial output: {str(e)}", stage='convert', url=tmp_path)
@@ -0,0 +1,116 @@
+from datetime import datetime
+from Program.Storage import DB_FILE, get_connection, init_schema
+from Program.Playlist import iter_flat_entries
+from Program.InfoCache import cache_key
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS sync_seen (
+        source TEXT NOT NULL,
+        extractor TEXT NOT NULL,
+        video_id TEXT NOT NULL,
+        seen_at TEXT NOT NULL,
+        PRIMARY KEY (source, extractor, video_id)
+    ) WITHOUT ROWID""",
+    # Entri yang gagal diunduh; dicoba lagi pada sync berikutnya
+    """CREATE TABLE IF NOT EXISTS sync_failed (
+        source TEXT NOT NULL,
+        extractor TEXT NOT NULL,
+        video_id TEXT NOT NULL,
+        url TEXT NOT NULL,
+        failed_at TEXT NOT NULL,
+        PRIMARY KEY (source, extractor, video_id)
+    ) WITHOUT ROWID""",
+]
+
+def entry_key(entry):
+    """Return the (extractor, video id) pair identifying a flat entry."""
+    if entry.get('id'):
+        return (entry.get('ie_key') or 'generic', str(entry['id']))
+    return ('generic', cache_key(entry['url']))
+
+class SeenIndex:
+    """
+    Per-source set of (extractor, video id) pairs that were already synced.
+    Sources are stored by their normalized URL.
+    """
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        init_schema('sync', SCHEMA, db_file)
+
+    def _conn(self):
+        return get_connection(self.db_file)
+
+    def is_seen(self, source, key):
+        row = self._conn().execute(
+            "SELECT 1 FROM sync_seen WHERE source = ? AND extractor = ? AND video_id = ?",
+            (cache_key(source), key[0], key[1])
+        ).fetchone()
+        return row is not None
+
+    def mark_seen(self, source, key):
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO sync_seen (source, extractor, video_id, seen_at) VALUES (?, ?, ?, ?)",
+                (cache_key(source), key[0], key[1], datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.execute(
+                "DELETE FROM sync_failed WHERE source = ? AND extractor = ? AND video_id = ?",
+                (cache_key(source), key[0], key[1])
+            )
+
+    def mark_failed(self, source, key, url):
+        """Remember a failed entry so the next sync retries it even if enumeration stops early."""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_failed (source, extractor, video_id, url, failed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (cache_key(source), key[0], key[1], url, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+
+    def failed(self, source):
+        """Return the (url, key) pairs of entries whose last download failed."""
+        rows = self._conn().execute(
+            "SELECT url, extractor, video_id FROM sync_failed WHERE source = ? ORDER BY failed_at",
+            (cache_key(source),)
+        ).fetchall()
+        return [(row['url'], (row['extractor'], row['video_id'])) for row in rows]
+
+    def count(self, source):
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM sync_seen WHERE source = ?", (cache_key(source),)
+        ).fetchone()[0]
+
+def new_entries(source, index, stop_after_seen=1):
+    """
+    Return the entries of source that are not in the seen index yet,
+    followed by entries that failed in an earlier sync.
+    Enumeration stops after stop_after_seen consecutive seen entries, so
+    an unchanged newest-first playlist costs a single page fetch. Pass
+    None to always scan the whole playlist (for playlists that append
+    new items at the end).
+    """
+    found = []
+    seen_run = 0
+
+    entries = iter_flat_entries(source)
+    try:
+        for entry in entries:
+            key = entry_key(entry)
+            if index.is_seen(source, key):
+                seen_run += 1
+                if stop_after_seen and seen_run >= stop_after_seen:
+                    break
+                continue
+            seen_run = 0
+            found.append((entry['url'], key))
+    finally:
+        # Stop yt-dlp from fetching further pages
+        entries.close()
+
+    # Failed entries may sit behind the point where enumeration stopped
+    keys = {key for _, key in found}
+    found.extend((url, key) for url, key in index.failed(source) if key not in keys)
+    return found
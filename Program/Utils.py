@@ -1,12 +1,26 @@
 import os
 import json
 import re
-from datetime import datetime
+import shutil
+import logging
+from Program.Logger import log
 
 # File pengaturan dan riwayat
 config_file = 'config.json'
 history_file = 'download_history.json'
 
+def find_binary(name):
+    """
+    Mencari executable (mis. ffmpeg) di folder ffmpeg/bin, lalu di PATH.
+    Mengembalikan path lokal default jika tidak ditemukan di mana pun.
+    """
+    local_dir = os.path.join("ffmpeg", "bin")
+    for candidate in (f"{name}.exe", name):
+        path = os.path.join(local_dir, candidate)
+        if os.path.isfile(path) and (os.name == 'nt' or not path.endswith('.exe')):
+            return path
+    return shutil.which(name) or os.path.join(local_dir, f"{name}.exe")
+
 def safe_filename(name):
     """
     Membersihkan nama file dari karakter ilegal.
@@ -38,37 +52,16 @@ def save_config(config):
     except IOError:
         print("Gagal menyimpan konfigurasi.")
 
-def add_to_history(video_name):
+def add_to_history(video_name, url=None, status='done'):
     """
     Menambahkan video ke riwayat unduhan.
-    Membatasi riwayat hingga 100 entri terakhir.
+    Riwayat disimpan di database (append-only), tanpa batas jumlah entri.
     """
-    history = []
-    if os.path.exists(history_file):
-        try:
-            with open(history_file, 'r') as f:
-                data = json.load(f)
-                # Ensure history is a list
-                history = data if isinstance(data, list) else []
-        except (json.JSONDecodeError, IOError):
-            # Handle corrupted or unreadable history file
-            history = []
-    
-    # Add new entry
-    history.append({
-        "name": video_name,
-        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
-    
-    # Keep only the last 100 entries
-    history = history[-100:]
-    
-    # Save updated history
+    from Program.History import get_history
     try:
-        with open(history_file, 'w') as f:
-            json.dump(history, f, indent=4)
-    except IOError:
-        print("Gagal menyimpan riwayat unduhan.")
+        get_history().append(video_name, url, status)
+    except Exception as e:
+        print(f"Gagal menyimpan riwayat unduhan: {str(e)}")
 
 def format_size(bytes):
     """
@@ -125,14 +118,13 @@ def format_eta(seconds):
     except (ValueError, TypeError):
         return "--:--"
 
-def log_error(message):
+def log_error(message, job=None, stage=None, url=None, stderr=None):
     """
-    Logging error dan menampilkan pesan error ke pengguna.
+    Logging error ke app.log (JSON per baris) lewat logger antrean.
+    job, stage, url, dan potongan stderr ffmpeg ikut dicatat bila ada.
     """
     try:
-        with open('app.log', 'a') as f:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            f.write(f"[{timestamp}] ERROR: {message}\n")
+        log(logging.ERROR, message, job=job, stage=stage, url=url, stderr=stderr)
     except Exception as e:
         print(f"Failed to log error: {str(e)}")
-        print(f"Original error: {message}")
\ No newline at end of file
+        print(f"Original error: {message}")
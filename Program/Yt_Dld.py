@@ -6,12 +6,13 @@ import os
 import threading
 import re
 import logging
-from yt_dlp import YoutubeDL
+from Program.Session import get_session, session_youtubedl_class
 from datetime import datetime
 from UI.style import apply_style, create_custom_widgets
+from Program.Logger import get_logger
 
-# Konfigurasi Logger
-logging.basicConfig(filename='app.log', level=logging.ERROR)
+# Konfigurasi Logger (logger antrean bersama, lihat Program/Logger.py)
+logger = get_logger()
 
 # Path lokal untuk yt-dlp dan ffmpeg
 YTDLP_PATH = os.path.join("ffmpeg", "bin", "yt-dlp.exe")
@@ -27,6 +28,10 @@ history_file = 'download_history.json'
 # Mapping format
 format_mapping = {}
 
+# YoutubeDL dengan cookie jar dan koneksi bersama (cookie_path di config.json
+# hanya dibaca ulang jika file cookie berubah)
+YoutubeDL = session_youtubedl_class()
+
 # ===== Fungsi Utilitas =====
 def safe_filename(name):
     """Membersihkan nama file dari karakter ilegal."""
@@ -83,7 +88,7 @@ def add_to_history(video_name):
 
 def log_error(message):
     """Logging error dan menampilkan pesan error ke pengguna."""
-    logging.error(message)
+    logger.error(message)
     messagebox.showerror("Error", message)
 
 def create_tooltip(widget, text):
@@ -97,9 +102,6 @@ def fetch_media(url):
     Mengambil informasi format media dari URL menggunakan yt-dlp.
     Mengembalikan daftar format audio, video, dan judul video.
     """
-    config = load_config()
-    cookie_path = config.get('cookie_path', '')
-
     ydl_opts = {
         'quiet': True,
         'no_warnings': True,
@@ -107,10 +109,6 @@ def fetch_media(url):
         'ffmpeg_location': FFMPEG_PATH
     }
 
-    # Tambahkan cookie jika tersedia
-    if cookie_path and os.path.exists(cookie_path):
-        ydl_opts['cookiefile'] = cookie_path
-
     with YoutubeDL(ydl_opts) as ydl:
         try:
             info_dict = ydl.extract_info(url, download=False)
@@ -203,9 +201,6 @@ def download_video(url, output_dir, selected_format):
         elif d['status'] == 'finished':
             progress_var.set(0)
 
-    config = load_config()
-    cookie_path = config.get('cookie_path', '')
-
     ydl_opts = {
         'format': selected_format,
         'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
@@ -216,10 +211,6 @@ def download_video(url, output_dir, selected_format):
         'ffmpeg_location': FFMPEG_PATH
     }
 
-    # Tambahkan cookie jika tersedia
-    if cookie_path and os.path.exists(cookie_path):
-        ydl_opts['cookiefile'] = cookie_path
-
     with YoutubeDL(ydl_opts) as ydl:
         try:
             info = ydl.extract_info(url, download=True)
@@ -238,9 +229,6 @@ def queue_download(urls, output_dir, selected_format, selected_type):
             if cancel_event.is_set():
                 break
             try:
-                config = load_config()
-                cookie_path = config.get('cookie_path', '')
-
                 ydl_opts = {
                     'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
                     'ffmpeg_location': FFMPEG_PATH,
@@ -253,10 +241,6 @@ def queue_download(urls, output_dir, selected_format, selected_type):
                     'socket_timeout': 30,  # Increase timeout
                 }
 
-                # Tambahkan cookie jika tersedia
-                if cookie_path and os.path.exists(cookie_path):
-                    ydl_opts['cookiefile'] = cookie_path
-
                 # Configure format and post-processing based on selection
                 if selected_type == "audio":
                     ydl_opts.update({
@@ -621,6 +605,7 @@ def browse_cookie():
         config = load_config()
         config['cookie_path'] = filename
         save_config(config)
+        get_session().set_cookie_path(filename)
 
 # Membuat root window untuk aplikasi
 root = tk.Tk()
@@ -0,0 +1,4 @@
+import sys
+from Program.cli import main
+
+sys.exit(main())
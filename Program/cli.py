@@ -0,0 +1,255 @@
+"""
+Headless command line interface.
+
+    python -m Program download URL... -o OUTPUT_DIR
+    python -m Program download -i urls.txt -o OUTPUT_DIR --type audio
+    cat urls.txt | python -m Program download -i - -o OUTPUT_DIR
+    python -m Program convert input.webm output.mp3 --codec mp3
+    python -m Program convert-batch FOLDER -c mp3 -o OUTPUT_DIR
+    python -m Program limit 2048
+
+Progress is printed to stdout as one JSON object per line. Exit codes:
+0 on success, 1 if any item failed, 3 if a dependency is missing and
+130 when interrupted.
+"""
+import sys
+import json
+import argparse
+import threading
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_DEPENDENCY = 3
+EXIT_INTERRUPTED = 130
+
+class JsonProgress:
+    """Progress callback that prints events as JSON lines and counts failures."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, info):
+        with self._lock:
+            if 'error' in info:
+                self.failures += 1
+            self.stream.write(json.dumps(info, ensure_ascii=False, default=str) + "\n")
+            self.stream.flush()
+
+def read_urls(urls, input_file=None):
+    """Collect URLs from arguments and an optional file ('-' for stdin)."""
+    collected = list(urls or [])
+    if input_file:
+        stream = sys.stdin if input_file == '-' else open(input_file, 'r', encoding='utf-8')
+        try:
+            for line in stream:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    collected.append(line)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+    return collected
+
+def _add_download_arguments(parser):
+    parser.add_argument('urls', nargs='*', help="Video, playlist or channel URLs")
+    parser.add_argument('-i', '--input', help="File with one URL per line ('-' for stdin)")
+    parser.add_argument('-o', '--output', required=True, help="Output directory")
+    parser.add_argument('-t', '--type', choices=['video', 'audio'], default='video')
+    parser.add_argument('-f', '--format', help="yt-dlp format ID or selector")
+    parser.add_argument('--preset', help="Resolve one format choice (preset name or selector) per URL before downloading")
+    parser.add_argument('--workers', type=int, help="Concurrent downloads")
+    parser.add_argument('--per-host', type=int, help="Concurrent downloads per host")
+    parser.add_argument('--limit-rate', type=int, help="Bandwidth limit in KB/s for this run (0 = unlimited)")
+    parser.add_argument('--priority', choices=['low', 'normal', 'high'], default='normal',
+                        help="Share of the bandwidth limit relative to other downloads")
+
+def _add_convert_arguments(parser):
+    parser.add_argument('--convert', metavar='CODEC',
+                        help="Pipe each stream into FFmpeg and save it as CODEC (mp3, opus, m4a, ...)")
+    parser.add_argument('--then-convert', metavar='CODEC',
+                        help="Download to a file, then convert it to CODEC while later downloads continue")
+    parser.add_argument('-q', '--quality', choices=['highest', 'high', 'medium', 'low'], default='medium',
+                        help="Quality for --convert/--then-convert video targets")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m Program', description="Media downloader & converter")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    download = commands.add_parser('download', help="Download URLs")
+    _add_download_arguments(download)
+    _add_convert_arguments(download)
+
+    sync = commands.add_parser('sync', help="Download only new playlist/channel entries")
+    _add_download_arguments(sync)
+    sync.add_argument('--stop-after-seen', type=int,
+                      help="Stop after this many already-synced entries in a row (0 = scan all)")
+
+    resume = commands.add_parser('resume', help="Resume unfinished jobs from the job queue")
+    resume.add_argument('--workers', type=int)
+    resume.add_argument('--per-host', type=int)
+    resume.add_argument('--limit-rate', type=int)
+
+    convert = commands.add_parser('convert', help="Convert a media file with FFmpeg")
+    convert.add_argument('input')
+    convert.add_argument('output')
+    convert.add_argument('-c', '--codec', help="Target format (defaults to the output extension)")
+    convert.add_argument('-q', '--quality', choices=['highest', 'high', 'medium', 'low'], default='medium')
+
+    batch = commands.add_parser('convert-batch', help="Convert many files at once within a CPU core budget")
+    batch.add_argument('inputs', nargs='+', help="Files and/or folders")
+    batch.add_argument('-c', '--codec', required=True, help="Target format (mp4, webm, mp3, ...)")
+    batch.add_argument('-o', '--output', help="Output directory (default: next to each input)")
+    batch.add_argument('-q', '--quality', choices=['highest', 'high', 'medium', 'low'], default='medium')
+    batch.add_argument('--jobs', type=int, help="Upper limit on simultaneous conversions")
+
+    history = commands.add_parser('history', help="Print download history as JSON lines")
+    history.add_argument('--limit', type=int, default=50)
+    history.add_argument('--offset', type=int, default=0)
+    history.add_argument('--name')
+    history.add_argument('--status')
+    history.add_argument('--since')
+    history.add_argument('--until')
+
+    archive = commands.add_parser('archive-import', help="Import folders or yt-dlp archive files")
+    archive.add_argument('paths', nargs='+')
+
+    limit = commands.add_parser('limit', help="Set the saved bandwidth limit; running downloads pick it up")
+    limit.add_argument('kbps', type=int, help="KB/s, 0 = unlimited")
+
+    return parser
+
+def _run_download(args, progress):
+    from Program import DownloadLogic
+
+    urls = read_urls(args.urls, args.input)
+    if not urls:
+        print("No URLs given", file=sys.stderr)
+        return EXIT_FAILED
+
+    if args.command == 'download' and args.convert:
+        ok = DownloadLogic.stream_download(urls, args.output, args.convert, args.quality, progress,
+                                           max_workers=args.workers, max_per_host=args.per_host)
+        return EXIT_OK if ok and not progress.failures else EXIT_FAILED
+
+    from Program.FormatSelect import DEFAULT_FORMATS
+    selected_format = args.format or DEFAULT_FORMATS[args.type]
+    format_map = None
+    if args.preset and args.command == 'sync':
+        # Entries are only known once each playlist is expanded, so yt-dlp
+        # resolves the preset's selector per entry instead
+        from Program.FormatSelect import FORMAT_PRESETS
+        selected_format = FORMAT_PRESETS.get(args.preset, args.preset)
+    elif args.preset:
+        # Satu pilihan format abstrak -> format ID konkret untuk setiap URL
+        from Program.FormatSelect import FORMAT_PRESETS
+        rows = DownloadLogic.discover_batch_formats(
+            urls, args.preset,
+            lambda row: progress({'status': 'format', **{k: v for k, v in row.items() if v is not None}})
+        )
+        format_map = {row['url']: row['format_id'] for row in rows if row['format_id']}
+        selected_format = FORMAT_PRESETS.get(args.preset, args.preset)
+        urls = [url for url in urls if url in format_map]
+
+    if args.command == 'download' and args.then_convert:
+        ok = DownloadLogic.download_and_convert(urls, args.output, selected_format, args.type,
+                                                args.then_convert, args.quality, progress,
+                                                max_workers=args.workers, max_per_host=args.per_host,
+                                                priority=args.priority)
+        return EXIT_OK if ok and not progress.failures else EXIT_FAILED
+
+    if args.command == 'sync':
+        stop_after_seen = args.stop_after_seen
+        if stop_after_seen == 0:
+            stop_after_seen = False
+        ok = DownloadLogic.sync_playlists(urls, args.output, selected_format, args.type, progress,
+                                          stop_after_seen=stop_after_seen, priority=args.priority,
+                                          max_workers=args.workers, max_per_host=args.per_host)
+    else:
+        ok = DownloadLogic.queue_download(urls, args.output, selected_format, args.type, progress,
+                                          max_workers=args.workers, max_per_host=args.per_host,
+                                          format_map=format_map, priority=args.priority)
+    return EXIT_OK if ok and not progress.failures else EXIT_FAILED
+
+def _run_convert(args, progress):
+    import os
+    from Program.ConvertLogic import convert_file
+
+    codec = args.codec or os.path.splitext(args.output)[1].lstrip('.')
+    if not codec:
+        print("Cannot determine target format; pass --codec", file=sys.stderr)
+        return EXIT_FAILED
+    ok = convert_file(args.input, args.output, codec, args.quality, progress)
+    return EXIT_OK if ok else EXIT_FAILED
+
+def _run_history(args):
+    from Program.History import get_history
+    for entry in get_history().query(args.limit, args.offset, args.name, args.status, args.since, args.until):
+        print(json.dumps(entry, ensure_ascii=False))
+    return EXIT_OK
+
+def _run_archive_import(args):
+    import os
+    from Program.Archive import get_archive
+    archive = get_archive()
+    for path in args.paths:
+        if os.path.isdir(path):
+            count = archive.import_folder(path)
+        else:
+            count = archive.import_archive_file(path)
+        print(json.dumps({'path': path, 'imported': count}))
+    return EXIT_OK
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'convert', None) and (args.format or args.preset):
+        parser.error("--convert picks the stream to convert itself; drop -f/--preset or use --then-convert")
+    progress = JsonProgress()
+    # convert-batch has its own cancel flag, set on Ctrl+C below
+    batch_cancel = threading.Event()
+
+    if args.command in ('download', 'sync', 'resume', 'convert', 'convert-batch'):
+        from Program.DownloadLogic import validate_dependencies
+        if not validate_dependencies(lambda msg: print(msg, file=sys.stderr)):
+            return EXIT_DEPENDENCY
+
+    if getattr(args, 'limit_rate', None) is not None:
+        from Program.Bandwidth import get_governor
+        get_governor().set_override(args.limit_rate)
+
+    try:
+        if args.command in ('download', 'sync'):
+            return _run_download(args, progress)
+        if args.command == 'resume':
+            from Program.DownloadLogic import resume_downloads
+            ok = resume_downloads(progress, max_workers=args.workers, max_per_host=args.per_host)
+            return EXIT_OK if ok and not progress.failures else EXIT_FAILED
+        if args.command == 'convert':
+            return _run_convert(args, progress)
+        if args.command == 'convert-batch':
+            from Program.ConvertBatch import batch_convert
+            ok = batch_convert(args.inputs, args.output, args.codec, args.quality, progress, args.jobs,
+                               batch_cancel)
+            return EXIT_OK if ok else EXIT_FAILED
+        if args.command == 'history':
+            return _run_history(args)
+        if args.command == 'archive-import':
+            return _run_archive_import(args)
+        if args.command == 'limit':
+            from Program.Bandwidth import set_bandwidth_limit
+            set_bandwidth_limit(args.kbps)
+            print(json.dumps({'bandwidth_limit': args.kbps}))
+            return EXIT_OK
+    except KeyboardInterrupt:
+        from Program.DownloadLogic import cancel_process
+        from Program.ConvertLogic import cancel_conversion
+        cancel_process()
+        cancel_conversion()
+        batch_cancel.set()
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,11 @@
+# Imported first so startup timing starts as early as possible
+from Program.Startup import startup_timer, import_time_report
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from UI.style import apply_style, create_custom_widgets
 import os
 import threading
-import subprocess
-import json
 import logging
 from Program.Utils import (
     load_config, save_config, log_error,
@@ -12,13 +13,27 @@ from Program.Utils import (
 )
 from Program.DownloadLogic import (
     validate_dependencies, fetch_media, queue_download,
-    show_history, cancel_process
+    show_history, cancel_process, pending_job_count, resume_downloads, discard_pending_jobs,
+    sync_playlists, preload
 )
 from Program.ConvertLogic import convert_file, cancel_conversion
+from Program.Progress import ProgressAggregator
+from Program.Logger import log
 
 # Setup logging
 logging.basicConfig(level=logging.ERROR)
 
+# Progress UI refresh interval (~15 Hz)
+PROGRESS_POLL_MS = 66
+
+# Give up waiting for a format fetch after this long
+FETCH_TIMEOUT_MS = 60000
+
+# Wait this long after the last keystroke before prefetching typed URLs
+PREFETCH_DEBOUNCE_MS = 800
+
+startup_timer.mark("imports")
+
 class YouTubeDownloaderApp:
     def __init__(self, root):
         self.root = root
@@ -60,8 +75,15 @@ class YouTubeDownloaderApp:
         root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Validate dependencies
-        if not validate_dependencies():
+        if not validate_dependencies(lambda msg: messagebox.showerror("Error", msg)):
             self.root.destroy()
+            return
+
+        # Start applying progress updates at a fixed rate
+        self.root.after(PROGRESS_POLL_MS, self._poll_progress)
+
+        # Offer to resume downloads left over from a previous session
+        self.root.after(500, self._offer_resume)
 
     def setup_variables(self):
         """Setup tkinter variables."""
@@ -78,19 +100,47 @@ class YouTubeDownloaderApp:
         self.eta_var = tk.StringVar(value="ETA: --")
         self.size_var = tk.StringVar(value="Size: --")
         self.count_var = tk.StringVar(value="")
+        self.stream_codec_var = tk.StringVar(value="")
+        self.limit_var = tk.StringVar(value=str(load_config().get('bandwidth_limit', 0)))
         
         # Convert tab variables
         self.input_var = tk.StringVar()
         self.output_var = tk.StringVar()
+        self.convert_output_var = tk.StringVar()
         self.codec_var = tk.StringVar(value="mp4")
         self.quality_var = tk.StringVar(value="medium")
         self.convert_progress_text = tk.StringVar(value="Ready to convert")
         self.convert_progress_var = tk.DoubleVar()
+
+        # Batch convert tab variables
+        self.batch_output_var = tk.StringVar()
+        self.batch_codec_var = tk.StringVar(value="mp4")
+        self.batch_quality_var = tk.StringVar(value="medium")
+        self.batch_plan_var = tk.StringVar(value="")
+        self.batch_progress_text = tk.StringVar(value="Add files or folders to convert")
+        self.batch_progress_var = tk.DoubleVar()
+        self.batch_files = []
+        self._batch_state = {}
+        # Cancels only the running batch, not the Convert tab or downloads
+        self._batch_cancel_event = threading.Event()
         
         # Other variables
         self.channel_var = tk.StringVar(value="")
         self.current_formats = None
 
+        # Prefetch formats as soon as URLs are typed or pasted
+        self._prefetch_after_id = None
+        self.url_var.trace_add('write', self._on_url_changed)
+
+        # Format fetch in flight; a newer generation supersedes older results
+        self._fetch_generation = 0
+        self._fetch_url = None
+
+        # Progress events from worker threads, applied by _poll_progress
+        self.download_progress = ProgressAggregator()
+        self.convert_progress = ProgressAggregator()
+        self.batch_progress = ProgressAggregator()
+
     def setup_style(self):
         """Apply modern style to the application."""
         style = ttk.Style()
@@ -167,10 +217,25 @@ class YouTubeDownloaderApp:
         self.notebook.add(self.download_frame, text="Download")
         self.setup_download_tab()
 
-        # Convert tab
+        # Convert tab (built the first time it is selected)
         self.convert_frame = ttk.Frame(self.notebook, style="Modern.TFrame", padding="10")
         self.notebook.add(self.convert_frame, text="Convert")
-        self.setup_convert_tab()
+
+        # Batch convert tab (also deferred)
+        self.batch_frame = ttk.Frame(self.notebook, style="Modern.TFrame", padding="10")
+        self.notebook.add(self.batch_frame, text="Batch Convert")
+
+        self._pending_tabs = {
+            str(self.convert_frame): self.setup_convert_tab,
+            str(self.batch_frame): self.setup_batch_tab,
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _on_tab_changed(self, event=None):
+        """Build a deferred tab the first time it is shown."""
+        builder = self._pending_tabs.pop(self.notebook.select(), None)
+        if builder:
+            builder()
 
     def setup_download_tab(self):
         """Setup the download tab UI."""
@@ -206,11 +271,23 @@ class YouTubeDownloaderApp:
         format_label.pack(side="left", padx=(0, 5))
         self.format_menu = ttk.Combobox(type_frame, textvariable=self.format_var, state="readonly", style="Modern.TCombobox")
         self.format_menu.pack(side="left", fill="x", expand=True)
+
+        # Optional one-pass download + convert (stream piped into FFmpeg)
+        stream_label = ttk.Label(type_frame, text="Convert to:", style="Modern.TLabel")
+        stream_label.pack(side="left", padx=(10, 5))
+        self.stream_codec_menu = ttk.Combobox(type_frame, textvariable=self.stream_codec_var, values=["", "mp3", "opus", "m4a", "ogg", "aac", "wav"], state="readonly", width=6, style="Modern.TCombobox")
+        self.stream_codec_menu.pack(side="left")
         
         # Buttons
         button_frame = ttk.Frame(self.download_frame)
         button_frame.grid(row=3, column=0, columnspan=3, sticky="ew", pady=(0, 10))
         
+        # Bandwidth limit, applied to running downloads as well
+        limit_apply = self.create_custom_widgets()["ModernButton"](button_frame, text="Set Limit", command=self.apply_bandwidth_limit)
+        limit_apply.pack(side="right", padx=5)
+        ttk.Entry(button_frame, textvariable=self.limit_var, width=7).pack(side="right")
+        ttk.Label(button_frame, text="Limit KB/s (0 = off):", style="Modern.TLabel").pack(side="right", padx=(0, 5))
+
         # Download button
         self.download_button = self.create_custom_widgets()["ModernButton"](button_frame, text="Download", command=self.start_download)
         self.download_button.pack(side="left", padx=5)
@@ -223,6 +300,18 @@ class YouTubeDownloaderApp:
         self.fetch_button = self.create_custom_widgets()["ModernButton"](button_frame, text="Fetch Formats", command=self.fetch_and_select_format)
         self.fetch_button.pack(side="left", padx=5)
 
+        # Resolve one format choice for every URL
+        self.batch_formats_button = self.create_custom_widgets()["ModernButton"](button_frame, text="Batch Formats", command=self.open_batch_formats)
+        self.batch_formats_button.pack(side="left", padx=5)
+
+        # Cancel an in-flight format fetch
+        self.fetch_cancel_button = self.create_custom_widgets()["ModernButton"](button_frame, text="Cancel Fetch", command=self.cancel_fetch, state="disabled")
+        self.fetch_cancel_button.pack(side="left", padx=5)
+
+        # Sync button: download only new playlist entries
+        self.sync_button = self.create_custom_widgets()["ModernButton"](button_frame, text="Sync Playlist", command=self.start_sync)
+        self.sync_button.pack(side="left", padx=5)
+
         # Progress frame
         progress_frame = ttk.LabelFrame(self.download_frame, text="Progress", style="Modern.TLabelframe", padding="10")
         progress_frame.grid(row=4, column=0, columnspan=3, sticky="ew", pady=(0, 10))
@@ -271,8 +360,8 @@ class YouTubeDownloaderApp:
         # Output file selection
         output_frame = ttk.LabelFrame(self.convert_frame, text="Output File", style="Modern.TLabelframe", padding="10")
         output_frame.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(0, 10))
-        self.output_entry = ttk.Entry(output_frame, style="Modern.TEntry", textvariable=self.output_var)
-        self.output_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.convert_output_entry = ttk.Entry(output_frame, style="Modern.TEntry", textvariable=self.convert_output_var)
+        self.convert_output_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
         output_button = self.create_custom_widgets()["ModernButton"](output_frame, text="Browse", command=self.browse_output_file)
         output_button.pack(side="right")
 
@@ -319,6 +408,106 @@ class YouTubeDownloaderApp:
         self.convert_cancel_button = self.create_custom_widgets()["ModernButton"](button_frame, text="Cancel", command=self.cancel_conversion, state="disabled")
         self.convert_cancel_button.pack(side="left", padx=5)
 
+    def setup_batch_tab(self):
+        """Setup the batch convert tab UI."""
+        buttons = self.create_custom_widgets()["ModernButton"]
+
+        # Input files and folders
+        input_frame = ttk.LabelFrame(self.batch_frame, text="Input Files", style="Modern.TLabelframe", padding="10")
+        input_frame.grid(row=0, column=0, columnspan=3, sticky="ew", pady=(0, 10))
+        self.batch_listbox = tk.Listbox(input_frame, height=6, selectmode="extended")
+        self.batch_listbox.pack(side="left", fill="both", expand=True, padx=(0, 5))
+        list_buttons = ttk.Frame(input_frame, style="Modern.TFrame")
+        list_buttons.pack(side="right", fill="y")
+        self.batch_add_files_button = buttons(list_buttons, text="Add Files", command=self.batch_add_files)
+        self.batch_add_files_button.pack(fill="x", pady=(0, 5))
+        self.batch_add_folder_button = buttons(list_buttons, text="Add Folder", command=self.batch_add_folder)
+        self.batch_add_folder_button.pack(fill="x", pady=(0, 5))
+        self.batch_clear_button = buttons(list_buttons, text="Clear", command=self.batch_clear)
+        self.batch_clear_button.pack(fill="x")
+
+        # Output folder; empty = next to each input
+        output_frame = ttk.LabelFrame(self.batch_frame, text="Output Folder (empty = same as input)",
+                                      style="Modern.TLabelframe", padding="10")
+        output_frame.grid(row=1, column=0, columnspan=3, sticky="ew", pady=(0, 10))
+        self.batch_output_entry = ttk.Entry(output_frame, style="Modern.TEntry", textvariable=self.batch_output_var)
+        self.batch_output_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        buttons(output_frame, text="Browse", command=self.batch_browse_output).pack(side="right")
+
+        # Codec and quality selection
+        options_frame = ttk.Frame(self.batch_frame)
+        options_frame.grid(row=2, column=0, columnspan=3, sticky="ew", pady=(0, 10))
+        ttk.Label(options_frame, text="Format:", style="Modern.TLabel").pack(side="left", padx=(0, 5))
+        self.batch_codec_menu = ttk.Combobox(options_frame, textvariable=self.batch_codec_var, values=["mp4", "mkv", "webm", "avi", "mp3", "m4a", "ogg", "opus", "wav", "aac"], state="readonly", style="Modern.TCombobox")
+        self.batch_codec_menu.pack(side="left", padx=(0, 10))
+        self.batch_codec_menu.bind("<<ComboboxSelected>>", self._update_batch_plan)
+        ttk.Label(options_frame, text="Quality:", style="Modern.TLabel").pack(side="left", padx=(0, 5))
+        self.batch_quality_menu = ttk.Combobox(options_frame, textvariable=self.batch_quality_var, values=["highest", "high", "medium", "low"], state="readonly", style="Modern.TCombobox")
+        self.batch_quality_menu.pack(side="left", padx=(0, 10))
+        ttk.Label(options_frame, textvariable=self.batch_plan_var, style="Modern.TLabel").pack(side="left")
+
+        # Overall progress
+        progress_frame = ttk.LabelFrame(self.batch_frame, text="Progress", style="Modern.TLabelframe", padding="10")
+        progress_frame.grid(row=3, column=0, columnspan=3, sticky="ew", pady=(0, 10))
+        ttk.Label(progress_frame, textvariable=self.batch_progress_text, style="Modern.TLabel").pack(fill="x", pady=(0, 5))
+        ttk.Progressbar(progress_frame, variable=self.batch_progress_var, maximum=100,
+                        style="Modern.Horizontal.TProgressbar").pack(fill="x")
+
+        # Buttons frame
+        button_frame = ttk.Frame(self.batch_frame, style="Modern.TFrame")
+        button_frame.grid(row=4, column=0, columnspan=3, sticky="ew")
+        self.batch_button = buttons(button_frame, text="Start Batch", command=self.start_batch_conversion)
+        self.batch_button.pack(side="left", padx=5)
+        self.batch_cancel_button = buttons(button_frame, text="Cancel", command=self.cancel_batch_conversion, state="disabled")
+        self.batch_cancel_button.pack(side="left", padx=5)
+
+        self._update_batch_plan()
+
+    def batch_add_files(self):
+        """Add media files to the batch list."""
+        files = filedialog.askopenfilenames(
+            title="Select Input Files",
+            initialdir=os.path.expanduser("~"),
+            filetypes=[
+                ("All Media Files", "*.mp4;*.mkv;*.avi;*.webm;*.mp3;*.wav;*.ogg;*.opus;*.m4a;*.aac"),
+                ("All files", "*.*")
+            ]
+        )
+        for file in files:
+            self._batch_add(os.path.normpath(file))
+
+    def batch_add_folder(self):
+        """Add every media file in a folder to the batch list."""
+        folder = filedialog.askdirectory(title="Select Input Folder", initialdir=os.path.expanduser("~"))
+        if folder:
+            from Program.ConvertBatch import collect_inputs
+            for file in collect_inputs([os.path.normpath(folder)]):
+                self._batch_add(file)
+
+    def _batch_add(self, path):
+        if path not in self.batch_files:
+            self.batch_files.append(path)
+            self.batch_listbox.insert(tk.END, path)
+        self._update_batch_plan()
+
+    def batch_clear(self):
+        """Empty the batch list."""
+        self.batch_files = []
+        self.batch_listbox.delete(0, tk.END)
+        self._update_batch_plan()
+
+    def batch_browse_output(self):
+        """Browse for the batch output folder."""
+        folder = filedialog.askdirectory(title="Select Output Directory", initialdir=os.path.expanduser("~"))
+        if folder:
+            self.batch_output_var.set(os.path.normpath(folder))
+
+    def _update_batch_plan(self, event=None):
+        """Show how many files convert at once and with how many threads."""
+        from Program.ConvertBatch import thread_plan
+        jobs, threads = thread_plan(self.batch_codec_var.get(), len(self.batch_files))
+        self.batch_plan_var.set(f"{jobs} at once × {threads} thread(s)")
+
     def browse_output(self):
         """Browse for output directory."""
         from Program.Utils import load_config, save_config
@@ -362,6 +551,7 @@ class YouTubeDownloaderApp:
             self.input_entry.insert(0, file)
             # Auto-update output path
             self.on_format_change()
+            self.fetch_media_info()
 
     def browse_output_file(self):
         """Browse for output file location."""
@@ -396,18 +586,88 @@ class YouTubeDownloaderApp:
         if file:
             # Normalize path
             file = os.path.normpath(file)
-            self.output_entry.delete(0, tk.END)
-            self.output_entry.insert(0, file)
+            self.convert_output_entry.delete(0, tk.END)
+            self.convert_output_entry.insert(0, file)
+
+    def apply_bandwidth_limit(self):
+        """Save the bandwidth limit; running downloads slow down or speed up right away."""
+        from Program.Bandwidth import set_bandwidth_limit
+        try:
+            limit = int(self.limit_var.get() or 0)
+            if limit < 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showwarning("Error", "Limit must be a whole number of KB/s (0 = unlimited)")
+            return
+        set_bandwidth_limit(limit)
+        self.format_info_var.set(f"Bandwidth limit: {limit} KB/s" if limit else "Bandwidth limit: off")
 
     def start_download(self):
         """Start the download process."""
-        urls = [url.strip() for url in self.url_entry.get().split('\n') if url.strip()]
-        output_dir = self.output_entry.get()
+        if self.stream_codec_var.get():
+            self._start_stream_download()
+            return
+
+        args = self._collect_download_args()
+        if not args:
+            return
+            
+        # Disable controls during download
+        self._disable_download_controls()
         
+        # Start download in a thread
+        threading.Thread(target=self._download_thread, args=args, daemon=True).start()
+
+    def _start_stream_download(self):
+        """Download and convert in one pass; no format selection needed."""
+        urls = [url.strip() for url in self.url_entry.get().split('\n') if url.strip()]
         if not urls:
             messagebox.showwarning("Error", "Please enter at least one URL")
             return
-            
+        output_dir = self._resolve_output_dir()
+        if not output_dir:
+            return
+
+        self._disable_download_controls()
+        self._reset_download_progress()
+        from Program.DownloadLogic import stream_download
+        threading.Thread(
+            target=stream_download,
+            args=(urls, output_dir, self.stream_codec_var.get(), self.quality_var.get(), self._update_download_progress),
+            daemon=True
+        ).start()
+
+    def start_sync(self):
+        """Download only the new entries of the playlists/channels in the URL box."""
+        urls = [url.strip() for url in self.url_entry.get().split('\n') if url.strip()]
+        if not urls:
+            messagebox.showwarning("Error", "Please enter at least one URL")
+            return
+        output_dir = self._resolve_output_dir()
+        if not output_dir:
+            return
+
+        # Playlists and channels have no formats of their own, so no fetch is
+        # needed: a selected policy applies to every entry, otherwise the
+        # type's default selector is resolved per entry
+        from Program.FormatRank import FORMAT_POLICIES
+        from Program.FormatSelect import DEFAULT_FORMATS
+        selected_type = self.type_var.get()
+        format_id = self._selected_format_id(selected_type)
+        if format_id not in FORMAT_POLICIES:
+            format_id = DEFAULT_FORMATS[selected_type]
+
+        self._disable_download_controls()
+        self.title_var.set("Syncing playlists...")
+        threading.Thread(
+            target=sync_playlists,
+            args=(urls, output_dir, format_id, selected_type, self._update_download_progress),
+            daemon=True
+        ).start()
+
+    def _resolve_output_dir(self):
+        """Return the output directory (falling back to the default) or None."""
+        output_dir = self.output_entry.get()
         if not output_dir:
             # Try to use default directory
             config = load_config()
@@ -418,54 +678,59 @@ class YouTubeDownloaderApp:
                 self.output_entry.insert(0, output_dir)
             else:
                 messagebox.showwarning("Error", "Please select output directory")
-                return
+                return None
             
         # Create output directory if it doesn't exist
         try:
             os.makedirs(output_dir, exist_ok=True)
         except Exception as e:
             messagebox.showerror("Error", f"Could not create output directory: {str(e)}")
-            return
+            return None
+        return output_dir
+
+    def _collect_download_args(self):
+        """Validate the download form and return (urls, output_dir, format_id, type) or None."""
+        urls = [url.strip() for url in self.url_entry.get().split('\n') if url.strip()]
+        
+        if not urls:
+            messagebox.showwarning("Error", "Please enter at least one URL")
+            return None
+
+        output_dir = self._resolve_output_dir()
+        if not output_dir:
+            return None
             
         if not self.format_var.get():
             messagebox.showwarning("Error", "Please select a format")
-            return
+            return None
             
         # Get the selected format ID
         selected_type = self.type_var.get()
-        selected_format = self.format_var.get()
         
         # Find the format ID from stored formats
-        if not hasattr(self, 'current_formats'):
+        if not self.current_formats:
             messagebox.showerror("Error", "Please fetch formats first")
-            return
+            return None
             
-        formats = self.current_formats.get(selected_type, [])
-        format_id = None
-        for fmt_id, fmt_desc in formats:
-            if fmt_desc == selected_format:
-                format_id = fmt_id
-                break
-                
+        format_id = self._selected_format_id(selected_type)
         if not format_id:
             messagebox.showerror("Error", "Invalid format selected")
-            return
-            
-        # Disable controls during download
-        self._disable_download_controls()
-        
-        # Start download in a thread
-        threading.Thread(target=self._download_thread, args=(
-            urls, 
-            output_dir,
-            format_id,
-            selected_type
-        ), daemon=True).start()
+            return None
+
+        return (urls, output_dir, format_id, selected_type)
+
+    def _selected_format_id(self, selected_type):
+        """Format ID of the entry chosen in the format menu, or None."""
+        selected_format = self.format_var.get()
+        for fmt_id, fmt_desc in (self.current_formats or {}).get(selected_type, []):
+            if fmt_desc == selected_format:
+                return fmt_id
+        return None
 
     def start_conversion(self):
         """Start the conversion process."""
         input_file = self.input_entry.get()
-        output_file = self.output_entry.get()
+        output_file = self.convert_output_entry.get()
         
         if not input_file or not output_file:
             messagebox.showerror("Error", "Please select input and output files")
@@ -495,73 +760,82 @@ class YouTubeDownloaderApp:
             self.quality_var.get()
         ), daemon=True).start()
 
+    def start_batch_conversion(self):
+        """Convert every file in the batch list in a background thread."""
+        if not self.batch_files:
+            messagebox.showerror("Error", "Please add files or folders to convert")
+            return
+
+        self._batch_state = {'total': len(self.batch_files), 'done': 0, 'failed': 0, 'running': {}}
+        self._batch_cancel_event = threading.Event()
+        self.batch_progress_var.set(0)
+        self.batch_progress_text.set("Starting batch conversion...")
+        self._set_batch_controls("disabled")
+
+        from Program.ConvertBatch import batch_convert
+        threading.Thread(target=batch_convert, args=(
+            list(self.batch_files),
+            self.batch_output_var.get() or None,
+            self.batch_codec_var.get(),
+            self.batch_quality_var.get(),
+            self.batch_progress.push
+        ), kwargs={'cancel_event': self._batch_cancel_event}, daemon=True).start()
+
     def fetch_media_info(self):
         """Fetch media information for the input file."""
         input_file = self.input_entry.get()
         if not input_file or not os.path.exists(input_file):
             return
-            
-        try:
-            # Use FFprobe to get media info
-            command = [
-                "ffprobe",
-                '-v', 'quiet',
-                '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                input_file
-            ]
-            
-            result = subprocess.run(command, capture_output=True, text=True)
-            if result.returncode != 0:
+
+        def worker():
+            from Program.Probe import probe, ProbeError
+            try:
+                record = probe(input_file)
+            except ProbeError as e:
+                log_error(f"Error fetching media info: {str(e)}", stage='probe', url=input_file)
                 return
-                
-            info = json.loads(result.stdout)
-            
-            # Get stream info
-            video_stream = None
-            audio_stream = None
-            for stream in info.get('streams', []):
-                if stream['codec_type'] == 'video' and not video_stream:
-                    video_stream = stream
-                elif stream['codec_type'] == 'audio' and not audio_stream:
-                    audio_stream = stream
-                    
+            self.root.after(0, lambda: self._apply_media_info(input_file, record))
+
+        # ffprobe can take a while on network drives; keep the UI responsive
+        threading.Thread(target=worker, daemon=True).start()
+
+    def _apply_media_info(self, input_file, record):
+        """Adjust the convert options to a probed input file. Runs on the Tk thread."""
+        from Program.Probe import first_stream
+        if input_file != self.input_entry.get():
+            return
+
+        try:
             # Update format options based on media type
-            if video_stream:
-                # It's a video file
-                self.type_var.set('video')
-                self.codec_menu['values'] = ["mp4", "mkv", "webm", "avi"]
+            audio_codecs = ["mp3", "m4a", "ogg", "opus", "wav", "aac"]
+            if first_stream(record, 'video') or not record['streams']:
+                # It's a video file; the audio can still be extracted
+                self.codec_menu['values'] = ["mp4", "mkv", "webm", "avi"] + audio_codecs
             else:
                 # Audio only
-                self.type_var.set('audio')
-                self.codec_menu['values'] = ["mp3", "m4a", "ogg", "opus", "wav", "aac"]
-                
+                self.codec_menu['values'] = audio_codecs
+                if self.codec_var.get() not in audio_codecs:
+                    self.codec_var.set("")
+
             # Set default output format
             if not self.codec_var.get():
                 self.codec_menu.current(0)
+                self.on_format_change()
                 
             # Set default quality
             if not self.quality_var.get():
                 self.quality_menu.current(2)  # medium
                 
         except Exception as e:
-            logging.error(f"Error fetching media info: {str(e)}")
+            log_error(f"Error fetching media info: {str(e)}", stage='probe', url=input_file)
 
-    def _download_thread(self, urls, output_dir, format_id, selected_type):
+    def _download_thread(self, urls, output_dir, format_id, selected_type, format_map=None):
         """Run download in a separate thread."""
         from Program.DownloadLogic import queue_download
         
         try:
             # Reset progress
-            self.root.after(0, lambda: self.title_var.set("Starting download..."))
-            self.root.after(0, lambda: self.channel_var.set(""))
-            self.root.after(0, lambda: self.format_info_var.set(""))
-            self.root.after(0, lambda: self.progress_var.set(0))
-            self.root.after(0, lambda: self.speed_var.set("Speed: --"))
-            self.root.after(0, lambda: self.eta_var.set("ETA: --"))
-            self.root.after(0, lambda: self.size_var.set("Size: --"))
-            self.root.after(0, lambda: self.count_var.set(""))
+            self.root.after(0, self._reset_download_progress)
             
             # Start download
             queue_download(
@@ -569,57 +843,131 @@ class YouTubeDownloaderApp:
                 output_dir,
                 format_id,
                 selected_type,
-                self._update_download_progress
+                self._update_download_progress,
+                format_map=format_map
             )
             
         except Exception as e:
             self.root.after(0, lambda: self._show_download_error(str(e)))
 
+    def _reset_download_progress(self):
+        """Clear the download progress widgets."""
+        self.title_var.set("Starting download...")
+        self.channel_var.set("")
+        self.format_info_var.set("")
+        self.progress_var.set(0)
+        self.speed_var.set("Speed: --")
+        self.eta_var.set("ETA: --")
+        self.size_var.set("Size: --")
+        self.count_var.set("")
+
+    def _offer_resume(self):
+        """Ask whether to resume unfinished downloads from the job queue."""
+        count = pending_job_count()
+        if not count:
+            return
+        if not messagebox.askyesno("Resume", f"{count} unfinished download(s) found. Resume them now?"):
+            # Declined: don't ask again on every launch
+            discard_pending_jobs()
+            return
+
+        self._disable_download_controls()
+        self.title_var.set("Resuming downloads...")
+        threading.Thread(
+            target=resume_downloads,
+            args=(self._update_download_progress,),
+            daemon=True
+        ).start()
+
     def _update_download_progress(self, info):
-        """Update download progress UI."""
+        """Record a download progress event; the UI picks it up in _poll_progress."""
+        self.download_progress.push(info)
+
+    def _update_convert_progress(self, info):
+        """Record a conversion progress event; the UI picks it up in _poll_progress."""
+        self.convert_progress.push(info)
+
+    def _poll_progress(self):
+        """Apply pending progress events to the UI at a fixed rate."""
+        try:
+            events, latest = self.download_progress.drain()
+            for info in events:
+                self._apply_download_progress(info)
+            if latest:
+                self._apply_download_progress(latest)
+
+            events, latest = self.convert_progress.drain()
+            for info in events:
+                self._apply_convert_progress(info)
+            if latest:
+                self._apply_convert_progress(latest)
+
+            events, latest = self.batch_progress.drain()
+            for info in events:
+                self._apply_batch_progress(info)
+            if latest:
+                self._apply_batch_progress(latest)
+        except Exception as e:
+            log_error(f"Progress update error: {str(e)}", stage='ui')
+        finally:
+            self.root.after(PROGRESS_POLL_MS, self._poll_progress)
+
+    def _apply_download_progress(self, info):
+        """Update download progress UI. Runs on the Tk thread."""
         if 'error' in info:
-            self.root.after(0, lambda: self._show_download_error(info['error']))
+            if info.get('job') is not None:
+                # A single job failed; the rest of the batch keeps running
+                self.format_info_var.set(f"Failed: {info.get('url', '')} ({info['error']})")
+                return
+            self._show_download_error(info['error'])
             return
             
         # Update UI based on status
         status = info.get('status', '')
         
+        if status == 'sync':
+            self.format_info_var.set(f"{info.get('new', 0)} new item(s) in {info.get('url', '')}")
+            return
+
+        if status == 'complete' and info.get('job') is not None:
+            # One job of the batch finished
+            self.format_info_var.set(f"Finished: {info.get('title', 'Unknown')}")
+            return
+        
         if status == 'start':
             # New download starting
-            title = info.get('title', 'Unknown')
-            channel = info.get('channel', '')
-            self.root.after(0, lambda: self.title_var.set(title))
-            self.root.after(0, lambda: self.channel_var.set(channel))
-            self.root.after(0, lambda: self.format_info_var.set("Starting download..."))
-            self.root.after(0, lambda: self.progress_var.set(0))
-            self.root.after(0, lambda: self.count_var.set(f"({info.get('current', 0)}/{info.get('total', 0)})"))
+            self.title_var.set(info.get('title', 'Unknown'))
+            self.channel_var.set(info.get('channel', ''))
+            self.format_info_var.set("Starting download...")
+            self.progress_var.set(0)
+            self.count_var.set(self._format_count(info))
             
         elif status == 'downloading':
             # Update progress
-            progress = info.get('progress', 0)
-            speed = info.get('speed', 'Unknown')
-            eta = info.get('eta', 'Unknown')
-            size = info.get('size', '')
-            current = info.get('current', 0)
-            total = info.get('total', 0)
-            
-            self.root.after(0, lambda: self.progress_var.set(progress))
-            self.root.after(0, lambda: self.speed_var.set(f"Speed: {speed}"))
-            self.root.after(0, lambda: self.eta_var.set(f"ETA: {eta}"))
-            self.root.after(0, lambda: self.size_var.set(f"Size: {size}"))
-            self.root.after(0, lambda: self.count_var.set(f"({current}/{total})"))
-            self.root.after(0, lambda: self.format_info_var.set(info.get('format', 'Downloading...')))
+            self.progress_var.set(info.get('progress', 0))
+            self.speed_var.set(f"Speed: {info.get('speed', 'Unknown')}")
+            self.eta_var.set(f"ETA: {info.get('eta', 'Unknown')}")
+            self.size_var.set(f"Size: {info.get('size', '')}")
+            self.format_info_var.set(info.get('format', 'Downloading...'))
             
         elif status == 'complete':
             # Download complete
-            self.root.after(0, lambda: self._enable_download_controls())
-            self.root.after(0, lambda: self.format_info_var.set("Download complete!"))
-            self.root.after(0, lambda: self.progress_var.set(100))
-            self.root.after(0, lambda: self.speed_var.set("Speed: --"))
-            self.root.after(0, lambda: self.eta_var.set("ETA: --"))
-            self.root.after(0, lambda: self.size_var.set("Size: --"))
-            self.root.after(0, lambda: self.count_var.set(""))
-            self.root.after(0, lambda: messagebox.showinfo("Success", "Download completed successfully!"))
+            self._enable_download_controls()
+            self.format_info_var.set("Download complete!")
+            self.progress_var.set(100)
+            self.speed_var.set("Speed: --")
+            self.eta_var.set("ETA: --")
+            self.size_var.set("Size: --")
+            self.count_var.set("")
+            messagebox.showinfo("Success", "Download completed successfully!")
+
+    def _format_count(self, info):
+        """Format the (current/total) label; total is unknown for playlists."""
+        current = info.get('current', 0)
+        total = info.get('total', 0)
+        if not current:
+            return ""
+        return f"({current}/{total})" if total else f"({current})"
 
     def _convert_thread(self, input_file, output_file, codec, quality):
         """Run conversion in a separate thread."""
@@ -627,8 +975,7 @@ class YouTubeDownloaderApp:
         
         try:
             # Reset progress
-            self.root.after(0, lambda: self.convert_progress_text.set("Starting conversion..."))
-            self.root.after(0, lambda: self.convert_progress_var.set(0))
+            self._update_convert_progress({'status': 'start'})
             
             # Start conversion
             convert_file(
@@ -640,12 +987,15 @@ class YouTubeDownloaderApp:
             )
             
         except Exception as e:
-            self.root.after(0, lambda: self._show_convert_error(str(e)))
+            # Errors reported through the progress callback are logged by convert_file
+            error_msg = str(e)
+            log_error(f"Convert error: {error_msg}", stage='convert', url=input_file)
+            self.root.after(0, lambda: self._show_convert_error(error_msg))
 
-    def _update_convert_progress(self, info):
-        """Update conversion progress UI."""
+    def _apply_convert_progress(self, info):
+        """Update conversion progress UI. Runs on the Tk thread."""
         if 'error' in info:
-            self.root.after(0, lambda: self._show_convert_error(info['error']))
+            self._show_convert_error(info['error'])
             return
             
         # Update UI based on status
@@ -653,25 +1003,67 @@ class YouTubeDownloaderApp:
         
         if status == 'start':
             # Conversion starting
-            self.root.after(0, lambda: self.convert_progress_text.set("Starting conversion..."))
-            self.root.after(0, lambda: self.convert_progress_var.set(0))
+            self.convert_progress_text.set("Starting conversion...")
+            self.convert_progress_var.set(0)
             
         elif status == 'converting':
             # Update progress
-            progress = info.get('progress', 0)
             speed = info.get('speed', 'Unknown')
             eta = info.get('eta', 'Unknown')
-            
-            status_text = f"Converting... {speed}/s, ETA: {eta}"
-            self.root.after(0, lambda: self.convert_progress_text.set(status_text))
-            self.root.after(0, lambda: self.convert_progress_var.set(progress))
+            self.convert_progress_text.set(f"Converting... {speed} ({info.get('throughput', '')}), ETA: {eta}")
+            self.convert_progress_var.set(info.get('progress', 0))
             
         elif status == 'complete':
             # Conversion complete
-            self.root.after(0, lambda: self._enable_convert_controls())
-            self.root.after(0, lambda: self.convert_progress_text.set("Conversion complete!"))
-            self.root.after(0, lambda: self.convert_progress_var.set(100))
-            self.root.after(0, lambda: messagebox.showinfo("Success", "Conversion completed successfully!"))
+            self._enable_convert_controls()
+            self.convert_progress_text.set("Conversion complete!")
+            self.convert_progress_var.set(100)
+            messagebox.showinfo("Success", "Conversion completed successfully!")
+
+    def _apply_batch_progress(self, info):
+        """Update batch conversion progress UI. Runs on the Tk thread."""
+        state = self._batch_state
+        status = info.get('status', '')
+        job = info.get('job')
+
+        if status == 'plan':
+            self.batch_plan_var.set(f"{info['jobs']} at once × {info['threads']} thread(s)")
+            return
+        if status == 'converting':
+            state['running'][job] = info.get('progress', 0)
+        elif status == 'error':
+            state['running'].pop(job, None)
+            state['failed'] += 1
+        elif status == 'complete' and job is not None:
+            state['running'].pop(job, None)
+            state['done'] += 1
+        elif status == 'complete':
+            self._set_batch_controls("normal")
+            self.batch_progress_var.set(100)
+            summary = f"Converted {state['done']} of {state['total']} file(s)"
+            if state['failed']:
+                summary += f", {state['failed']} failed (see log)"
+            self.batch_progress_text.set(summary)
+            messagebox.showinfo("Batch Convert", summary)
+            return
+
+        finished = state['done'] + state['failed']
+        total = state['total'] or 1
+        self.batch_progress_var.set((finished + sum(state['running'].values()) / 100) / total * 100)
+        self.batch_progress_text.set(
+            f"{finished}/{state['total']} done, {len(state['running'])} converting"
+            + (f", {state['failed']} failed" if state['failed'] else "")
+        )
+
+    def _set_batch_controls(self, state):
+        """Enable ("normal") or disable the batch tab while a batch runs."""
+        for widget in (self.batch_button, self.batch_add_files_button,
+                       self.batch_add_folder_button, self.batch_clear_button, self.batch_output_entry):
+            widget.configure(state=state)
+        menu_state = "readonly" if state == "normal" else "disabled"
+        self.batch_codec_menu.configure(state=menu_state)
+        self.batch_quality_menu.configure(state=menu_state)
+        self.batch_cancel_button.configure(state="disabled" if state == "normal" else "normal")
 
     def _show_download_error(self, error):
         """Show download error and reset UI."""
@@ -695,7 +1087,6 @@ class YouTubeDownloaderApp:
         self.convert_progress_var.set(0)
         self._enable_convert_controls()
         messagebox.showerror("Convert Error", f"Conversion failed:\n{error_msg}")
-        log_error(f"Convert error: {error_msg}")
 
     def cancel_download(self):
         """Cancel the ongoing download."""
@@ -709,6 +1100,11 @@ class YouTubeDownloaderApp:
         cancel_conversion()
         self.convert_progress_text.set("Cancelling conversion...")
 
+    def cancel_batch_conversion(self):
+        """Cancel the running batch conversion."""
+        self._batch_cancel_event.set()
+        self.batch_progress_text.set("Cancelling batch conversion...")
+
     def _disable_download_controls(self):
         """Disable controls during download."""
         self.download_button.configure(state="disabled")
@@ -718,6 +1114,8 @@ class YouTubeDownloaderApp:
         self.type_menu.configure(state="disabled")  
         self.format_menu.configure(state="disabled")
         self.fetch_button.configure(state="disabled")
+        self.sync_button.configure(state="disabled")
+        self.batch_formats_button.configure(state="disabled")
 
     def _enable_download_controls(self):
         """Enable controls after download."""
@@ -728,13 +1126,15 @@ class YouTubeDownloaderApp:
         self.type_menu.configure(state="readonly")  
         self.format_menu.configure(state="readonly")
         self.fetch_button.configure(state="normal")
+        self.sync_button.configure(state="normal")
+        self.batch_formats_button.configure(state="normal")
 
     def _disable_convert_controls(self):
         """Disable controls during conversion."""
         self.convert_button.configure(state="disabled")
         self.convert_cancel_button.configure(state="normal")
         self.input_entry.configure(state="disabled")
-        self.output_entry.configure(state="disabled")
+        self.convert_output_entry.configure(state="disabled")
         self.codec_menu.configure(state="disabled")  
         self.quality_menu.configure(state="disabled")  
 
@@ -743,7 +1143,7 @@ class YouTubeDownloaderApp:
         self.convert_button.configure(state="normal")
         self.convert_cancel_button.configure(state="disabled")
         self.input_entry.configure(state="normal")
-        self.output_entry.configure(state="normal")
+        self.convert_output_entry.configure(state="normal")
         self.codec_menu.configure(state="readonly")  
         self.quality_menu.configure(state="readonly")  
 
@@ -756,55 +1156,172 @@ class YouTubeDownloaderApp:
             input_filename = os.path.splitext(os.path.basename(input_path))[0]
             output_ext = self.codec_var.get()
             output_path = os.path.join(input_dir, f"{input_filename}.{output_ext}")
-            self.output_entry.delete(0, tk.END)
-            self.output_entry.insert(0, output_path)
+            self.convert_output_entry.delete(0, tk.END)
+            self.convert_output_entry.insert(0, output_path)
 
     def on_type_change(self, event=None):
         """Handle type (video/audio) selection change."""
         self._update_format_menu()
 
     def fetch_and_select_format(self):
-        """Fetch available formats for the video URL."""
+        """Fetch available formats for the video URL in a background thread."""
         url = self.url_entry.get().strip().split('\n')[0]
         if not url:
             messagebox.showwarning("Error", "Please enter a video URL first.")
             return
-            
-        try:
-            # Show fetching status
-            self.format_info_var.set("Fetching available formats...")
-            self.root.update()
-            
-            # Get formats from yt-dlp
+
+        # Same URL already being fetched: let it finish
+        if self._fetch_url == url:
+            return
+
+        # A new fetch supersedes any fetch still in flight
+        self._fetch_generation += 1
+        generation = self._fetch_generation
+        self._fetch_url = url
+
+        self.format_info_var.set("Fetching available formats...")
+        self.fetch_cancel_button.configure(state="normal")
+
+        def worker():
             from Program.DownloadLogic import fetch_media
-            audio_formats, video_formats, video_title = fetch_media(url)
-            
-            if not video_title:
-                raise Exception("Could not fetch video information")
-                
-            # Store formats for later use
-            self.current_formats = {
-                'video': video_formats,
-                'audio': audio_formats
-            }
-                
-            # Update format menu based on selected type
-            self._update_format_menu()
-            
-            # Update title and status
-            self.title_var.set(video_title)
-            self.format_info_var.set("Formats fetched successfully")
-            
-            # Show success message
-            messagebox.showinfo("Success", f"Available formats fetched for:\n{video_title}")
-            
-        except Exception as e:
-            error_msg = str(e)
-            self.format_info_var.set(f"Error: {error_msg}")
-            messagebox.showerror("Error", f"Failed to fetch formats: {error_msg}")
-            
-        finally:
-            self.root.update()
+            # Cancel, timeout or a newer fetch stops the extraction, not just its result
+            result = fetch_media(url, lambda: generation != self._fetch_generation)
+            self.root.after(0, lambda: self._on_formats_fetched(generation, result))
+
+        threading.Thread(target=worker, daemon=True).start()
+        self.root.after(FETCH_TIMEOUT_MS, lambda: self._on_fetch_timeout(generation))
+
+    def cancel_fetch(self):
+        """Stop the format fetch in flight; the extraction aborts before its next request."""
+        self._finish_fetch()
+        self.format_info_var.set("Format fetch cancelled")
+
+    def _finish_fetch(self):
+        """Invalidate the current fetch and reset the fetch controls."""
+        self._fetch_generation += 1
+        self._fetch_url = None
+        self.fetch_cancel_button.configure(state="disabled")
+
+    def _on_fetch_timeout(self, generation):
+        if generation != self._fetch_generation:
+            return
+        self._finish_fetch()
+        self.format_info_var.set("Error: fetching formats timed out")
+        messagebox.showerror("Error", "Fetching formats timed out. Please try again.")
+
+    def _on_formats_fetched(self, generation, result):
+        """Apply fetched formats unless the fetch was cancelled or superseded."""
+        if generation != self._fetch_generation:
+            return
+        self._finish_fetch()
+
+        audio_formats, video_formats, video_title = result
+        if not video_title:
+            self.format_info_var.set("Error: Could not fetch video information")
+            messagebox.showerror("Error", "Failed to fetch formats: Could not fetch video information")
+            return
+
+        # Store formats for later use
+        # Policies pick the smallest format per video, useful for bulk jobs
+        from Program.FormatRank import BANDWIDTH_SAVING, BANDWIDTH_SAVING_AUDIO
+        self.current_formats = {
+            'video': video_formats + [(BANDWIDTH_SAVING, "Bandwidth saving (smallest file per video)")],
+            'audio': audio_formats + [(BANDWIDTH_SAVING_AUDIO, "Bandwidth saving (smallest file per video)")]
+        }
+
+        # Update format menu based on selected type
+        self._update_format_menu()
+
+        # Update title and status
+        self.title_var.set(video_title)
+        self.format_info_var.set("Formats fetched successfully")
+
+        # Show success message
+        messagebox.showinfo("Success", f"Available formats fetched for:\n{video_title}")
+
+    def open_batch_formats(self):
+        """Open a dialog that resolves one format choice for every URL in the box."""
+        from Program.FormatSelect import FORMAT_PRESETS
+
+        urls = [url.strip() for url in self.url_entry.get().split('\n') if url.strip()]
+        if not urls:
+            messagebox.showwarning("Error", "Please enter at least one URL")
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Batch Formats")
+        dialog.geometry("760x400")
+        dialog.transient(self.root)
+
+        top = ttk.Frame(dialog, padding="10")
+        top.pack(fill="x")
+        ttk.Label(top, text="Choice:").pack(side="left", padx=(0, 5))
+        choice_var = tk.StringVar(value=next(iter(FORMAT_PRESETS)))
+        ttk.Combobox(top, textvariable=choice_var, values=list(FORMAT_PRESETS), width=40).pack(side="left", padx=(0, 10))
+        status_var = tk.StringVar(value=f"{len(urls)} URL(s)")
+        ttk.Label(top, textvariable=status_var).pack(side="left")
+
+        # Summary table
+        tree = ttk.Treeview(dialog, columns=("title", "format", "description"), show="headings")
+        tree.heading("title", text="Title")
+        tree.heading("format", text="Format ID")
+        tree.heading("description", text="Description")
+        tree.column("title", width=320)
+        tree.column("format", width=100)
+        tree.column("description", width=300)
+        tree.pack(fill="both", expand=True, padx=10)
+
+        bottom = ttk.Frame(dialog, padding="10")
+        bottom.pack(fill="x")
+        results = {}
+
+        def add_row(row):
+            format_text = row['format_id'] or "-"
+            detail = row['description'] or row['error'] or ""
+            tree.insert("", "end", values=(row['title'] or row['url'], format_text, detail))
+            status_var.set(f"{len(tree.get_children())}/{len(urls)} resolved")
+
+        def discover():
+            tree.delete(*tree.get_children())
+            results.clear()
+            download_button.configure(state="disabled")
+            discover_button.configure(state="disabled")
+            spec = choice_var.get()
+
+            def worker():
+                from Program.DownloadLogic import discover_batch_formats
+                rows = discover_batch_formats(
+                    urls, spec, lambda row: self.root.after(0, lambda: add_row(row))
+                )
+                self.root.after(0, lambda: finished(rows))
+            threading.Thread(target=worker, daemon=True).start()
+
+        def finished(rows):
+            results.update({row['url']: row['format_id'] for row in rows if row['format_id']})
+            discover_button.configure(state="normal")
+            failed = len(rows) - len(results)
+            status_var.set(f"{len(results)} resolved, {failed} without a match")
+            if results:
+                download_button.configure(state="normal")
+
+        def download_all():
+            output_dir = self._resolve_output_dir()
+            if not output_dir:
+                return
+            selected_urls = [url for url in urls if url in results]
+            dialog.destroy()
+            self._disable_download_controls()
+            threading.Thread(target=self._download_thread, args=(
+                selected_urls, output_dir, FORMAT_PRESETS.get(choice_var.get(), choice_var.get()),
+                self.type_var.get(), dict(results)
+            ), daemon=True).start()
+
+        discover_button = self.create_custom_widgets()["ModernButton"](bottom, text="Discover", command=discover)
+        discover_button.pack(side="left", padx=5)
+        download_button = self.create_custom_widgets()["ModernButton"](bottom, text="Download All", command=download_all, state="disabled")
+        download_button.pack(side="left", padx=5)
+
+        discover()
 
     def _update_format_menu(self):
         """Update format menu based on selected type and fetched formats."""
@@ -836,17 +1353,55 @@ class YouTubeDownloaderApp:
                     clipboard_content = f"\n{clipboard_content}"
                 # Append to existing content
                 self.url_entry.insert("end", clipboard_content)
+                # Start extracting right away so fetching formats is instant
+                self._prefetch_urls(clipboard_content)
         except tk.TclError:
             pass  # Clipboard was empty or invalid
 
+    def _on_url_changed(self, *args):
+        """Prefetch typed URLs once the user stops typing for a moment."""
+        if self._prefetch_after_id:
+            self.root.after_cancel(self._prefetch_after_id)
+        self._prefetch_after_id = self.root.after(PREFETCH_DEBOUNCE_MS, self._on_url_settled)
+
+    def _on_url_settled(self):
+        self._prefetch_after_id = None
+        self._prefetch_urls(self.url_var.get())
+
+    def _prefetch_urls(self, text):
+        """Start background metadata extraction for every URL in text."""
+        urls = [url.strip() for url in text.split() if url.strip()]
+        if urls:
+            from Program.DownloadLogic import prefetch_media
+            prefetch_media(urls)
+
     def on_close(self):
         """Handle window close."""
         if messagebox.askyesno("Confirm", "Are you sure you want to quit?"):
             self.root.destroy()
 
+def _preload_in_background(show_report):
+    """Import yt-dlp after the window is up, then optionally print the startup report."""
+    def worker():
+        preload()
+        startup_timer.mark("yt-dlp loaded")
+        report = startup_timer.report()
+        log(logging.INFO, report, stage='startup')
+        if show_report:
+            print(report)
+            print(import_time_report(['app', 'yt_dlp']))
+    threading.Thread(target=worker, daemon=True).start()
+
 def main():
+    show_report = '--startup-report' in sys.argv
     root = tk.Tk()
     app = YouTubeDownloaderApp(root)
+    startup_timer.mark("window built")
+
+    def on_first_paint():
+        startup_timer.mark("first paint")
+        _preload_in_background(show_report)
+    root.after_idle(on_first_paint)
     root.mainloop()
 
 
@@ -0,0 +1,24 @@
+from yt_dlp.utils import sanitize_filename
+
+from Program import Archive
+from Program.Archive import DownloadArchive
+from Program.History import HistoryStore
+
+def test_import_folder_matches_ids_and_history_titles(tmp_path, monkeypatch):
+    db_file = str(tmp_path / 'app.db')
+    history = HistoryStore(db_file, legacy_file=None)
+    monkeypatch.setattr(Archive, 'get_history', lambda: history)
+    history.append("Artist/Band: Song", "https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    history.append("Unknown", "https://www.youtube.com/watch?v=aaaaaaaaaaa", status='failed')
+
+    folder = tmp_path / 'musik'
+    folder.mkdir()
+    (folder / f"{sanitize_filename('Artist/Band: Song')}.mp3").write_bytes(b'')
+    (folder / "Other [abcdefghijk].webm").write_bytes(b'')
+    (folder / "Unknown.mp3").write_bytes(b'')
+
+    archive = DownloadArchive(db_file)
+    assert archive.import_folder(str(folder)) == 2
+    assert archive.has_url("https://youtu.be/dQw4w9WgXcQ")
+    assert archive.contains('youtube', 'abcdefghijk')
+    assert not archive.has_url("https://www.youtube.com/watch?v=aaaaaaaaaaa")
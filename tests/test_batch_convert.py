@@ -0,0 +1,54 @@
+import threading
+
+from Program import ConvertBatch, ConvertLogic
+
+def _inputs(tmp_path, count=3):
+    folder = tmp_path / 'in'
+    folder.mkdir()
+    for i in range(count):
+        (folder / f"song{i}.mp3").write_bytes(b'\0')
+    return [str(folder)]
+
+def test_cancel_counts_skipped_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cancel_event = threading.Event()
+
+    def cancel(*args):
+        cancel_event.set()
+        return False
+
+    monkeypatch.setattr(ConvertBatch, 'convert_with_budget', cancel)
+    events = []
+    assert not ConvertBatch.batch_convert(_inputs(tmp_path), str(tmp_path / 'out'), 'mp3',
+                                          progress_callback=events.append, max_jobs=1,
+                                          cancel_event=cancel_event)
+    errors = [e for e in events if e['status'] == 'error']
+    assert [e['cause'] for e in errors] == ['cancelled'] * 3
+    assert events[-1] == {'status': 'complete', 'total': 3, 'failed': 3}
+
+def test_single_file_cancel_leaves_batch_running(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def convert(input_path, output_path, codec, quality, callback, threads, cancel_event):
+        # The Convert tab's Cancel while the batch runs
+        ConvertLogic.cancel_conversion()
+        return not cancel_event.is_set()
+
+    monkeypatch.setattr(ConvertBatch, 'convert_with_budget', convert)
+    try:
+        assert ConvertBatch.batch_convert(_inputs(tmp_path), str(tmp_path / 'out'), 'mp3', max_jobs=1)
+    finally:
+        ConvertLogic.cancel_event.clear()
+
+def test_worker_exception_fails_batch(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def crash(*args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(ConvertBatch, 'convert_with_budget', crash)
+    events = []
+    assert not ConvertBatch.batch_convert(_inputs(tmp_path, 2), str(tmp_path / 'out'), 'mp3',
+                                          progress_callback=events.append)
+    assert [e['error'] for e in events if e['status'] == 'error'] == ["boom", "boom"]
+    assert events[-1]['failed'] == 2
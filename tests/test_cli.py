@@ -0,0 +1,27 @@
+import pytest
+
+from Program import DownloadLogic, cli
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+    monkeypatch.setattr(DownloadLogic, 'validate_dependencies', lambda callback: True)
+    monkeypatch.setattr(DownloadLogic, 'sync_playlists',
+                        lambda *args, **kwargs: calls.append((args, kwargs)) or True)
+    return calls
+
+def test_sync_passes_concurrency_limits(calls, tmp_path):
+    argv = ['sync', 'https://example.invalid/playlist', '-o', str(tmp_path), '--workers', '5', '--per-host', '1']
+    assert cli.main(argv) == cli.EXIT_OK
+    kwargs = calls[0][1]
+    assert (kwargs['max_workers'], kwargs['max_per_host']) == (5, 1)
+
+def test_sync_applies_preset_per_entry(calls, tmp_path):
+    argv = ['sync', 'https://example.invalid/playlist', '-o', str(tmp_path), '--preset', 'Best audio']
+    assert cli.main(argv) == cli.EXIT_OK
+    args, kwargs = calls[0]
+    assert args[0] == ['https://example.invalid/playlist'] and args[2] == 'ba/b'
+
+def test_convert_rejects_format_choice(tmp_path):
+    with pytest.raises(SystemExit):
+        cli.main(['download', 'https://example.invalid/v', '-o', str(tmp_path), '--convert', 'mp3', '-f', 'b'])
@@ -0,0 +1,29 @@
+import os
+import sys
+import stat
+
+import pytest
+
+from Program import ConvertLogic
+
+STUB_FFMPEG = """#!{python}
+import sys
+sys.stderr.write("Unknown encoder 'libmp3lame'\\n")
+sys.exit(1)
+"""
+
+@pytest.mark.skipif(os.name == 'nt', reason="stub ffmpeg is a shebang script")
+def test_ffmpeg_failure_is_logged_once(tmp_path, monkeypatch):
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffmpeg.write_text(STUB_FFMPEG.format(python=sys.executable))
+    ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(ConvertLogic, 'FFMPEG_PATH', str(ffmpeg))
+    monkeypatch.setattr(ConvertLogic, 'probe', lambda path: {'duration': 10, 'streams': []})
+    logged = []
+    monkeypatch.setattr(ConvertLogic, 'log_error', lambda message, **context: logged.append(context))
+
+    events = []
+    assert not ConvertLogic.run_conversion('in.webm', str(tmp_path / 'out.mp3'), 'mp3',
+                                           progress_callback=events.append)
+    assert len(logged) == 1 and 'Unknown encoder' in logged[0]['stderr']
+    assert events[-1]['cause'] == 'codec_missing'
@@ -0,0 +1,86 @@
+import os
+import time
+import threading
+import http.server
+
+import pytest
+
+from Program import DownloadLogic
+from Program.Prefetch import Prefetcher
+
+requests = []
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _headers(self):
+        requests.append(self.path)
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', '1024')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        self._headers()
+        self.wfile.write(b'\0' * 1024)
+
+@pytest.fixture
+def server():
+    requests.clear()
+    srv = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+def test_cancelled_fetch_stops_extraction(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert DownloadLogic.fetch_media(f"{server}/clip.mp4", lambda: True) == ([], [], None)
+    assert requests == []
+    assert not os.path.exists('app.log')
+
+    audio, video, title = DownloadLogic.fetch_media(f"{server}/clip.mp4", lambda: False)
+    assert title == 'clip'
+    assert requests
+
+def test_waiter_extracts_again_after_owner_cancels():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def extract(url, cancelled=None):
+        calls.append(url)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+            if cancelled():
+                raise RuntimeError("cancelled")
+        return {'title': url}
+
+    prefetcher = Prefetcher(extract)
+    cancel = threading.Event()
+    owner_result = []
+
+    def owner():
+        try:
+            prefetcher.get('https://example.com/v', cancel.is_set)
+        except RuntimeError as e:
+            owner_result.append(e)
+
+    thread = threading.Thread(target=owner)
+    thread.start()
+    started.wait(5)
+    waiter_result = []
+    waiter = threading.Thread(target=lambda: waiter_result.append(prefetcher.get('https://example.com/v')))
+    waiter.start()
+    time.sleep(0.2)  # let the waiter block on the owner's extraction
+    cancel.set()
+    release.set()
+    thread.join(5)
+    waiter.join(5)
+
+    assert owner_result and waiter_result == [{'title': 'https://example.com/v'}]
+    assert len(calls) == 2
@@ -0,0 +1,9 @@
+import io
+
+from Program.FFmpegLog import MAX_LINE, StderrTail
+
+def test_long_line_takes_one_slot():
+    data = b'first\n' + b'x' * (MAX_LINE * 3 + 10) + b'\n' + b'y' * MAX_LINE + b'\nlast\n'
+    tail = StderrTail(io.BytesIO(data), max_lines=10)
+    tail.join()
+    assert list(tail.lines) == ['first', 'x' * MAX_LINE, 'y' * MAX_LINE, 'last']
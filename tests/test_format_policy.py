@@ -0,0 +1,43 @@
+import os
+import threading
+import http.server
+
+import pytest
+
+from Program import DownloadLogic
+from Program.FormatRank import BANDWIDTH_SAVING
+
+DATA = os.urandom(64 * 1024)
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _headers(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(DATA)))
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        self._headers()
+        self.wfile.write(DATA)
+
+@pytest.fixture
+def server():
+    srv = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+def test_policy_format_on_uncached_url(server, tmp_path, monkeypatch):
+    # Format selection runs inside extraction when the info cache misses
+    monkeypatch.chdir(tmp_path)
+    events = []
+    assert DownloadLogic.queue_download([f"{server}/clip.mp4"], str(tmp_path / 'out'), BANDWIDTH_SAVING,
+                                        'video', progress_callback=events.append, max_workers=1)
+    assert not [e for e in events if 'error' in e]
+    assert os.listdir(tmp_path / 'out') == ['clip [clip].mp4']
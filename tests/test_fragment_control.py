@@ -0,0 +1,37 @@
+import logging
+import threading
+
+from Program import FragmentControl
+from Program.FragmentControl import FragmentController
+
+def test_global_cap_is_never_exceeded():
+    controller = FragmentController(initial=4, max_total=4)
+    first = controller.acquire('a.example')
+    cancel = threading.Event()
+    cancel.set()
+    assert controller.acquire('b.example', cancel) is None
+
+    granted = []
+    waiter = threading.Thread(target=lambda: granted.append(controller.acquire('b.example')))
+    waiter.start()
+    waiter.join(0.3)
+    assert not granted
+    first.release()
+    waiter.join(5)
+    assert granted[0].fragments == 4
+
+def test_lease_forwards_warnings_and_errors(monkeypatch):
+    calls = []
+    monkeypatch.setattr(FragmentControl, 'log', lambda level, message, **context: calls.append((level, context)))
+    monkeypatch.setattr(FragmentControl, 'log_error', lambda message, **context: calls.append(('error', context)))
+    lease = FragmentController().acquire('a.example', job=7, url='https://a.example/v')
+    # yt-dlp reports download retries through to_screen, i.e. logger.debug
+    lease.debug("[download] Got error: HTTP Error 429: Too Many Requests. Retrying (1/10)...")
+    lease.debug("[download] Destination: video.mp4")
+    lease.warning("Unable to download JSON metadata: HTTP Error 403: Forbidden")
+    lease.error("ERROR: unable to download video data")
+    lease.release()
+
+    context = {'job': 7, 'stage': 'download', 'url': 'https://a.example/v'}
+    assert calls == [(logging.WARNING, context), ('error', context)]
+    assert lease._window_errors == 3
@@ -0,0 +1,28 @@
+from Program import DownloadLogic
+from Program.JobStore import JobStore, DONE
+
+def test_batch_is_recorded_before_scheduling(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    monkeypatch.setattr(DownloadLogic, 'JobStore', lambda: store)
+    urls = [f"http://example.invalid/video{i}" for i in range(50)]
+    recorded = []
+
+    def download(job, url, total, opts, callback, store, job_id, defer_finish=False):
+        recorded.append(store.count_incomplete())
+        return False
+    monkeypatch.setattr(DownloadLogic, '_download_job', download)
+
+    DownloadLogic.queue_download(urls, str(tmp_path / 'out'), 'b', 'video', max_workers=2)
+    assert recorded[0] == len(urls)
+
+def test_enqueue_many_skips_finished_jobs(tmp_path):
+    store = JobStore(str(tmp_path / 'jobs.db'))
+    output = tmp_path / 'done.mp4'
+    output.write_bytes(b'done')
+    done = store.enqueue('http://example.invalid/a', str(tmp_path), 'b')
+    store.set_state(done, DONE, filepath=str(output))
+
+    ids = store.enqueue_many([('http://example.invalid/a', str(tmp_path), 'b'),
+                              ('http://example.invalid/b', str(tmp_path), 'b')])
+    assert ids[0] is None and ids[1] is not None
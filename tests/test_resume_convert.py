@@ -0,0 +1,44 @@
+import os
+import sqlite3
+
+from Program import DownloadLogic, ConvertBatch
+from Program.JobStore import JobStore, CONVERTING, DONE
+
+def test_resume_converts_interrupted_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_file = str(tmp_path / 'jobs.db')
+    # A jobs table from before the conversion target was stored
+    conn = sqlite3.connect(db_file)
+    conn.execute("""CREATE TABLE jobs (id INTEGER PRIMARY KEY, url TEXT NOT NULL, output_dir TEXT NOT NULL,
+        format_id TEXT NOT NULL, selected_type TEXT, state TEXT NOT NULL, title TEXT, filepath TEXT,
+        error TEXT, created_at TEXT NOT NULL, updated_at TEXT NOT NULL)""")
+    conn.commit()
+    conn.close()
+
+    store = JobStore(db_file)
+    monkeypatch.setattr(DownloadLogic, 'JobStore', lambda: store)
+    source = tmp_path / 'song.webm'
+    source.write_bytes(b'source')
+    job_id = store.enqueue('http://example.invalid/song', str(tmp_path), 'ba/b', 'audio', 'mp3', 'high')
+    store.set_state(job_id, CONVERTING, filepath=str(source))
+
+    # The already downloaded source is what yt-dlp would return again
+    def download(job, url, total, opts, callback, store, job_id, defer_finish=False):
+        assert defer_finish
+        return {'title': 'song'}, 'song', str(source), total
+    converted = []
+    def convert(input_path, output_path, codec, quality, callback, threads, cancel_event=None):
+        converted.append((codec, quality))
+        with open(output_path, 'wb') as f:
+            f.write(b'converted')
+        return True
+    monkeypatch.setattr(DownloadLogic, '_download_job', download)
+    monkeypatch.setattr(DownloadLogic, 'add_to_history', lambda *args, **kwargs: None)
+    monkeypatch.setattr(ConvertBatch, 'convert_with_budget', convert)
+
+    assert DownloadLogic.resume_downloads(max_workers=1)
+    job = store.get(job_id)
+    assert converted == [('mp3', 'high')]
+    assert job['state'] == DONE
+    assert job['filepath'] == str(tmp_path / 'song.mp3')
+    assert not source.exists()
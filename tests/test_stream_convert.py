@@ -0,0 +1,85 @@
+import os
+import sys
+import stat
+import threading
+import http.server
+
+import pytest
+
+from Program import ConvertBatch, DownloadLogic
+from Program.StreamConvert import PipeError
+
+DATA = os.urandom(256 * 1024)
+
+# Stand-in for ffmpeg: copies the piped stream to the output file
+STUB_FFMPEG = """#!{python}
+import sys, shutil
+with open(sys.argv[-1], 'wb') as f:
+    shutil.copyfileobj(sys.stdin.buffer, f)
+"""
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _headers(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/mpeg')
+        self.send_header('Content-Length', str(len(DATA)))
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers()
+
+    def do_GET(self):
+        self._headers()
+        self.wfile.write(DATA)
+
+@pytest.fixture
+def server():
+    srv = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}"
+    srv.shutdown()
+
+@pytest.mark.skipif(os.name == 'nt', reason="stub ffmpeg is a shebang script")
+def test_stream_download_pipes_local_file_through_ffmpeg(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    ffmpeg = tmp_path / 'ffmpeg'
+    ffmpeg.write_text(STUB_FFMPEG.format(python=sys.executable))
+    ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(DownloadLogic, 'FFMPEG_PATH', str(ffmpeg))
+
+    events = []
+    output_dir = tmp_path / 'out'
+    assert DownloadLogic.stream_download([f"{server}/song.mp3"], str(output_dir), 'mp3',
+                                         progress_callback=events.append, max_workers=1)
+
+    errors = [e for e in events if e.get('status') == 'error']
+    assert not errors
+    done = [e for e in events if e.get('status') == 'complete' and 'filepath' in e]
+    assert len(done) == 1
+    with open(done[0]['filepath'], 'rb') as f:
+        assert f.read() == DATA
+    # Nothing but the converted file is left behind
+    assert os.listdir(output_dir) == [os.path.basename(done[0]['filepath'])]
+
+def test_fallback_converts_within_core_budget(server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def no_pipe(*args, **kwargs):
+        raise PipeError("Format cannot be streamed")
+    converted = []
+    def convert(input_path, output_path, codec, quality='medium', progress_callback=None, threads=None,
+                cancel_event=None):
+        converted.append(cancel_event)
+        with open(output_path, 'wb') as f:
+            f.write(b'converted')
+        return True
+    monkeypatch.setattr(DownloadLogic, 'stream_convert', no_pipe)
+    monkeypatch.setattr(ConvertBatch, 'convert_with_budget', convert)
+
+    output_dir = tmp_path / 'out'
+    assert DownloadLogic.stream_download([f"{server}/song.mp3"], str(output_dir), 'mp3', max_workers=1)
+    assert converted == [DownloadLogic.cancel_event]
+    assert [name.endswith('.mp3') and '.source.' not in name for name in os.listdir(output_dir)] == [True]
@@ -0,0 +1,17 @@
+from Program import Sync
+from Program.Sync import SeenIndex, new_entries
+
+SOURCE = 'https://example.invalid/playlist'
+
+def test_failed_entry_behind_seen_entry_is_retried(tmp_path, monkeypatch):
+    index = SeenIndex(str(tmp_path / 'sync.db'))
+    # Newest first: 'b' failed last time, 'a' (newer) was downloaded
+    playlist = [{'id': 'a', 'ie_key': 'Test', 'url': 'u/a'}, {'id': 'b', 'ie_key': 'Test', 'url': 'u/b'}]
+    monkeypatch.setattr(Sync, 'iter_flat_entries', lambda source: (entry for entry in playlist))
+    index.mark_seen(SOURCE, ('Test', 'a'))
+    index.mark_failed(SOURCE, ('Test', 'b'), 'u/b')
+
+    assert new_entries(SOURCE, index, stop_after_seen=1) == [('u/b', ('Test', 'b'))]
+
+    index.mark_seen(SOURCE, ('Test', 'b'))
+    assert new_entries(SOURCE, index, stop_after_seen=1) == []